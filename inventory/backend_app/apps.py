@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BackendConfig(AppConfig):
     name = 'backend_app'
+
+    def ready(self):
+        # registers the background job handlers (see services/job_queue.py)
+        from backend_app.services import mail_service  # noqa: F401
+        from backend_app.services import slow_query
+
+        if getattr(settings, "SLOW_QUERY_MS", None):
+            slow_query.install()
@@ -0,0 +1,120 @@
+from backend_app.services.auth_service import hash_password
+from backend_app.services.cache_service import bump_version
+from backend_app.services.db import execute_query
+
+# ---------------- SYNTHETIC CATALOG ----------------
+# Rows are generated inside Postgres (generate_series) and inserted through
+# the same stored procedures the API uses, so any logic in them is exercised
+# and nothing is shipped row by row from Python. Everything created here is
+# marked with created_by = BENCH_MARKER so it can be removed again.
+
+BENCH_MARKER = "bench"
+BENCH_USER_PREFIX = "bench_user_"
+
+# product names are "<material> <item> <n>", which gives search realistic
+# selectivity: each word matches 1/len(list) of the catalog
+MATERIALS = ["Steel", "Copper", "Brass", "Nylon", "Carbon", "Rubber", "Cotton", "Oak",
+             "Maple", "Glass", "Ceramic", "Silicone", "Titanium", "Zinc", "Bamboo", "Vinyl"]
+ITEMS = ["Bolt", "Washer", "Hinge", "Bracket", "Valve", "Gasket", "Bearing", "Spring",
+         "Clamp", "Hose", "Filter", "Switch", "Cable", "Panel", "Sensor", "Pump",
+         "Gear", "Pulley", "Fuse", "Relay"]
+
+SEED_CATEGORIES_QUERY = """
+    SELECT sp_insert_add_category('Bench Category ' || g, %s)
+    FROM generate_series(%s, %s) AS g
+"""
+SEED_SUPPLIERS_QUERY = """
+    SELECT sp_insert_add_supplier('Bench Supplier ' || g, 'bench-' || g || '@example.com', %s)
+    FROM generate_series(%s, %s) AS g
+"""
+SEED_PRODUCTS_QUERY = """
+    SELECT sp_insert_add_product(
+        (%(materials)s::text[])[1 + g %% cardinality(%(materials)s::text[])] || ' ' ||
+        (%(items)s::text[])[1 + (g / cardinality(%(materials)s::text[])) %% cardinality(%(items)s::text[])] || ' ' || g,
+        round((1 + random() * 999)::numeric, 2),
+        (random() * 500)::int,
+        (%(suppliers)s::int[])[1 + (hashint4(g) & 2147483647) %% cardinality(%(suppliers)s::int[])],
+        (%(categories)s::int[])[1 + (hashint4(g + 7) & 2147483647) %% cardinality(%(categories)s::int[])],
+        %(marker)s,
+        NULL
+    )
+    FROM generate_series(%(start)s, %(stop)s) AS g
+"""
+
+
+def _ids(table):
+    rows = execute_query(f"SELECT id FROM {table} WHERE created_by = %s ORDER BY id", [BENCH_MARKER], fetch=True)
+    return [row["id"] for row in rows]
+
+
+def dataset_counts():
+    """Rows per table that belong to the synthetic catalog."""
+    res = execute_query(
+        """
+        SELECT (SELECT COUNT(*) FROM tbl_products WHERE created_by = %(m)s) AS products,
+               (SELECT COUNT(*) FROM tbl_categories WHERE created_by = %(m)s) AS categories,
+               (SELECT COUNT(*) FROM tbl_suppliers WHERE created_by = %(m)s) AS suppliers,
+               (SELECT COUNT(*) FROM tbl_users WHERE username LIKE %(u)s) AS users
+        """,
+        {"m": BENCH_MARKER, "u": BENCH_USER_PREFIX + "%"},
+        fetch=True,
+    )
+    return res[0]
+
+
+def reset_dataset():
+    """Deletes the synthetic catalog (products first, for the foreign keys)."""
+    execute_query("DELETE FROM tbl_products WHERE created_by = %s", [BENCH_MARKER])
+    execute_query("DELETE FROM tbl_categories WHERE created_by = %s", [BENCH_MARKER])
+    execute_query("DELETE FROM tbl_suppliers WHERE created_by = %s", [BENCH_MARKER])
+    execute_query("DELETE FROM tbl_users WHERE username LIKE %s", [BENCH_USER_PREFIX + "%"])
+    bump_version("products", "categories", "suppliers")
+
+
+def seed_dataset(products, categories, suppliers, users=0, password=None, batch_size=50000, progress=None):
+    """
+    Tops the synthetic catalog up to the requested sizes (existing bench rows
+    are kept, so seeding 1M after 100k only adds 900k).
+    """
+    counts = dataset_counts()
+
+    if categories > counts["categories"]:
+        execute_query(SEED_CATEGORIES_QUERY, [BENCH_MARKER, counts["categories"] + 1, categories])
+    if suppliers > counts["suppliers"]:
+        execute_query(SEED_SUPPLIERS_QUERY, [BENCH_MARKER, counts["suppliers"] + 1, suppliers])
+
+    category_ids, supplier_ids = _ids("tbl_categories"), _ids("tbl_suppliers")
+    if products > counts["products"] and not (category_ids and supplier_ids):
+        raise ValueError("At least one category and one supplier are needed to seed products.")
+
+    start = counts["products"] + 1
+    while start <= products:
+        stop = min(start + batch_size - 1, products)
+        execute_query(SEED_PRODUCTS_QUERY, {
+            "materials": MATERIALS,
+            "items": ITEMS,
+            "suppliers": supplier_ids,
+            "categories": category_ids,
+            "marker": BENCH_MARKER,
+            "start": start,
+            "stop": stop,
+        })
+        if progress:
+            progress(stop, products)
+        start = stop + 1
+
+    if users > counts["users"]:
+        # one bcrypt hash shared by every bench user
+        hashed = hash_password(password)
+        for n in range(counts["users"] + 1, users + 1):
+            execute_query(
+                "SELECT * FROM sp_auth_register(%s, %s, %s)",
+                [f"{BENCH_USER_PREFIX}{n}", f"{BENCH_USER_PREFIX}{n}@example.com", hashed],
+                fetch=True,
+            )
+
+    # fresh planner statistics for the new data distribution
+    for table in ("tbl_categories", "tbl_suppliers", "tbl_products"):
+        execute_query(f"ANALYZE {table}")
+    bump_version("products", "categories", "suppliers")
+    return dataset_counts()
@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------- HTTP LOAD DRIVER ----------------
+# Small closed-loop load generator used by the benchmark commands: a fixed
+# number of client threads keep one request each in flight until the request
+# budget is spent. Only the standard library is used so the benchmarks run
+# anywhere the project runs.
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies_ms, errors, elapsed):
+    """Latency percentiles (ms) and throughput for one run."""
+    ordered = sorted(latencies_ms)
+    completed = len(ordered)
+    return {
+        "requests": completed + errors,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(completed / elapsed, 1) if elapsed else None,
+        "mean_ms": round(sum(ordered) / completed, 2) if completed else None,
+        "p50_ms": percentile(ordered, 50),
+        "p95_ms": percentile(ordered, 95),
+        "p99_ms": percentile(ordered, 99),
+        "max_ms": ordered[-1] if ordered else None,
+    }
+
+
+def http_request(url, method="GET", body=None, headers=None, timeout=30):
+    """Sends one request and returns (status, response body bytes)."""
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method)
+    request.add_header("Content-Type", "application/json")
+    for name, value in (headers or {}).items():
+        request.add_header(name, value)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def fetch_token(base_url, username, password):
+    """Logs in through /api/login/ and returns an access token."""
+    status, body = http_request(
+        f"{base_url}/api/login/", "POST", {"username": username, "password": password}
+    )
+    if status != 200:
+        raise RuntimeError(f"Login failed with HTTP {status}: {body[:200]!r}")
+    return json.loads(body)["access"]
+
+
+def run_load(make_request, concurrency, total_requests, ok_statuses=(200, 201, 204)):
+    """
+    Runs `total_requests` calls of `make_request(i) -> (status, body)` on
+    `concurrency` threads and returns summarize() of the run.
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+
+    def worker():
+        nonlocal errors
+        local_latencies, local_errors = [], 0
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            start = time.perf_counter()
+            try:
+                status, _ = make_request(i)
+                ok = status in ok_statuses
+            except Exception:
+                ok = False
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if ok:
+                local_latencies.append(round(elapsed_ms, 3))
+            else:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return summarize(latencies, errors, time.perf_counter() - start)
@@ -0,0 +1,150 @@
+import json
+import random
+
+from backend_app.bench.dataset import BENCH_MARKER, BENCH_USER_PREFIX, ITEMS, MATERIALS
+from backend_app.bench.load import http_request
+from backend_app.services.db import execute_query
+
+# ---------------- ENDPOINT SCENARIOS ----------------
+# Each scenario is a factory: given the run context it returns a
+# make_request(i) -> (status, body) function for bench.load.run_load.
+# Random choices use a fixed seed per scenario so two runs send the same
+# request sequence.
+
+
+class BenchContext:
+    """Everything the scenarios need: server, token and ids from the synthetic catalog."""
+
+    def __init__(self, base_url, token, password, users):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.password = password
+        self.users = users
+        self.product_ids = [
+            row["id"] for row in execute_query(
+                "SELECT id FROM tbl_products WHERE created_by = %s AND status = TRUE ORDER BY id LIMIT 10000",
+                [BENCH_MARKER], fetch=True,
+            )
+        ]
+        refs = execute_query(
+            "SELECT (SELECT MIN(id) FROM tbl_categories WHERE created_by = %(m)s) AS category_id, "
+            "(SELECT MIN(id) FROM tbl_suppliers WHERE created_by = %(m)s) AS supplier_id",
+            {"m": BENCH_MARKER}, fetch=True,
+        )[0]
+        self.category_id, self.supplier_id = refs["category_id"], refs["supplier_id"]
+
+    def get(self, path):
+        return http_request(self.base_url + path, headers=self.headers)
+
+
+def product_list(ctx):
+    rng = random.Random(1)
+
+    def request(i):
+        return ctx.get(f"/api/products/?page={rng.randint(1, 50)}&limit=50")
+    return request
+
+
+def product_list_cursor(ctx):
+    def request(i):
+        return ctx.get("/api/products/?cursor=&limit=50")
+    return request
+
+
+def product_search(ctx):
+    rng = random.Random(2)
+    terms = MATERIALS + ITEMS + [f"{m} {it}" for m in MATERIALS[:4] for it in ITEMS[:4]]
+
+    def request(i):
+        return ctx.get(f"/api/products/search/?q={rng.choice(terms).replace(' ', '+')}&limit=20")
+    return request
+
+
+def dashboard(ctx):
+    def request(i):
+        return ctx.get("/api/dashboard-stats/")
+    return request
+
+
+def login(ctx):
+    if not ctx.users:
+        raise ValueError("The login scenario needs bench users (manage.py bench_seed --users N).")
+
+    def request(i):
+        body = {"username": f"{BENCH_USER_PREFIX}{i % ctx.users + 1}", "password": ctx.password}
+        return http_request(ctx.base_url + "/api/login/", "POST", body)
+    return request
+
+
+def product_create(ctx):
+    if ctx.category_id is None or ctx.supplier_id is None:
+        raise ValueError("The create scenario needs a seeded catalog (manage.py bench_seed).")
+
+    def request(i):
+        body = {
+            "name": f"Bench Created {i}",
+            "price": "9.99",
+            "quantity": 10,
+            "supplier_id": ctx.supplier_id,
+            "category_id": ctx.category_id,
+            "created_by": BENCH_MARKER,
+        }
+        return http_request(ctx.base_url + "/api/products/", "POST", body, ctx.headers)
+    return request
+
+
+def product_update(ctx):
+    if not ctx.product_ids:
+        raise ValueError("The update scenario needs a seeded catalog (manage.py bench_seed).")
+    rng = random.Random(3)
+
+    def request(i):
+        product_id = rng.choice(ctx.product_ids)
+        body = {
+            "name": f"Bench Updated {product_id}",
+            "price": "19.99",
+            "quantity": rng.randint(0, 500),
+            "updated_by": BENCH_MARKER,
+            "update_reason": "benchmark",
+        }
+        return http_request(f"{ctx.base_url}/api/products/{product_id}/", "PUT", body, ctx.headers)
+    return request
+
+
+SCENARIOS = {
+    "list": product_list,
+    "list_cursor": product_list_cursor,
+    "search": product_search,
+    "dashboard": dashboard,
+    "login": login,
+    "create": product_create,
+    "update": product_update,
+}
+
+
+def compare(results, baseline, max_regression):
+    """
+    Scenarios whose p95 latency or throughput got worse than the baseline run
+    by more than `max_regression` (0.2 = 20%).
+    """
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result["scenario"], result["concurrency"]))
+        if not before or not result["p95_ms"] or not before["p95_ms"]:
+            continue
+        p95_change = result["p95_ms"] / before["p95_ms"] - 1
+        rps_change = 1 - result["throughput_rps"] / before["throughput_rps"] if before["throughput_rps"] else 0
+        if p95_change > max_regression or rps_change > max_regression:
+            regressions.append({
+                "scenario": result["scenario"],
+                "concurrency": result["concurrency"],
+                "p95_ms": [before["p95_ms"], result["p95_ms"]],
+                "throughput_rps": [before["throughput_rps"], result["throughput_rps"]],
+            })
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as fh:
+        return json.load(fh)
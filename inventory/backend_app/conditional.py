@@ -0,0 +1,70 @@
+import functools
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from backend_app.services.cache_service import get_db_versions, use_db_versions
+
+# ---------------- CONDITIONAL GET (ETag / 304) ----------------
+# A list response only changes when one of its resources is written, so its
+# ETag is derived from the resource versions (one primary-key lookup) plus the
+# request URL, never from the body. A matching If-None-Match is answered with
+# 304 before the page query runs. The handler runs with the same versions in
+# effect (use_db_versions), so anything it takes from cached() belongs to
+# exactly the versions in the tag, whichever worker filled the cache.
+# ETAG_SALT must be changed by a deploy that changes the shape of responses,
+# since the versions alone would still match.
+
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(request, key, versions, extra=()):
+    parts = [
+        key,
+        str(getattr(settings, "ETAG_SALT", "")),
+        request.get_full_path(),
+        request.META.get("HTTP_ACCEPT", ""),
+        *(f"{resource}={version}" for resource, version in sorted(versions.items())),
+        *(str(value) for value in extra),
+    ]
+    digest = hashlib.blake2b("\n".join(parts).encode(), digest_size=12).hexdigest()
+    return f'"{key}-{digest}"'
+
+
+def _matches(request, etag):
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    # weak comparison: GZipMiddleware and proxies may send the tag back as W/"..."
+    etags = [tag[2:] if tag.startswith("W/") else tag for tag in parse_etags(header)]
+    return "*" in etags or etag in etags
+
+
+def conditional_on(key, resources, extra=None):
+    """
+    Decorator for APIView GET handlers whose body depends only on `resources`
+    (and the query string). `extra` is an optional callable returning other
+    values the body depends on (e.g. settings).
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            # versions are read before the page query, so a write in between
+            # yields an older tag and the next request simply refetches
+            versions = get_db_versions(resources)
+            etag = compute_etag(request, key, versions, extra() if extra else ())
+
+            if _matches(request, etag):
+                response = HttpResponseNotModified()
+            else:
+                with use_db_versions(versions):
+                    response = method(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response["ETag"] = etag
+            response["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
@@ -47,4 +47,14 @@ class InvalidFileFormatError(ProductAppError):
 class PermissionDeniedError(ProductAppError):
     """Raised when a user attempts an unauthorized action"""
     def __init__(self, message="You do not have permission to perform this action"):
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+class ConcurrencyConflictError(ProductAppError):
+    """Raised when a record was changed by someone else since the client read it"""
+    def __init__(self, message="The record was modified by another request"):
+        super().__init__(message)
+
+class InsufficientStockError(ProductAppError):
+    """Raised when a stock adjustment would take a quantity below zero"""
+    def __init__(self, message="Not enough stock for this adjustment"):
+        super().__init__(message)
@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from backend_app.bench.load import fetch_token, http_request, run_load
+
+# sync route -> async twin (see backend_app/urls.py)
+ENDPOINTS = {
+    "products": ("/api/products/?page=1&limit=50", "/api/async/products/?page=1&limit=50"),
+    "search": ("/api/products/search/?q=a&limit=20", "/api/async/products/search/?q=a&limit=20"),
+    "dashboard": ("/api/dashboard-stats/", "/api/async/dashboard-stats/"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares throughput and latency of the sync (WSGI-style) read endpoints with "
+        "their async twins at increasing concurrency, against a running server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000",
+                            help="Server for both paths (normally an ASGI server such as uvicorn)")
+        parser.add_argument("--sync-base-url", help="Optional separate WSGI deployment for the sync path")
+        parser.add_argument("--username", required=True)
+        parser.add_argument("--password", required=True)
+        parser.add_argument("--concurrency", default="10,50,200",
+                            help="Comma separated client concurrency levels")
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per run")
+        parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+
+    def handle(self, *args, **options):
+        async_base = options["base_url"].rstrip("/")
+        sync_base = (options["sync_base_url"] or async_base).rstrip("/")
+        headers = {
+            "Authorization": f"Bearer {fetch_token(async_base, options['username'], options['password'])}"
+        }
+
+        results = []
+        for name in options["endpoints"].split(","):
+            sync_path, async_path = ENDPOINTS[name]
+            for concurrency in (int(c) for c in options["concurrency"].split(",")):
+                for mode, url in (("sync", sync_base + sync_path), ("async", async_base + async_path)):
+                    stats = run_load(
+                        lambda i, url=url: http_request(url, headers=headers),
+                        concurrency,
+                        options["requests"],
+                    )
+                    results.append({"endpoint": name, "mode": mode, "concurrency": concurrency, **stats})
+                    self.stderr.write(
+                        f"{name:<10} {mode:<5} c={concurrency:<4} "
+                        f"{stats['throughput_rps']} req/s  p95={stats['p95_ms']} ms  errors={stats['errors']}"
+                    )
+
+        self.stdout.write(json.dumps({"benchmark": "async_concurrency", "results": results}, indent=2))
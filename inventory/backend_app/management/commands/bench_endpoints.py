@@ -0,0 +1,89 @@
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend_app.bench.dataset import BENCH_USER_PREFIX, dataset_counts
+from backend_app.bench.load import fetch_token, run_load
+from backend_app.bench.scenarios import SCENARIOS, BenchContext, compare, load_baseline
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives the list, search, dashboard, login, create and update endpoints of a "
+        "running server at fixed concurrency and writes p50/p95/p99 latency and "
+        "throughput per scenario as JSON. Seed data first with 'manage.py bench_seed'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--password", default="Bench@12345", help="Password of the bench users")
+        parser.add_argument("--scenarios", default="list,list_cursor,search,dashboard,login,create,update",
+                            help=f"Comma separated, from: {', '.join(SCENARIOS)}")
+        parser.add_argument("--concurrency", default="16", help="Comma separated client concurrency levels")
+        parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario and level")
+        parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests before each scenario")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+        parser.add_argument("--baseline", help="Previous report to compare against")
+        parser.add_argument("--max-regression", type=float, default=0.2,
+                            help="Allowed p95/throughput regression against --baseline (0.2 = 20%%)")
+
+    def handle(self, *args, **options):
+        names = options["scenarios"].split(",")
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+        dataset = dataset_counts()
+        if not dataset["users"]:
+            raise CommandError("No bench users found; run 'manage.py bench_seed' first.")
+        token = fetch_token(options["base_url"], f"{BENCH_USER_PREFIX}1", options["password"])
+        ctx = BenchContext(options["base_url"], token, options["password"], dataset["users"])
+
+        results = []
+        for name in names:
+            try:
+                make_request = SCENARIOS[name](ctx)
+            except ValueError as e:
+                raise CommandError(str(e))
+            for concurrency in (int(c) for c in options["concurrency"].split(",")):
+                if options["warmup"]:
+                    run_load(make_request, concurrency, options["warmup"])
+                stats = run_load(make_request, concurrency, options["requests"])
+                results.append({"scenario": name, "concurrency": concurrency, **stats})
+                self.stderr.write(
+                    f"{name:<12} c={concurrency:<4} {stats['throughput_rps']} req/s  "
+                    f"p50={stats['p50_ms']} p95={stats['p95_ms']} p99={stats['p99_ms']} ms  "
+                    f"errors={stats['errors']}"
+                )
+
+        report = {
+            "benchmark": "endpoints",
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "base_url": options["base_url"],
+            "python": platform.python_version(),
+            "dataset": dataset,
+            "requests_per_run": options["requests"],
+            "results": results,
+        }
+
+        regressions = []
+        if options["baseline"]:
+            regressions = compare(results, load_baseline(options["baseline"]), options["max_regression"])
+            report["regressions"] = regressions
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if regressions:
+            for r in regressions:
+                self.stderr.write(f"REGRESSION {r['scenario']} c={r['concurrency']}: "
+                                  f"p95 {r['p95_ms'][0]} -> {r['p95_ms'][1]} ms, "
+                                  f"{r['throughput_rps'][0]} -> {r['throughput_rps'][1]} req/s")
+            sys.exit(1)
@@ -0,0 +1,95 @@
+import json
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from backend_app.bench.load import http_request, run_load
+from backend_app.services.auth_service import login_user
+
+
+@contextmanager
+def count_round_trips():
+    """
+    Counts database round trips while active: one per statement, except that
+    consecutive statements of one psycopg pipeline share a single trip.
+    """
+    counter = {"round_trips": 0, "in_pipeline": False}
+
+    def wrapper(execute, sql, params, many, context):
+        info = getattr(connection.connection, "info", None)
+        status = getattr(info, "pipeline_status", 0)
+        pipelined = bool(status)  # psycopg.pq.PipelineStatus.OFF == 0
+        if not (pipelined and counter["in_pipeline"]):
+            counter["round_trips"] += 1
+        counter["in_pipeline"] = pipelined
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield counter
+
+
+def round_trips_per_login(username, password, logins):
+    """Average round trips of login_user() in this process, per outcome."""
+    result = {}
+    # failures first: the successful logins reset the failed-attempt counter
+    for outcome, attempt in (("failure", password + "-wrong"), ("success", password)):
+        with count_round_trips() as counter:
+            for _ in range(logins):
+                login_user(username, attempt)
+        result[outcome] = round(counter["round_trips"] / logins, 2)
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures LoginView throughput and latency at increasing concurrency "
+        "(a shift-start login storm) against a running server, and the database "
+        "round trips per login (in this process, against the configured database)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--username", required=True)
+        parser.add_argument("--password", required=True)
+        parser.add_argument("--concurrency", default="1,10,50",
+                            help="Comma separated client concurrency levels")
+        parser.add_argument("--requests", type=int, default=500, help="Logins per run")
+        parser.add_argument("--wrong-password-ratio", type=float, default=0.0,
+                            help="Fraction of logins sent with a bad password (exercises the failure path)")
+        parser.add_argument("--round-trip-logins", type=int, default=5,
+                            help="In-process logins per outcome used to count round trips (0 skips)")
+
+    def handle(self, *args, **options):
+        round_trips = None
+        if options["round_trip_logins"] > 0:
+            round_trips = round_trips_per_login(options["username"], options["password"],
+                                                options["round_trip_logins"])
+            self.stderr.write(f"round trips per login: success={round_trips['success']} "
+                              f"failure={round_trips['failure']}")
+
+        url = options["base_url"].rstrip("/") + "/api/login/"
+        good = {"username": options["username"], "password": options["password"]}
+        bad = {"username": options["username"], "password": options["password"] + "-wrong"}
+        # every n-th request uses the bad password
+        ratio = options["wrong_password_ratio"]
+        every = round(1 / ratio) if ratio > 0 else 0
+
+        def login(i):
+            body = bad if every and i % every == 0 else good
+            status, payload = http_request(url, "POST", body)
+            # an expected 401 for a bad password counts as a completed request
+            return (200 if body is bad and status == 401 else status), payload
+
+        results = []
+        for concurrency in (int(c) for c in options["concurrency"].split(",")):
+            stats = run_load(login, concurrency, options["requests"])
+            results.append({"concurrency": concurrency, **stats})
+            self.stderr.write(
+                f"c={concurrency:<4} {stats['throughput_rps']} logins/s  "
+                f"p50={stats['p50_ms']} ms  p95={stats['p95_ms']} ms  errors={stats['errors']}"
+            )
+
+        self.stdout.write(json.dumps(
+            {"benchmark": "login", "round_trips_per_login": round_trips, "results": results}, indent=2
+        ))
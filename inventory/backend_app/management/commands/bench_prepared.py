@@ -0,0 +1,82 @@
+import json
+import platform
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from backend_app.bench.dataset import BENCH_USER_PREFIX, dataset_counts
+from backend_app.bench.load import percentile
+from backend_app.services.auth_service import USER_ACCESS_QUERY
+from backend_app.services.counting import build_window_query
+from backend_app.services.db import PreparedCursor, prepared, psycopg
+from backend_app.services.product_service import SEARCH_PRODUCT_QUERY
+
+LIST_QUERY = prepared(build_window_query("sp_read_get_product()", [], 0, 0)[0])
+
+
+def statements(limit):
+    """(name, sql, params) of the hot statements compared by this benchmark."""
+    return [
+        ("login_status", USER_ACCESS_QUERY, ["GET_STATUS", f"{BENCH_USER_PREFIX}1", None, None, None]),
+        ("product_list", LIST_QUERY, [limit, 0]),
+        ("product_search", SEARCH_PRODUCT_QUERY, ["steel"]),
+    ]
+
+
+def time_statement(make_cursor, sql, params, iterations):
+    latencies = []
+    with make_cursor() as cursor:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            latencies.append(round((time.perf_counter() - start) * 1000, 3))
+    latencies.sort()
+    return {
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the login, product list and product search statements on one connection "
+        "with and without server-side preparation and writes the latency of each as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000, help="Executions per statement and mode")
+        parser.add_argument("--limit", type=int, default=50, help="Page size of the list statement")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+
+    def handle(self, *args, **options):
+        if psycopg is None or connection.vendor != "postgresql":
+            raise CommandError("Prepared statements need PostgreSQL with psycopg 3.")
+        if not dataset_counts()["users"]:
+            raise CommandError("No bench users found; run 'manage.py bench_seed' first.")
+
+        results = []
+        for name, sql, params in statements(options["limit"]):
+            # the first prepared execution pays for PREPARE; keep it out of the numbers
+            for mode, make_cursor in (("unprepared", connection.cursor), ("prepared", PreparedCursor)):
+                time_statement(make_cursor, sql, params, 5)
+                stats = time_statement(make_cursor, sql, params, options["iterations"])
+                results.append({"statement": name, "mode": mode, **stats})
+                self.stderr.write(f"{name:<15} {mode:<11} mean={stats['mean_ms']} "
+                                  f"p50={stats['p50_ms']} p95={stats['p95_ms']} ms")
+
+        report = {
+            "benchmark": "prepared_statements",
+            "python": platform.python_version(),
+            "iterations": options["iterations"],
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(output + "\n")
+        else:
+            self.stdout.write(output)
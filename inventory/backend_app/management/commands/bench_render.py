@@ -0,0 +1,65 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from backend_app.renderers import ORJSONRenderer, orjson
+from backend_app.services.pagination import LIST_LAYOUTS
+from backend_app.services.product_service import list_products
+
+RENDERERS = {"drf": JSONRenderer(), "orjson": ORJSONRenderer()}
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders product list pages (GET /api/products/ bodies) of --sizes rows with "
+        "DRF's JSONRenderer and the orjson renderer, per ?layout=, and reports the "
+        "median render time, body size and speed-up as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="100,1000,10000", help="Comma separated page sizes")
+        parser.add_argument("--layouts", default=",".join(LIST_LAYOUTS), help="Comma separated ?layout= values")
+        parser.add_argument("--repeat", type=int, default=20, help="Renders per renderer (median is reported)")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed (pip install orjson); both renderers would be DRF's.")
+        layouts = options["layouts"].split(",")
+        unknown = set(layouts) - set(LIST_LAYOUTS)
+        if unknown:
+            raise CommandError(f"Unknown layout(s): {', '.join(sorted(unknown))}")
+
+        results = []
+        for size in (int(s) for s in options["sizes"].split(",")):
+            for layout in layouts:
+                page = list_products(limit=size, row_factory=LIST_LAYOUTS[layout])
+                timings = {}
+                bodies = {}
+                for name, renderer in RENDERERS.items():
+                    samples = []
+                    for _ in range(options["repeat"]):
+                        start = time.perf_counter()
+                        bodies[name] = renderer.render(page)
+                        samples.append(time.perf_counter() - start)
+                    timings[name] = statistics.median(samples) * 1000
+                if bodies["drf"] != bodies["orjson"]:
+                    raise CommandError(f"Bodies differ for {size} rows, layout '{layout}'.")
+
+                result = {
+                    "rows": size,
+                    "layout": layout,
+                    "body_bytes": len(bodies["drf"]),
+                    "drf_ms": round(timings["drf"], 2),
+                    "orjson_ms": round(timings["orjson"], 2),
+                    "speedup": round(timings["drf"] / timings["orjson"], 1),
+                }
+                results.append(result)
+                self.stderr.write(
+                    f"{size:>6} rows {layout:<8} {result['body_bytes']:>9} B  drf={result['drf_ms']} ms  "
+                    f"orjson={result['orjson_ms']} ms  x{result['speedup']}"
+                )
+
+        self.stdout.write(json.dumps({"benchmark": "json_rendering", "results": results}, indent=2))
@@ -0,0 +1,83 @@
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from backend_app.services.db import TupleRows, execute_query
+
+FACTORIES = ("dict", "tuple", "record", "columnar")
+
+# product-shaped rows without depending on the size of the catalog
+ROWS_QUERY = """
+    SELECT g AS id, 'Product ' || g AS name, (g %% 1000 + 0.99)::numeric(10, 2) AS price,
+           g %% 500 AS quantity, g %% 200 + 1 AS supplier_id, g %% 300 + 1 AS category_id,
+           TRUE AS status, 'bench' AS created_by, NULL::text AS updated_by,
+           NULL::text AS update_reason, NULL::text AS product_image, 1 AS version
+    FROM generate_series(1, %s) AS g
+"""
+
+
+def payload(rows):
+    """The list response body for each shape, as the views return it."""
+    if isinstance(rows, TupleRows):
+        return {"results": rows, "columns": rows.columns}
+    return {"results": rows}
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetches a product-shaped result of --rows rows (default 100k) with each "
+        "execute_query row factory and reports fetch time, JSON render time and "
+        "memory (tracemalloc) per factory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000)
+        parser.add_argument("--repeat", type=int, default=3, help="Timed runs per factory (median is reported)")
+        parser.add_argument("--factories", default=",".join(FACTORIES))
+        parser.add_argument("--no-render", action="store_true", help="Skip the JSON rendering step")
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        results = []
+        for factory in options["factories"].split(","):
+            fetch_times, render_times, body_size = [], [], None
+            for _ in range(options["repeat"]):
+                gc.collect()
+                start = time.perf_counter()
+                rows = execute_query(ROWS_QUERY, [options["rows"]], fetch=True, row_factory=factory)
+                fetch_times.append(time.perf_counter() - start)
+                if not options["no_render"]:
+                    start = time.perf_counter()
+                    body_size = len(renderer.render(payload(rows)))
+                    render_times.append(time.perf_counter() - start)
+                del rows
+
+            # memory in a separate run: tracemalloc slows everything down
+            gc.collect()
+            tracemalloc.start()
+            rows = execute_query(ROWS_QUERY, [options["rows"]], fetch=True, row_factory=factory)
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del rows
+
+            result = {
+                "row_factory": factory,
+                "rows": options["rows"],
+                "fetch_ms": round(statistics.median(fetch_times) * 1000, 1),
+                "render_ms": round(statistics.median(render_times) * 1000, 1) if render_times else None,
+                "body_bytes": body_size,
+                "retained_mb": round(retained / 2 ** 20, 1),
+                "peak_mb": round(peak / 2 ** 20, 1),
+            }
+            results.append(result)
+            self.stderr.write(
+                f"{factory:<9} fetch={result['fetch_ms']} ms  render={result['render_ms']} ms  "
+                f"retained={result['retained_mb']} MB  peak={result['peak_mb']} MB"
+            )
+
+        self.stdout.write(json.dumps({"benchmark": "row_factories", "results": results}, indent=2))
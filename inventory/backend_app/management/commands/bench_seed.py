@@ -0,0 +1,42 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend_app.bench.dataset import reset_dataset, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a synthetic catalog in the configured Postgres database for the "
+        "benchmarks (e.g. --products 1000000 --categories 5000 --suppliers 2000)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=100000)
+        parser.add_argument("--categories", type=int, default=2000)
+        parser.add_argument("--suppliers", type=int, default=1000)
+        parser.add_argument("--users", type=int, default=20,
+                            help="bench_user_<n> accounts for the login scenario")
+        parser.add_argument("--password", default="Bench@12345", help="Password of the bench users")
+        parser.add_argument("--batch-size", type=int, default=50000, help="Products per INSERT statement")
+        parser.add_argument("--reset", action="store_true", help="Delete the existing synthetic data first")
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            reset_dataset()
+            self.stderr.write("Removed the previous synthetic data")
+
+        try:
+            counts = seed_dataset(
+                options["products"],
+                options["categories"],
+                options["suppliers"],
+                users=options["users"],
+                password=options["password"],
+                batch_size=options["batch_size"],
+                progress=lambda done, total: self.stderr.write(f"products: {done}/{total}"),
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(json.dumps({"dataset": counts}, indent=2))
@@ -0,0 +1,114 @@
+import json
+import threading
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from backend_app.bench.dataset import BENCH_MARKER, BENCH_USER_PREFIX
+from backend_app.bench.load import fetch_token, http_request, run_load
+from backend_app.services.db import execute_query
+
+MODES = ("adjust", "versioned_put", "naive_put")
+
+HOT_SKUS_QUERY = """
+    SELECT id FROM tbl_products
+    WHERE created_by = %s AND status = TRUE
+    ORDER BY id LIMIT %s
+"""
+RESET_STOCK_QUERY = "UPDATE tbl_products SET quantity = %s WHERE id = ANY(%s)"
+STOCK_QUERY = "SELECT id, name, price, quantity, version FROM tbl_products WHERE id = ANY(%s)"
+
+
+class Command(BaseCommand):
+    help = (
+        "Many parallel pickers decrement a few hot SKUs of the bench catalog on a running "
+        "server. 'adjust' uses the atomic adjust-stock endpoint, 'versioned_put' reads and "
+        "PUTs with the row version (retrying on 409), 'naive_put' reads and PUTs blindly. "
+        "Reports latency, retries and lost updates per mode as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--password", default="Bench@12345", help="Password of the bench users")
+        parser.add_argument("--modes", default=",".join(MODES), help=f"Comma separated, from: {', '.join(MODES)}")
+        parser.add_argument("--skus", type=int, default=4, help="Number of hot products")
+        parser.add_argument("--concurrency", default="32", help="Comma separated client concurrency levels")
+        parser.add_argument("--requests", type=int, default=2000, help="Decrements per mode and level")
+        parser.add_argument("--max-retries", type=int, default=50, help="Retries per versioned PUT on 409")
+
+    def handle(self, *args, **options):
+        modes = options["modes"].split(",")
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown mode(s): {', '.join(sorted(unknown))}")
+
+        skus = [row["id"] for row in execute_query(HOT_SKUS_QUERY, [BENCH_MARKER, options["skus"]], fetch=True)]
+        if not skus:
+            raise CommandError("No bench products found; run 'manage.py bench_seed' first.")
+        base_url = options["base_url"].rstrip("/")
+        token = fetch_token(base_url, f"{BENCH_USER_PREFIX}1", options["password"])
+        headers = {"Authorization": f"Bearer {token}"}
+
+        results = []
+        for mode in modes:
+            for concurrency in (int(c) for c in options["concurrency"].split(",")):
+                # enough stock that the floor never stops a decrement
+                start_quantity = options["requests"] + 1
+                execute_query(RESET_STOCK_QUERY, [start_quantity, skus])
+                applied, retries = Counter(), Counter()
+                lock = threading.Lock()
+
+                def request(i, mode=mode, applied=applied, retries=retries, lock=lock):
+                    product_id = skus[i % len(skus)]
+                    status, body = self.decrement(mode, base_url, headers, product_id, options["max_retries"], retries, lock)
+                    if status == 200:
+                        with lock:
+                            applied[product_id] += 1
+                    return status, body
+
+                stats = run_load(request, concurrency, options["requests"])
+                final = {row["id"]: row["quantity"] for row in execute_query(STOCK_QUERY, [skus], fetch=True)}
+                lost = sum(final[sku] - (start_quantity - applied[sku]) for sku in skus)
+                results.append({
+                    "mode": mode,
+                    "concurrency": concurrency,
+                    "skus": len(skus),
+                    "lost_updates": lost,
+                    "conflict_retries": sum(retries.values()),
+                    **stats,
+                })
+                self.stderr.write(
+                    f"{mode:<14} c={concurrency:<4} {stats['throughput_rps']} req/s  "
+                    f"p50={stats['p50_ms']} p95={stats['p95_ms']} ms  errors={stats['errors']}  "
+                    f"retries={sum(retries.values())}  lost_updates={lost}"
+                )
+
+        self.stdout.write(json.dumps({"benchmark": "stock_contention", "results": results}, indent=2))
+
+    def decrement(self, mode, base_url, headers, product_id, max_retries, retries, lock):
+        url = f"{base_url}/api/products/{product_id}/"
+        if mode == "adjust":
+            body = {"delta": -1, "updated_by": BENCH_MARKER, "update_reason": "benchmark"}
+            return http_request(url + "adjust-stock/", "POST", body, headers)
+
+        for attempt in range(max_retries + 1):
+            # the read half of read-modify-write, as a client holding a stale copy would do
+            row = execute_query(STOCK_QUERY, [[product_id]], fetch=True)[0]
+            # load threads are short-lived: hand the connection back to the pool
+            connection.close()
+            body = {
+                "name": row["name"],
+                "price": str(row["price"]),
+                "quantity": row["quantity"] - 1,
+                "updated_by": BENCH_MARKER,
+                "update_reason": "benchmark",
+            }
+            if mode == "versioned_put":
+                body["version"] = row["version"]
+            status, payload = http_request(url, "PUT", body, headers)
+            if status != 409:
+                return status, payload
+            with lock:
+                retries[product_id] += 1
+        return status, payload
@@ -0,0 +1,63 @@
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from backend_app.services import media_service
+from backend_app.services.cache_service import bump_version
+from backend_app.services.db import execute_query
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates missing thumbnail/WebP variants for stored product images. "
+        "With --migrate-legacy, images saved under their upload name are first "
+        "moved to content-addressed paths (duplicates collapse into one file)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--migrate-legacy", action="store_true")
+
+    def handle(self, *args, **options):
+        if media_service.Image is None:
+            raise CommandError("Pillow is required to generate image variants (pip install Pillow).")
+
+        paths = [
+            row["product_image"]
+            for row in execute_query(
+                "SELECT DISTINCT product_image FROM tbl_products WHERE product_image IS NOT NULL AND product_image <> ''",
+                fetch=True,
+            )
+        ]
+
+        if options["migrate_legacy"]:
+            paths = [self.migrate(path) for path in paths]
+            bump_version("products")
+
+        futures = [f for f in map(media_service.schedule_variants, set(paths)) if f is not None]
+        written = sum(len(f.result()) for f in futures if f.exception() is None)
+        failed = sum(1 for f in futures if f.exception() is not None)
+        self.stdout.write(f"{len(futures)} image(s) checked, {written} variant file(s) written, {failed} failed")
+
+    def migrate(self, relative):
+        """Moves one legacy upload to its content address and repoints the products."""
+        if media_service.CONTENT_ADDRESSED_RE.match(relative):
+            return relative
+        source = os.path.join(settings.MEDIA_ROOT, relative)
+        if not os.path.isfile(source):
+            self.stderr.write(f"missing file, skipped: {relative}")
+            return relative
+
+        with open(source, "rb") as fh:
+            new_path = media_service.store_upload(
+                File(fh, name=os.path.basename(relative)),
+                os.path.dirname(relative) or "products",
+                variants=False,
+            )
+        execute_query(
+            "UPDATE tbl_products SET product_image = %s WHERE product_image = %s", [new_path, relative]
+        )
+        os.unlink(source)
+        self.stdout.write(f"{relative} -> {new_path}")
+        return new_path
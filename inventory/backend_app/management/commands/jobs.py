@@ -0,0 +1,49 @@
+import json
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend_app.services import job_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Background job queue: 'work' runs a worker pool in this process, "
+        "'stats' counts jobs per status, 'dead' lists dead letters, "
+        "'retry' re-queues dead letters and 'purge' deletes finished jobs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["work", "stats", "dead", "retry", "purge"])
+        parser.add_argument("--workers", type=int, help="Worker threads for 'work' (default JOB_QUEUE_WORKERS)")
+        parser.add_argument("--id", type=int, help="Job id for 'retry' (default: every dead job)")
+        parser.add_argument("--limit", type=int, default=100, help="Rows shown by 'dead'")
+        parser.add_argument("--older-than", type=int, default=7 * 24 * 3600,
+                            help="Seconds since completion for 'purge'")
+
+    def handle(self, *args, **options):
+        action = options["action"]
+
+        if action == "work":
+            stop = threading.Event()
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            job_queue.start_workers(options["workers"])
+            self.stderr.write("Job workers started, Ctrl+C to stop")
+            try:
+                while not stop.wait(1):
+                    pass
+            except KeyboardInterrupt:
+                pass
+            job_queue.stop_workers(timeout=30)
+        elif action == "stats":
+            self.stdout.write(json.dumps(job_queue.queue_stats(), indent=2))
+        elif action == "dead":
+            self.stdout.write(json.dumps(job_queue.dead_letters(options["limit"]), indent=2))
+        elif action == "retry":
+            count = job_queue.retry_dead(options["id"])
+            if options["id"] is not None and not count:
+                raise CommandError(f"No dead job with id {options['id']}")
+            self.stdout.write(f"Re-queued {count} job(s)")
+        elif action == "purge":
+            self.stdout.write(f"Deleted {job_queue.purge_done(options['older_than'])} finished job(s)")
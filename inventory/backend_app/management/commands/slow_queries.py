@@ -0,0 +1,144 @@
+import json
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend_app.bench.load import percentile
+from backend_app.services.db import execute_query
+
+SORT_KEYS = {
+    "total": lambda g: g["total_ms"],
+    "max": lambda g: g["max_ms"],
+    "p95": lambda g: g["p95_ms"],
+    "count": lambda g: g["count"],
+}
+
+# Statements executed inside sp_* procedures do not show up in an EXPLAIN of
+# the procedure call; pg_stat_statements (track = all) does record them.
+NESTED_STATEMENTS_QUERY = """
+    SELECT calls, round(total_exec_time::numeric, 1) AS total_ms,
+           round(mean_exec_time::numeric, 2) AS mean_ms, rows,
+           shared_blks_read, left(regexp_replace(query, '\\s+', ' ', 'g'), 300) AS query
+    FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+      AND toplevel = FALSE
+    ORDER BY total_exec_time DESC
+    LIMIT %s
+"""
+
+
+def plan_nodes(node, found=None):
+    """Flattens an EXPLAIN JSON plan into 'Node Type on relation (rows, ms)' strings."""
+    found = [] if found is None else found
+    label = node.get("Node Type", "?")
+    if node.get("Relation Name"):
+        label += f" on {node['Relation Name']}"
+    if node.get("Index Name"):
+        label += f" using {node['Index Name']}"
+    if node.get("Function Name"):
+        label += f" {node['Function Name']}()"
+    found.append(f"{label} (rows={node.get('Actual Rows')}, {node.get('Actual Total Time')} ms)")
+    for child in node.get("Plans", []):
+        plan_nodes(child, found)
+    return found
+
+
+class Command(BaseCommand):
+    help = "Summarises the slow query log (SLOW_QUERY_LOG) by query shape, worst first."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--sort", choices=sorted(SORT_KEYS), default="total")
+        parser.add_argument("--since-hours", type=float, help="Only entries newer than this")
+        parser.add_argument("--file", help="Log file (default SLOW_QUERY_LOG)")
+        parser.add_argument("--json", action="store_true", help="Machine-readable output")
+        parser.add_argument("--nested", action="store_true",
+                            help="Also list the slowest statements run inside procedures (pg_stat_statements)")
+
+    def handle(self, *args, **options):
+        path = options["file"] or settings.SLOW_QUERY_LOG
+        since = None
+        if options["since_hours"]:
+            since = datetime.now(timezone.utc) - timedelta(hours=options["since_hours"])
+
+        groups = {}
+        try:
+            with open(path) as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if since and datetime.fromisoformat(entry["ts"]) < since:
+                        continue
+                    group = groups.setdefault(entry["fingerprint"], {
+                        "fingerprint": entry["fingerprint"],
+                        "shape": entry["shape"],
+                        "durations": [],
+                        "call_sites": Counter(),
+                        "worst_plan": None,
+                        "worst_plan_ms": -1,
+                    })
+                    group["durations"].append(entry["duration_ms"])
+                    group["call_sites"][entry.get("call_site")] += 1
+                    if entry.get("plan") and entry["duration_ms"] > group["worst_plan_ms"]:
+                        group["worst_plan"], group["worst_plan_ms"] = entry["plan"], entry["duration_ms"]
+        except FileNotFoundError:
+            raise CommandError(f"No slow query log at {path} (is SLOW_QUERY_MS set?)")
+
+        summary = []
+        for group in groups.values():
+            durations = sorted(group["durations"])
+            plan = group["worst_plan"]
+            summary.append({
+                "fingerprint": group["fingerprint"],
+                "count": len(durations),
+                "total_ms": round(sum(durations), 1),
+                "avg_ms": round(sum(durations) / len(durations), 1),
+                "p95_ms": percentile(durations, 95),
+                "max_ms": durations[-1],
+                "call_sites": dict(group["call_sites"].most_common(5)),
+                "shape": group["shape"],
+                "plan_nodes": plan_nodes(plan["Plan"]) if plan and "Plan" in plan else None,
+                "plan_buffers": (
+                    {k: v for k, v in plan["Plan"].items() if k.startswith("Shared")}
+                    if plan and "Plan" in plan else None
+                ),
+            })
+        summary.sort(key=SORT_KEYS[options["sort"]], reverse=True)
+        summary = summary[: options["top"]]
+
+        nested = self.nested_statements(options["top"]) if options["nested"] else None
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"shapes": summary, "nested": nested}, indent=2, default=str))
+            return
+
+        for i, group in enumerate(summary, 1):
+            self.stdout.write(
+                f"{i}. [{group['fingerprint']}] count={group['count']} total={group['total_ms']} ms "
+                f"avg={group['avg_ms']} p95={group['p95_ms']} max={group['max_ms']}"
+            )
+            self.stdout.write(f"   {group['shape'][:300]}")
+            for site, count in group["call_sites"].items():
+                self.stdout.write(f"   at {site} ({count}x)")
+            for node in group["plan_nodes"] or []:
+                self.stdout.write(f"   plan: {node}")
+        if nested is not None:
+            self.stdout.write("\nStatements inside procedures (pg_stat_statements):")
+            for row in nested:
+                self.stdout.write(f"   {row['total_ms']} ms total, {row['calls']} calls, "
+                                  f"{row['mean_ms']} ms avg: {row['query']}")
+
+    def nested_statements(self, limit):
+        try:
+            return execute_query(NESTED_STATEMENTS_QUERY, [limit], fetch=True)
+        except Exception as e:
+            self.stderr.write(
+                f"pg_stat_statements is not available ({e.__class__.__name__}); enable it with "
+                "shared_preload_libraries = 'pg_stat_statements', pg_stat_statements.track = all "
+                "and CREATE EXTENSION pg_stat_statements."
+            )
+            return []
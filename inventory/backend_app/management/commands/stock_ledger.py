@@ -0,0 +1,42 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend_app.services import stock_ledger_service
+
+
+class Command(BaseCommand):
+    help = (
+        "Stock movement ledger maintenance: 'snapshot' builds the daily stock snapshots "
+        "up to yesterday (run daily), 'partitions' creates the monthly movement partitions "
+        "ahead of time (run monthly) and 'verify' lists products whose ledger balance "
+        "differs from tbl_products.quantity."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["snapshot", "partitions", "verify"])
+        parser.add_argument("--through", help="Last day to snapshot, YYYY-MM-DD (default: yesterday, UTC)")
+        parser.add_argument("--months-ahead", type=int,
+                            help="Months of partitions to keep ready (default STOCK_LEDGER_PARTITION_MONTHS_AHEAD)")
+        parser.add_argument("--limit", type=int, default=100, help="Rows shown by 'verify'")
+
+    def handle(self, *args, **options):
+        action = options["action"]
+
+        if action == "snapshot":
+            through = None
+            if options["through"]:
+                try:
+                    through = date.fromisoformat(options["through"])
+                except ValueError:
+                    raise CommandError("--through must be a YYYY-MM-DD date.")
+            done = stock_ledger_service.build_snapshots(through)
+            self.stdout.write(json.dumps({"snapshotted": done}, indent=2))
+        elif action == "partitions":
+            self.stdout.write(json.dumps(stock_ledger_service.ensure_partitions(options["months_ahead"]), indent=2))
+        else:
+            mismatches = stock_ledger_service.verify_balances(options["limit"])
+            self.stdout.write(json.dumps({"mismatches": mismatches}, indent=2, default=str))
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} product(s) out of balance.")
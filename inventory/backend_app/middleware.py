@@ -1,41 +1,108 @@
+import json
 import logging
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
 import jwt
-import datetime
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from django.http import JsonResponse
+from . import profiling
 from .exception import (
     DatabaseFetchError,
     APICallingError,
     ValidationError,
+    InvalidFileFormatError,
+    ConcurrencyConflictError,
+    InsufficientStockError,
 )
 logger = logging.getLogger("django")
+auth_logger = logging.getLogger("backend_app.auth")
+profiling_logger = logging.getLogger("backend_app.profiling")
+
+# Paths that never need a token: media files and the auth endpoints.
+# Compiled once at import instead of rebuilding a list on every request.
+EXEMPT_PATH_PREFIXES = (
+    "/media/",
+    "/api/login/",
+    "/api/register/",
+    "/api/token/refresh/",
+    "/api/send-otp/",
+    "/api/reset-password/",
+)
+EXEMPT_PATH_RE = re.compile("|".join(re.escape(prefix) for prefix in EXEMPT_PATH_PREFIXES))
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already verified JWTs, keyed by the raw token string.
+    A hit skips the signature check; entries are dropped once `exp` passes,
+    so an expired token is always decoded again (and rejected) by PyJWT.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            payload = self._entries.get(token)
+            if payload is None:
+                return None
+            if payload.get("exp", 0) <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return payload
+
+    def put(self, token, payload):
+        if self.maxsize <= 0 or "exp" not in payload:
+            return
+        with self._lock:
+            self._entries[token] = payload
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
 class CustomExceptionMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        self.token_cache = VerifiedTokenCache(getattr(settings, "JWT_TOKEN_CACHE_SIZE", 1024))
+        self.debug_payload = getattr(settings, "JWT_DEBUG_PAYLOAD", False)
 
-    def __call__(self, request):
+    def decode_token(self, token):
+        """Returns the verified payload, from the cache when possible."""
+        payload = self.token_cache.get(token)
+        if payload is None:
+            payload = jwt.decode(
+                token,
+                settings.SECRET_KEY,
+                algorithms=["HS256"],
+            )
+            self.token_cache.put(token, payload)
+        return payload
+
+    def authenticate(self, request):
         """
-        Middleware entry point:
-        - JWT authentication
-        - Attach user_id to request
+        JWT authentication: attaches user_id to the request and returns None,
+        or returns the 401 response to send back. Pure CPU work, so it is shared
+        by the sync and async request paths.
         """
         # ---------------- JWT AUTH LOGIC ----------------
-        exempt_urls = [
-            "/api/login/",
-            "/api/register/",
-            "/api/token/refresh/",
-            "/api/send-otp/",
-            "/api/reset-password/",
-        ]
-
-
-        # Allow media files without auth
-        if request.path.startswith("/media/"):
-            return self.get_response(request)
-
-        # Allow exempt URLs without token
-        if any(request.path.startswith(url) for url in exempt_urls):
-            return self.get_response(request)
+        # Allow media files and exempt URLs without token
+        if EXEMPT_PATH_RE.match(request.path):
+            return None
 
         # Get Authorization header
         auth_header = request.headers.get("Authorization")
@@ -52,25 +119,14 @@ class CustomExceptionMiddleware:
         token = auth_header.split(" ")[1]
 
         try:
-            payload = jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=["HS256"],
-            )
-            # Debug logs (terminal visibility)
-            exp_time = datetime.datetime.fromtimestamp(
-                payload["exp"]
-            ).strftime("%Y-%m-%d %H:%M:%S")
-
-            iat_time = datetime.datetime.fromtimestamp(
-                payload["iat"]
-            ).strftime("%Y-%m-%d %H:%M:%S")
+            payload = self.decode_token(token)
 
-            print("----------------------------")
-            print(f"JWT PAYLOAD: {payload}")
-            print(f"Issued At (IST): {iat_time}")
-            print(f"Expires At (IST): {exp_time}")
-            print("----------------------------")
+            # Debug logs, opt-in via JWT_DEBUG_PAYLOAD
+            if self.debug_payload:
+                auth_logger.debug(
+                    "JWT payload: %s (iat=%s, exp=%s)",
+                    payload, payload.get("iat"), payload.get("exp"),
+                )
 
             # Attach user_id to request
             request.user_id = payload.get("user_id")
@@ -86,8 +142,29 @@ class CustomExceptionMiddleware:
                 status=401,
             )
 
+        return None
+
+    def __call__(self, request):
+        """
+        Middleware entry point:
+        - JWT authentication
+        - Attach user_id to request
+        """
+        if self.is_async:
+            return self.__acall__(request)
+
+        error_response = self.authenticate(request)
+        if error_response is not None:
+            return error_response
         return self.get_response(request)
 
+    async def __acall__(self, request):
+        """ASGI entry point, so async views are not forced back onto a thread."""
+        error_response = self.authenticate(request)
+        if error_response is not None:
+            return error_response
+        return await self.get_response(request)
+
     def process_exception(self, request, exception):
         """
         Centralized exception handling
@@ -108,6 +185,14 @@ class CustomExceptionMiddleware:
             status_code = 400
             message = f"Input Error: {str(exception)}"
 
+        elif isinstance(exception, InvalidFileFormatError):
+            status_code = 400
+            message = f"File Error: {str(exception)}"
+
+        elif isinstance(exception, (ConcurrencyConflictError, InsufficientStockError)):
+            status_code = 409
+            message = f"Conflict: {str(exception)}"
+
         else:
             status_code = 500
             message = "This is an unexpected error. Please contact support."
@@ -120,3 +205,89 @@ class CustomExceptionMiddleware:
             },
             status=status_code,
         )
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in (PROFILING_ENABLED) request instrumentation: wall time, number and
+    total time of database queries, and response render time. Reported in a
+    Server-Timing header and, for a sample of requests (and every request
+    slower than PROFILING_SLOW_REQUEST_MS), as one JSON log line.
+    Listed first in MIDDLEWARE so the other middleware is included in `total`.
+    For streaming responses only the time until the response is returned is
+    measured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        self.sample_rate = getattr(settings, "PROFILING_LOG_SAMPLE_RATE", 0.01)
+        self.slow_ms = getattr(settings, "PROFILING_SLOW_REQUEST_MS", 1000)
+        profiling.install_db_hook()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        profile, token = profiling.start_profile()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiling.end_profile(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile, token = profiling.start_profile()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiling.end_profile(token)
+        return self.finish(request, response, profile)
+
+    def process_template_response(self, request, response):
+        """DRF responses are rendered after the view returns; time that step."""
+        profile = profiling.current_profile()
+        if profile is not None:
+            profile.render_start = time.perf_counter()
+            response.add_post_render_callback(lambda r: self.render_done(profile))
+        return response
+
+    @staticmethod
+    def render_done(profile):
+        profile.render_time += time.perf_counter() - profile.render_start
+
+    def finish(self, request, response, profile):
+        total_ms = profile.elapsed() * 1000
+        db_ms = profile.db_time * 1000
+        render_ms = profile.render_time * 1000
+        app_ms = max(total_ms - db_ms - render_ms, 0.0)
+
+        response["Server-Timing"] = (
+            f'total;dur={total_ms:.1f}, '
+            f'db;dur={db_ms:.1f};desc="queries={profile.db_queries}", '
+            f'render;dur={render_ms:.1f}, '
+            f'app;dur={app_ms:.1f}'
+        )
+
+        if total_ms >= self.slow_ms or random.random() < self.sample_rate:
+            match = getattr(request, "resolver_match", None)
+            profiling_logger.info(json.dumps({
+                "event": "request_profile",
+                "method": request.method,
+                "route": match.route if match else None,
+                "path": request.path,
+                "status": response.status_code,
+                "total_ms": round(total_ms, 2),
+                "db_ms": round(db_ms, 2),
+                "db_queries": profile.db_queries,
+                "render_ms": round(render_ms, 2),
+                "app_ms": round(app_ms, 2),
+                "slow": total_ms >= self.slow_ms,
+            }))
+        return response
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+# The inventory tables are created by the SQL scripts, not by Django models,
+# so the supporting indexes for keyset pagination are added with raw SQL.
+# Sorting by `id` already uses the primary key.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = []
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS idx_products_name_id ON tbl_products (name, id) WHERE status = TRUE;",
+            "DROP INDEX IF EXISTS idx_products_name_id;",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS idx_categories_name_id ON tbl_categories (name, id);",
+            "DROP INDEX IF EXISTS idx_categories_name_id;",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS idx_suppliers_name_id ON tbl_suppliers (name, id);",
+            "DROP INDEX IF EXISTS idx_suppliers_name_id;",
+        ),
+    ]
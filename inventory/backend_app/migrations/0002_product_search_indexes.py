@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Indexes behind /api/products/search/ and /api/products/autocomplete/.
+#   - trigram GIN index: substring (ILIKE '%q%') and fuzzy word matches
+#   - lower(name) COLLATE "C" btree: prefix LIKE and ordered autocomplete scans
+#   - category/supplier btrees: search filters
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend_app', '0001_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON tbl_products "
+            "USING gin (name gin_trgm_ops) WHERE status = TRUE;",
+            "DROP INDEX IF EXISTS idx_products_name_trgm;",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS idx_products_name_prefix ON tbl_products "
+            "(lower(name) COLLATE \"C\", id) WHERE status = TRUE;",
+            "DROP INDEX IF EXISTS idx_products_name_prefix;",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS idx_products_category_id ON tbl_products (category_id);",
+            "DROP INDEX IF EXISTS idx_products_category_id;",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS idx_products_supplier_id ON tbl_products (supplier_id);",
+            "DROP INDEX IF EXISTS idx_products_supplier_id;",
+        ),
+    ]
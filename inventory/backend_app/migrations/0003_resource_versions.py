@@ -0,0 +1,27 @@
+from django.db import migrations
+
+# One row per cacheable resource. bump_version() increments it on every write,
+# so all workers agree on the current version (the Django cache may be per
+# process) and HTTP ETags can be computed without running the page query.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend_app", "0002_product_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            CREATE TABLE IF NOT EXISTS tbl_resource_versions (
+                resource VARCHAR(50) PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 1
+            );
+            INSERT INTO tbl_resource_versions (resource)
+            VALUES ('products'), ('categories'), ('suppliers')
+            ON CONFLICT (resource) DO NOTHING;
+            """,
+            "DROP TABLE IF EXISTS tbl_resource_versions;",
+        ),
+    ]
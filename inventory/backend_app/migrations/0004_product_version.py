@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Row version for optimistic concurrency on product updates. A BEFORE UPDATE
+# trigger increments it, so every write path (the sp_update_* procedure, bulk
+# updates, stock adjustments) bumps it without having to remember to.
+# The column has a constant default, so adding it does not rewrite the table.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend_app", "0003_resource_versions"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            ALTER TABLE tbl_products ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+            CREATE OR REPLACE FUNCTION fn_products_bump_version() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.version := OLD.version + 1;
+                RETURN NEW;
+            END
+            $$;
+
+            DROP TRIGGER IF EXISTS trg_products_version ON tbl_products;
+            CREATE TRIGGER trg_products_version
+                BEFORE UPDATE ON tbl_products
+                FOR EACH ROW EXECUTE FUNCTION fn_products_bump_version();
+            """,
+            """
+            DROP TRIGGER IF EXISTS trg_products_version ON tbl_products;
+            DROP FUNCTION IF EXISTS fn_products_bump_version();
+            ALTER TABLE tbl_products DROP COLUMN IF EXISTS version;
+            """,
+        ),
+    ]
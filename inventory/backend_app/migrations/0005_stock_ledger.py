@@ -0,0 +1,175 @@
+from django.db import migrations
+
+# Append-only stock movement ledger.
+#
+# tbl_stock_movements is range partitioned by month on moved_at; a DEFAULT
+# partition catches rows for months nobody created yet, and
+# fn_stock_movements_ensure_partition() creates a month (moving any such rows
+# over). 'manage.py stock_ledger partitions' keeps a few months ready ahead.
+#
+# An AFTER INSERT/UPDATE OF quantity trigger on tbl_products writes one
+# movement per quantity change, whatever the write path (stored procedures,
+# bulk update, adjust-stock), and keeps tbl_stock_balances up to date by the
+# same delta. The movement type, reference and location come from
+# transaction-local settings (inventory.movement_*) when the application sets
+# them for a single-row update; the trigger clears them once used, so later
+# statements in the same transaction fall back to 'adjustment' ('receipt' for
+# a new product).
+#
+# tbl_stock_snapshots holds the end-of-day (UTC) quantity of every product
+# that moved that day; 'manage.py stock_ledger snapshot' fills it day by day.
+# Stock as of a date is the product's last snapshot plus the movements since.
+
+FORWARD = """
+CREATE TABLE IF NOT EXISTS tbl_stock_movements (
+    id              BIGSERIAL,
+    product_id      INTEGER NOT NULL,
+    movement_type   VARCHAR(20) NOT NULL
+                    CHECK (movement_type IN ('receipt', 'sale', 'adjustment', 'transfer')),
+    quantity_delta  INTEGER NOT NULL,
+    balance_after   INTEGER NOT NULL,
+    location        TEXT,
+    reference       TEXT,
+    reason          TEXT,
+    created_by      TEXT,
+    moved_at        TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, moved_at)
+) PARTITION BY RANGE (moved_at);
+
+CREATE INDEX IF NOT EXISTS idx_stock_movements_product_moved
+    ON tbl_stock_movements (product_id, moved_at, id);
+
+CREATE TABLE IF NOT EXISTS tbl_stock_movements_default
+    PARTITION OF tbl_stock_movements DEFAULT;
+
+CREATE TABLE IF NOT EXISTS tbl_stock_balances (
+    product_id        INTEGER PRIMARY KEY,
+    quantity          INTEGER NOT NULL,
+    movement_count    BIGINT NOT NULL,
+    last_movement_at  TIMESTAMPTZ NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tbl_stock_snapshots (
+    product_id      INTEGER NOT NULL,
+    snapshot_date   DATE NOT NULL,
+    quantity        INTEGER NOT NULL,
+    PRIMARY KEY (product_id, snapshot_date)
+);
+
+CREATE TABLE IF NOT EXISTS tbl_stock_snapshot_runs (
+    snapshot_date   DATE PRIMARY KEY,
+    products        INTEGER NOT NULL,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION fn_stock_movements_ensure_partition(p_month DATE) RETURNS TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start TIMESTAMPTZ := date_trunc('month', p_month)::timestamp AT TIME ZONE 'UTC';
+    month_end   TIMESTAMPTZ := (date_trunc('month', p_month) + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC';
+    part_name   TEXT := 'tbl_stock_movements_' || to_char(p_month, 'YYYY_MM');
+BEGIN
+    IF to_regclass(part_name) IS NOT NULL THEN
+        RETURN part_name;
+    END IF;
+    -- rows that landed in the default partition for this month move over
+    CREATE TEMPORARY TABLE tmp_stock_movements_moved ON COMMIT DROP AS
+        WITH moved AS (
+            DELETE FROM tbl_stock_movements_default
+            WHERE moved_at >= month_start AND moved_at < month_end
+            RETURNING *
+        )
+        SELECT * FROM moved;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF tbl_stock_movements FOR VALUES FROM (%L) TO (%L)',
+        part_name, month_start, month_end
+    );
+    INSERT INTO tbl_stock_movements SELECT * FROM tmp_stock_movements_moved;
+    DROP TABLE tmp_stock_movements_moved;
+    RETURN part_name;
+END
+$$;
+
+SELECT fn_stock_movements_ensure_partition((current_date + make_interval(months => m))::date)
+FROM generate_series(0, 3) AS m;
+
+CREATE OR REPLACE FUNCTION fn_products_stock_movement() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    delta INTEGER;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        delta := COALESCE(NEW.quantity, 0);
+    ELSE
+        delta := COALESCE(NEW.quantity, 0) - COALESCE(OLD.quantity, 0);
+    END IF;
+    IF delta = 0 THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO tbl_stock_movements
+        (product_id, movement_type, quantity_delta, balance_after, location, reference, reason, created_by)
+    VALUES (
+        NEW.id,
+        COALESCE(NULLIF(current_setting('inventory.movement_type', true), ''),
+                 CASE WHEN TG_OP = 'INSERT' THEN 'receipt' ELSE 'adjustment' END),
+        delta,
+        COALESCE(NEW.quantity, 0),
+        NULLIF(current_setting('inventory.movement_location', true), ''),
+        NULLIF(current_setting('inventory.movement_reference', true), ''),
+        NEW.update_reason,
+        COALESCE(NEW.updated_by, NEW.created_by)
+    );
+    PERFORM set_config('inventory.movement_type', '', true),
+            set_config('inventory.movement_location', '', true),
+            set_config('inventory.movement_reference', '', true);
+
+    INSERT INTO tbl_stock_balances AS b (product_id, quantity, movement_count, last_movement_at)
+    VALUES (NEW.id, delta, 1, now())
+    ON CONFLICT (product_id) DO UPDATE
+        SET quantity = b.quantity + delta,
+            movement_count = b.movement_count + 1,
+            last_movement_at = now();
+    RETURN NULL;
+END
+$$;
+
+-- opening balances: the ledger starts from today's quantities
+INSERT INTO tbl_stock_movements
+    (product_id, movement_type, quantity_delta, balance_after, reference, created_by)
+SELECT id, 'adjustment', quantity, quantity, 'opening balance', 'system'
+FROM tbl_products
+WHERE COALESCE(quantity, 0) <> 0;
+
+INSERT INTO tbl_stock_balances (product_id, quantity, movement_count, last_movement_at)
+SELECT id, quantity, 1, now()
+FROM tbl_products
+WHERE COALESCE(quantity, 0) <> 0
+ON CONFLICT (product_id) DO NOTHING;
+
+DROP TRIGGER IF EXISTS trg_products_stock_movement ON tbl_products;
+CREATE TRIGGER trg_products_stock_movement
+    AFTER INSERT OR UPDATE OF quantity ON tbl_products
+    FOR EACH ROW EXECUTE FUNCTION fn_products_stock_movement();
+"""
+
+REVERSE = """
+DROP TRIGGER IF EXISTS trg_products_stock_movement ON tbl_products;
+DROP FUNCTION IF EXISTS fn_products_stock_movement();
+DROP FUNCTION IF EXISTS fn_stock_movements_ensure_partition(DATE);
+DROP TABLE IF EXISTS tbl_stock_snapshot_runs;
+DROP TABLE IF EXISTS tbl_stock_snapshots;
+DROP TABLE IF EXISTS tbl_stock_balances;
+DROP TABLE IF EXISTS tbl_stock_movements;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend_app", "0004_product_version"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD, REVERSE),
+    ]
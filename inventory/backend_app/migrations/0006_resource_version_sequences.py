@@ -0,0 +1,47 @@
+from django.db import migrations
+
+# Resource versions move from rows of tbl_resource_versions to one sequence per
+# resource. Bumping a row serialized every concurrent write of a resource on
+# that row's lock (and cost a commit); nextval() takes no lock and is not
+# rolled back, so bump_version() calls it after the writing transaction has
+# committed (transaction.on_commit). Sequences continue from the row versions,
+# so ETags issued before the migration never match again by accident.
+
+FORWARD = """
+CREATE SEQUENCE IF NOT EXISTS seq_resource_version_products;
+CREATE SEQUENCE IF NOT EXISTS seq_resource_version_categories;
+CREATE SEQUENCE IF NOT EXISTS seq_resource_version_suppliers;
+
+SELECT setval('seq_resource_version_' || r.resource, COALESCE(v.version, 0) + 1)
+FROM (VALUES ('products'), ('categories'), ('suppliers')) AS r (resource)
+LEFT JOIN tbl_resource_versions v ON v.resource = r.resource;
+
+DROP TABLE IF EXISTS tbl_resource_versions;
+"""
+
+REVERSE = """
+CREATE TABLE IF NOT EXISTS tbl_resource_versions (
+    resource VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1
+);
+INSERT INTO tbl_resource_versions (resource, version) VALUES
+    ('products', (SELECT last_value FROM seq_resource_version_products)),
+    ('categories', (SELECT last_value FROM seq_resource_version_categories)),
+    ('suppliers', (SELECT last_value FROM seq_resource_version_suppliers))
+ON CONFLICT (resource) DO UPDATE SET version = EXCLUDED.version;
+
+DROP SEQUENCE IF EXISTS seq_resource_version_products;
+DROP SEQUENCE IF EXISTS seq_resource_version_categories;
+DROP SEQUENCE IF EXISTS seq_resource_version_suppliers;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend_app", "0005_stock_ledger"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD, REVERSE),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+# The grouped category connections read at most a few active products per
+# category, in id order (a LATERAL ... LIMIT per category): this index serves
+# that seek, and the "has any active product" check, without a scan.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend_app", "0006_resource_version_sequences"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS idx_products_category_active_id ON tbl_products (category_id, id) WHERE status = TRUE;",
+            "DROP INDEX IF EXISTS idx_products_category_active_id;",
+        ),
+    ]
@@ -0,0 +1,70 @@
+import time
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+
+# ---------------- REQUEST PROFILING ----------------
+# State for ProfilingMiddleware (backend_app/middleware.py). The profile of
+# the current request lives in a ContextVar, so it follows the request into
+# sync_to_async threads and async views. Database time is collected by an
+# execute wrapper installed on every Django connection (which covers
+# execute_query, stream_query and raw connection.cursor() use) and by
+# async_db.async_execute_query for the psycopg async pool.
+
+_current = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    __slots__ = ("start", "db_time", "db_queries", "render_start", "render_time")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.render_start = None
+        self.render_time = 0.0
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+
+def start_profile():
+    """Starts profiling the current request; returns (profile, reset token)."""
+    profile = RequestProfile()
+    return profile, _current.set(profile)
+
+
+def end_profile(token):
+    _current.reset(token)
+
+
+def current_profile():
+    return _current.get()
+
+
+def record_query(duration):
+    """Adds one query of `duration` seconds to the current request, if profiled."""
+    profile = _current.get()
+    if profile is not None:
+        profile.db_queries += 1
+        profile.db_time += duration
+
+
+def _timed_execute(execute, sql, params, many, context):
+    if _current.get() is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record_query(time.perf_counter() - start)
+
+
+def _install_wrapper(sender, connection, **kwargs):
+    if _timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_timed_execute)
+
+
+def install_db_hook():
+    """Times every query on Django connections opened from now on."""
+    connection_created.connect(_install_wrapper, dispatch_uid="backend_app.profiling")
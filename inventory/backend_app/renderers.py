@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - DRF's json-based rendering is used instead
+    orjson = None
+
+# ---------------- FAST JSON RENDERING ----------------
+# orjson serializes dicts, lists (TupleRows included), tuples, datetimes,
+# dates, times and UUIDs in C. Only what it does not know reaches _default:
+# Decimal (raw SQL numeric columns) becomes a float exactly as DRF's encoder
+# does, everything else (lazy strings, records, timedeltas...) goes through
+# DRF's encoder, so bodies are the same as with rest_framework's JSONRenderer.
+
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z) if orjson else 0
+
+_drf_default = JSONEncoder().default
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return _drf_default(obj)
+
+
+def dumps(data):
+    """Compact UTF-8 JSON bytes for `data`, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    return JSONRenderer().render(data)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer backed by orjson. Indented
+    output (the browsable API, or '; indent=N' in Accept) and installs
+    without orjson fall back to the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        # same escaping as DRF: U+2028/U+2029 are valid JSON but not valid JavaScript
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -8,6 +8,10 @@ class ProductCreateSerializer(serializers.Serializer):
     category_id = serializers.IntegerField()
     created_by = serializers.CharField()
     product_image = serializers.FileField(required=False, allow_null=True)
+# ---------------- BULK IMPORT ROW ----------------
+class ProductImportRowSerializer(ProductCreateSerializer):
+    # images cannot be part of a CSV/NDJSON import
+    product_image = None
 # ---------------- UPDATE ----------------
 class ProductUpdateSerializer(serializers.Serializer):
     name = serializers.CharField(required=False)
@@ -20,6 +24,8 @@ class ProductUpdateSerializer(serializers.Serializer):
     product_image = serializers.FileField(required=False, allow_null=True)    # 🔥 ALWAYS REQUIRED (PUT + PATCH)
     updated_by = serializers.CharField(required=True)
     update_reason = serializers.CharField(required=True)
+    # version the client read; when given, a concurrent change makes the update fail with 409
+    version = serializers.IntegerField(required=False, min_value=1)
 
     def validate(self, attrs):
         """
@@ -33,4 +39,42 @@ class ProductUpdateSerializer(serializers.Serializer):
             raise serializers.ValidationError({
                 "update_reason": "This field is required while updating product."
             })
-        return attrs
\ No newline at end of file
+        return attrs
+# ---------------- STOCK ADJUSTMENT ----------------
+class ProductStockAdjustSerializer(serializers.Serializer):
+    delta = serializers.IntegerField()
+    allow_negative = serializers.BooleanField(default=False)
+    updated_by = serializers.CharField()
+    update_reason = serializers.CharField(required=False, default="Stock adjustment")
+    # how the change is booked in the stock ledger
+    movement_type = serializers.ChoiceField(choices=("receipt", "sale", "adjustment"), default="adjustment")
+    reference = serializers.CharField(required=False, allow_null=True, default=None)
+
+    def validate_delta(self, value):
+        if value == 0:
+            raise serializers.ValidationError("delta must not be zero.")
+        return value
+
+# ---------------- BULK UPDATE ----------------
+class ProductBulkUpdateItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField(min_value=1)
+    name = serializers.CharField(required=False)
+    price = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        required=False
+    )
+    # same floor as adjust_stock: a bulk update never sets negative stock
+    quantity = serializers.IntegerField(required=False, min_value=0)
+
+    def validate(self, attrs):
+        if not {"name", "price", "quantity"} & set(attrs):
+            raise serializers.ValidationError("Give at least one of name, price or quantity.")
+        return attrs
+
+
+class ProductBulkUpdateSerializer(serializers.Serializer):
+    # items are validated one by one in the service so each gets its own result
+    items = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+    updated_by = serializers.CharField()
+    update_reason = serializers.CharField()
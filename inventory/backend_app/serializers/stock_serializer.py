@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+from backend_app.services.stock_ledger_service import MOVEMENT_TYPES
+
+# ---------------- STOCK MOVEMENT ----------------
+class StockMovementSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField(min_value=1)
+    movement_type = serializers.ChoiceField(choices=MOVEMENT_TYPES)
+    # receipt/sale/transfer: units moved (> 0); adjustment: signed change
+    quantity = serializers.IntegerField()
+    created_by = serializers.CharField()
+    reference = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    reason = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    location = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    to_location = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    allow_negative = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if attrs["quantity"] == 0:
+            raise serializers.ValidationError({"quantity": "quantity must not be zero."})
+        if attrs["movement_type"] != "adjustment" and attrs["quantity"] < 0:
+            raise serializers.ValidationError({"quantity": "Only adjustments take a negative quantity."})
+        if attrs["movement_type"] == "transfer" and not (attrs.get("location") and attrs.get("to_location")):
+            raise serializers.ValidationError("A transfer needs 'location' and 'to_location'.")
+        return attrs
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from backend_app.profiling import record_query
+from backend_app.services import slow_query
+
+try:
+    import psycopg
+    from psycopg.rows import dict_row, tuple_row
+except ImportError:  # pragma: no cover - only the async endpoints need it
+    psycopg = None
+
+try:
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:  # pragma: no cover
+    AsyncConnectionPool = None
+
+# ---------------- ASYNC DATABASE ACCESS ----------------
+# Used by the ASGI read endpoints (views/async_views.py). Queries run on
+# psycopg 3 async connections, so a single event loop can keep many requests
+# waiting on Postgres at once instead of blocking one worker per request.
+
+_pool = None
+_pool_lock = None
+
+
+def _conninfo():
+    db = settings.DATABASES["default"]
+    return psycopg.conninfo.make_conninfo(
+        dbname=db["NAME"],
+        user=db.get("USER") or None,
+        password=db.get("PASSWORD") or None,
+        host=db.get("HOST") or None,
+        port=db.get("PORT") or None,
+    )
+
+
+async def get_async_pool():
+    """Lazily opens the per-process async connection pool on the running loop."""
+    global _pool, _pool_lock
+    if psycopg is None or AsyncConnectionPool is None:
+        raise ImproperlyConfigured("The async endpoints require 'psycopg' and 'psycopg_pool'.")
+
+    if _pool is None:
+        if _pool_lock is None:
+            _pool_lock = asyncio.Lock()
+        async with _pool_lock:
+            if _pool is None:
+                pool = AsyncConnectionPool(
+                    _conninfo(),
+                    min_size=getattr(settings, "ASYNC_DB_POOL_MIN_SIZE", 2),
+                    max_size=getattr(settings, "ASYNC_DB_POOL_MAX_SIZE", 20),
+                    timeout=getattr(settings, "ASYNC_DB_POOL_TIMEOUT", 10),
+                    kwargs={"row_factory": dict_row},
+                    open=False,
+                )
+                await pool.open()
+                _pool = pool
+    return _pool
+
+
+def current_async_pool():
+    """The async pool if this process has opened it, else None (for pool stats)."""
+    return _pool
+
+
+async def async_execute_query(query, params=None, fetch=False):
+    """Async counterpart of db.execute_query (same %s placeholders, rows as dicts)."""
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        async with conn.cursor() as cursor:
+            start = time.perf_counter()
+            try:
+                await cursor.execute(query, params)
+                if fetch:
+                    return await cursor.fetchall()
+            finally:
+                duration = time.perf_counter() - start
+                record_query(duration)
+                # no EXPLAIN here: it would need a sync connection
+                slow_query.record(query, params, duration, can_explain=False)
+
+
+async def async_stream_batches(query, params=None, batch_size=None):
+    """
+    Async counterpart of db.stream_batches: yields (columns, tuple rows) per
+    round trip of a named (server-side) cursor. The pooled connection is held
+    until the iterator is exhausted or closed.
+    """
+    batch_size = batch_size or getattr(settings, "DB_STREAM_BATCH_SIZE", 2000)
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        # named cursors only live inside a transaction
+        async with conn.transaction():
+            async with conn.cursor(name="async_stream", row_factory=tuple_row) as cursor:
+                await cursor.execute(query, params)
+                columns = None
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    if columns is None:
+                        columns = [col.name for col in cursor.description]
+                    yield columns, rows
@@ -0,0 +1,85 @@
+from django.conf import settings
+
+from .async_db import async_execute_query
+from .cache_service import acached
+from .counting import build_window_query, pop_window_count
+from .pagination import build_keyset_query, keyset_result
+from .search_service import build_search_query
+from .media_service import attach_image_variants
+from .dashboard_service import (
+    DASHBOARD_CACHE_KEY,
+    DASHBOARD_RESOURCES,
+    DASHBOARD_STATS_QUERY,
+    dashboard_query_params,
+    dashboard_stats_from_row,
+)
+from backend_app.exception import DatabaseFetchError, ProductAppError
+
+# Async versions of the read services. They build exactly the same SQL as the
+# sync services and only differ in how the query is awaited.
+
+
+async def alist_products(limit=5, offset=0):
+    """Page/limit listing with the total folded in via COUNT(*) OVER ()."""
+    try:
+        sql, params = build_window_query("sp_read_get_product()", [], limit, offset)
+        data = await async_execute_query(sql, params, fetch=True)
+        total_count = pop_window_count(data)
+        if total_count is None:
+            res = await async_execute_query(
+                "SELECT COUNT(*) AS count FROM tbl_products WHERE status = TRUE", fetch=True
+            )
+            total_count = res[0]["count"]
+    except Exception as e:
+        raise DatabaseFetchError(f"Error fetching product list: {str(e)}")
+
+    if not data and offset == 0:
+        raise DatabaseFetchError("No products found in the database.")
+
+    attach_image_variants(data)
+    return {
+        "results": data,
+        "total_count": total_count,
+        "total_count_exact": True,
+        "count_strategy": "window",
+    }
+
+
+async def alist_products_keyset(cursor=None, limit=5, sort="id"):
+    sql, params = build_keyset_query(
+        "tbl_products", sort, cursor, limit, where="status = TRUE", sort_keys=("id", "name")
+    )
+    try:
+        rows = await async_execute_query(sql, params, fetch=True)
+    except ProductAppError:
+        raise
+    except Exception as e:
+        raise DatabaseFetchError(f"Error fetching product list: {str(e)}")
+    page = keyset_result(rows, sort, limit)
+    attach_image_variants(page["results"])
+    return page
+
+
+async def asearch_products(query, limit=20, cursor=None, category_id=None, supplier_id=None):
+    sql, params = build_search_query(query, limit, cursor, category_id, supplier_id)
+    try:
+        rows = await async_execute_query(sql, params, fetch=True)
+    except Exception as e:
+        raise DatabaseFetchError(f"Search operation failed: {str(e)}")
+    page = keyset_result(rows, "rank", limit)
+    attach_image_variants(page["results"])
+    return page
+
+
+async def aget_dashboard_stats():
+    """Shares its cache entries with dashboard_service.get_dashboard_stats()."""
+    async def fetch():
+        res = await async_execute_query(DASHBOARD_STATS_QUERY, dashboard_query_params(), fetch=True)
+        return dashboard_stats_from_row(res[0])
+
+    return await acached(
+        DASHBOARD_CACHE_KEY,
+        DASHBOARD_RESOURCES,
+        fetch,
+        timeout=getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 30),
+    )
@@ -2,11 +2,16 @@ import jwt
 import bcrypt
 import re
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.conf import settings
-from django.core.mail import send_mail
-from backend_app.services.db import execute_query
+from backend_app.services.db import execute_pipeline, execute_query, prepared
+from backend_app.services.mail_service import queue_otp_email
+
+# every login, OTP and reset goes through this procedure: prepared once per connection
+USER_ACCESS_QUERY = prepared("SELECT * FROM sp_user_access_manager(%s, %s, %s, %s, %s)")
 
 # ---------------- PASSWORD UTILS ----------------
 def validate_password(password):
@@ -20,14 +25,54 @@ def validate_password(password):
     return True, ""
 
 def hash_password(password):
-    """Hashes the password using bcrypt."""
-    salt = bcrypt.gensalt()
+    """Hashes the password using bcrypt at the configured cost (BCRYPT_ROUNDS)."""
+    salt = bcrypt.gensalt(rounds=getattr(settings, "BCRYPT_ROUNDS", 12))
     return bcrypt.hashpw(password.encode(), salt).decode()
 
 def check_password(password, hashed_password):
     """Verifies the plain password against the hashed password."""
     return bcrypt.checkpw(password.encode(), hashed_password.encode())
 
+def hash_rounds(hashed_password):
+    """Cost factor stored in a bcrypt hash ($2b$<rounds>$...)."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+# ---------------- BCRYPT EXECUTOR ----------------
+# bcrypt releases the GIL, so checks run on a small dedicated pool. The pool
+# size caps how many CPU cores a login storm can take from the rest of the
+# API, and the semaphore caps how many logins may queue for it.
+_bcrypt_executor = None
+_bcrypt_slots = None
+_executor_lock = threading.Lock()
+
+def _get_bcrypt_executor():
+    global _bcrypt_executor, _bcrypt_slots
+    if _bcrypt_executor is None:
+        with _executor_lock:
+            if _bcrypt_executor is None:
+                workers = getattr(settings, "BCRYPT_MAX_WORKERS", 4)
+                _bcrypt_slots = threading.BoundedSemaphore(
+                    workers + getattr(settings, "BCRYPT_MAX_PENDING", 32)
+                )
+                _bcrypt_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    return _bcrypt_executor
+
+def run_bcrypt(fn, *args):
+    """
+    Runs a bcrypt call on the bounded executor and waits for it.
+    Returns None when every slot stays busy for BCRYPT_QUEUE_TIMEOUT seconds.
+    """
+    executor = _get_bcrypt_executor()
+    if not _bcrypt_slots.acquire(timeout=getattr(settings, "BCRYPT_QUEUE_TIMEOUT", 5)):
+        return None
+    try:
+        return executor.submit(fn, *args).result()
+    finally:
+        _bcrypt_slots.release()
+
 # ---------------- JWT ----------------
 def generate_tokens(user_id, role): 
     """Generates Access and Refresh tokens with user details and role."""
@@ -75,11 +120,37 @@ def register_user(data):
     return {"message": res[0]['res_message']}, res[0]['res_code']
 
 
+# Used to store a re-hashed password when BCRYPT_ROUNDS changes
+# (guarded on the old hash so a concurrent password reset is never overwritten)
+PASSWORD_REHASH_QUERY = "UPDATE tbl_users SET password = %s WHERE id = %s AND password = %s"
+
+def _rehash_statement(user_id, password, hashed_password):
+    """
+    The UPDATE that upgrades the stored hash when BCRYPT_ROUNDS changed, while
+    the plain password is still in hand, or None. Hashes on the bcrypt
+    executor like the check; when it is saturated the upgrade simply waits
+    for a later login.
+    """
+    if hash_rounds(hashed_password) == getattr(settings, "BCRYPT_ROUNDS", 12):
+        return None
+    new_hash = run_bcrypt(hash_password, password)
+    if new_hash is None:
+        return None
+    return (PASSWORD_REHASH_QUERY, [new_hash, user_id, hashed_password], None)
+
 def login_user(username, password):
-    """Handles user login, unlocks status, and verifies credentials."""
+    """
+    Handles user login, unlocks status, and verifies credentials.
+    Two round trips: GET_STATUS for the hash, then UPDATE_ATTEMPT, which
+    records the attempt and returns the user (or the lockout state). A
+    re-hash is pipelined with UPDATE_ATTEMPT rather than sent on its own.
+    They cannot be merged into one: the attempt is recorded with the bcrypt
+    result, which needs the hash from the first call (checking inside
+    Postgres would move bcrypt off the bounded executor).
+    """
     # 1. GET_STATUS: Retrieve user info and current lockout status
     res = execute_query(
-        "SELECT * FROM sp_user_access_manager(%s, %s, %s, %s, %s)", 
+        USER_ACCESS_QUERY,
         [username, 'GET_STATUS', None, None, None], 
         fetch=True
     )    
@@ -100,15 +171,18 @@ def login_user(username, password):
     if not hashed_password:
         return {"error": "Invalid credentials"}, 401
         
-    # Verify the password
-    is_match = check_password(password, hashed_password)
-    
+    # Verify the password on the bounded bcrypt executor
+    is_match = run_bcrypt(check_password, password, hashed_password)
+    if is_match is None:
+        return {"error": "Login service is busy, please retry."}, 503
+
     # 2. UPDATE_ATTEMPT: Log the successful or failed login attempt in DB
-    upd_res = execute_query(
-        "SELECT * FROM sp_user_access_manager(%s, %s, %s, %s, %s)", 
-        [username, 'UPDATE_ATTEMPT', is_match, None, None], 
-        fetch=True
-    )
+    statements = [(USER_ACCESS_QUERY, [username, 'UPDATE_ATTEMPT', is_match, None, None], "dict")]
+    if is_match:
+        rehash = _rehash_statement(user_st.get('user_id'), password, hashed_password)
+        if rehash is not None:
+            statements.append(rehash)
+    upd_res = execute_pipeline(statements)[0]
     
     if is_match:
             # 1. સાચો રોલ મેળવો (upd_res માંથી લેવો વધુ સુરક્ષિત છે)
@@ -140,16 +214,19 @@ def login_user(username, password):
 
 
 def send_otp(email):
-    """Generates a random OTP, saves it in DB, and sends it via email."""
+    """
+    Generates a random OTP, saves it in DB, and queues the email.
+    The response does not wait for the mail server (see mail_service).
+    """
     otp = str(random.randint(100000, 999999)) 
     res = execute_query(
-        "SELECT * FROM sp_user_access_manager(%s, %s, %s, %s, %s)", 
+        USER_ACCESS_QUERY,
         [email, 'SET_OTP', None, otp, None], 
         fetch=True
     )
 
     if res[0]['res_code'] == 200:
-        send_mail("Reset OTP", f"Your OTP is {otp}", settings.EMAIL_HOST_USER, [email])
+        queue_otp_email(email, "password_reset")
         return {"message": "OTP sent successfully"}, 200
     return {"error": res[0]['res_message']}, res[0]['res_code']
 
@@ -159,7 +236,7 @@ def reset_password_with_otp(email, otp_input, new_password):
     hashed_pw = hash_password(new_password)
     # 4. VERIFY_RESET: Verify provided OTP and update password if correct
     res = execute_query(
-        "SELECT * FROM sp_user_access_manager(%s, %s, %s, %s, %s)", 
+        USER_ACCESS_QUERY,
         [email, 'VERIFY_RESET', None, otp_input, hashed_pw], fetch=True
     )
     return {"message": res[0]['res_message']}, res[0]['res_code']
\ No newline at end of file
@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.db import connection, transaction
+
+from .cache_service import bump_version
+from backend_app.serializers.product_serializer import ProductBulkUpdateItemSerializer
+from backend_app.exception import DatabaseUpdateError, ValidationError
+
+# ---------------- BULK PRODUCT UPDATE ----------------
+# A stock-take sends thousands of {id, name|price|quantity} changes at once.
+# Valid items are passed as parallel arrays and unnested into one
+# UPDATE ... FROM, so the whole batch is a single statement and a single
+# commit instead of one sp_update_update_product call per product. Fields an
+# item leaves out keep their current value. The rows are locked in id order
+# first, so two overlapping batches wait for each other instead of deadlocking.
+
+CHANGES_CTE = """
+    WITH changes AS (
+        SELECT * FROM unnest(%s::integer[], %s::text[], %s::numeric[], %s::integer[])
+            AS c(id, name, price, quantity)
+    )
+"""
+
+LOCK_PRODUCTS_QUERY = """
+    SELECT id FROM tbl_products
+    WHERE id = ANY(%s) AND status = TRUE
+    ORDER BY id
+    FOR UPDATE
+"""
+
+BULK_UPDATE_QUERY = CHANGES_CTE + """
+    , updated AS (
+        UPDATE tbl_products p SET
+            name          = COALESCE(c.name, p.name),
+            price         = COALESCE(c.price, p.price),
+            quantity      = COALESCE(c.quantity, p.quantity),
+            updated_by    = %s,
+            update_reason = %s
+        FROM changes c
+        WHERE p.id = c.id AND p.status = TRUE
+        RETURNING p.id, p.name, p.price, p.quantity
+    )
+    SELECT c.id, u.id IS NOT NULL AS updated, u.name, u.price, u.quantity
+    FROM changes c
+    LEFT JOIN updated u ON u.id = c.id
+"""
+
+
+def _validate_items(items):
+    """Splits the request into valid changes and per-item errors, keyed by position."""
+    valid, errors, seen = [], {}, {}
+    for index, item in enumerate(items):
+        serializer = ProductBulkUpdateItemSerializer(data=item)
+        if not serializer.is_valid():
+            errors[index] = serializer.errors
+            continue
+        data = serializer.validated_data
+        if data["id"] in seen:
+            # UPDATE ... FROM applies only one of several changes to the same row
+            errors[index] = {"id": [f"Product {data['id']} is already changed by item {seen[data['id']]}."]}
+            continue
+        seen[data["id"]] = index
+        valid.append((index, data))
+    return valid, errors
+
+
+def bulk_update_products(items, updated_by, update_reason):
+    max_items = getattr(settings, "PRODUCT_BULK_UPDATE_MAX_ITEMS", 10000)
+    if len(items) > max_items:
+        raise ValidationError(f"At most {max_items} items can be updated per request.")
+
+    valid, errors = _validate_items(items)
+    rows = {}
+    if valid:
+        changes = [data for _, data in valid]
+        ids = [data["id"] for data in changes]
+        params = [
+            ids,
+            [data.get("name") for data in changes],
+            [data.get("price") for data in changes],
+            [data.get("quantity") for data in changes],
+            updated_by,
+            update_reason,
+        ]
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(LOCK_PRODUCTS_QUERY, [ids])
+                cursor.execute(BULK_UPDATE_QUERY, params)
+                rows = {row[0]: row for row in cursor.fetchall()}
+        except Exception as e:
+            raise DatabaseUpdateError(f"Bulk product update failed: {str(e)}")
+
+    results = {}
+    for index, item_errors in errors.items():
+        item = items[index]
+        results[index] = {"index": index, "id": item.get("id") if isinstance(item, dict) else None,
+                          "status": "invalid", "errors": item_errors}
+    for index, data in valid:
+        product_id, updated, name, price, quantity = rows[data["id"]]
+        if updated:
+            results[index] = {"index": index, "id": product_id, "status": "updated",
+                              "name": name, "price": price, "quantity": quantity}
+        else:
+            results[index] = {"index": index, "id": product_id, "status": "not_found"}
+    results = [results[index] for index in sorted(results)]
+
+    updated_count = sum(1 for r in results if r["status"] == "updated")
+    if updated_count:
+        bump_version("products")
+
+    return {
+        "updated": updated_count,
+        "failed": len(results) - updated_count,
+        "results": results,
+    }
+
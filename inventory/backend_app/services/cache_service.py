@@ -0,0 +1,110 @@
+import functools
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .async_db import async_execute_query
+from .db import execute_query, prepared
+
+logger = logging.getLogger("backend_app.cache")
+
+# ---------------- RESOURCE VERSIONS ----------------
+# Every cached value is keyed by the current version of the resources it was
+# built from. Write services bump the version, so stale entries are simply
+# never read again and expire on their own.
+# The versions live in Postgres - one sequence per resource (migration 0006),
+# advanced with nextval() (no row lock, so concurrent writers never queue on
+# it) - so a write in one worker invalidates the entries of every worker,
+# even with the per-process LocMemCache. conditional_on() publishes the
+# versions it tagged the response with (use_db_versions), and cached() keys
+# the body on exactly those, so a body is never served under a newer ETag.
+
+RESOURCES = ("products", "categories", "suppliers")
+
+BUMP_DB_VERSIONS_QUERY = "SELECT nextval(seq) FROM unnest(%s::regclass[]) AS seq"
+DB_VERSIONS_QUERY = prepared("""
+    SELECT (SELECT last_value FROM seq_resource_version_products) AS products,
+           (SELECT last_value FROM seq_resource_version_categories) AS categories,
+           (SELECT last_value FROM seq_resource_version_suppliers) AS suppliers
+""")
+
+_current_versions = ContextVar("db_versions", default=None)
+
+
+def _bump_now(resources):
+    # runs after the write is committed (or right away in autocommit): a
+    # failure here must not turn a successful write into an error response
+    try:
+        execute_query(BUMP_DB_VERSIONS_QUERY, [[f"seq_resource_version_{resource}" for resource in resources]])
+    except Exception:
+        logger.exception("Could not bump the version of %s; cached data may stay stale", ", ".join(resources))
+
+
+def bump_version(*resources):
+    """
+    Invalidates everything cached for the given resources (and their ETags)
+    once the current transaction commits - immediately outside one. Bumping
+    earlier would let a reader tag the old rows with the new version.
+    """
+    unknown = set(resources) - set(RESOURCES)
+    if unknown:
+        raise ValueError(f"Unknown resource(s): {', '.join(sorted(unknown))}")
+    transaction.on_commit(functools.partial(_bump_now, resources))
+
+
+def get_db_versions(resources):
+    """{resource: version} from Postgres in one round trip."""
+    versions = execute_query(DB_VERSIONS_QUERY, fetch=True)[0]
+    return {resource: versions[resource] for resource in resources}
+
+
+async def aget_db_versions(resources):
+    """Async twin of get_db_versions()."""
+    versions = (await async_execute_query(DB_VERSIONS_QUERY, fetch=True))[0]
+    return {resource: versions[resource] for resource in resources}
+
+
+@contextmanager
+def use_db_versions(versions):
+    """Makes cached() key on `versions` (already read, e.g. for an ETag) instead of reading them again."""
+    token = _current_versions.set(versions)
+    try:
+        yield
+    finally:
+        _current_versions.reset(token)
+
+
+def _known_versions(resources):
+    versions = _current_versions.get()
+    if versions is not None and all(resource in versions for resource in resources):
+        return versions
+    return None
+
+
+def _cache_key(key, resources, versions):
+    return f"{key}:{':'.join(str(versions[r]) for r in resources)}"
+
+
+def cached(key, resources, builder, timeout=None):
+    """Returns `builder()` cached under `key` for the current resource versions."""
+    versions = _known_versions(resources) or get_db_versions(resources)
+    full_key = _cache_key(key, resources, versions)
+    value = cache.get(full_key)
+    if value is None:
+        value = builder()
+        cache.set(full_key, value, timeout)
+    return value
+
+
+async def acached(key, resources, builder, timeout=None):
+    """Async twin of cached(); `builder` is a coroutine function. Shares the same entries."""
+    versions = _known_versions(resources) or await aget_db_versions(resources)
+    full_key = _cache_key(key, resources, versions)
+    value = await cache.aget(full_key)
+    if value is None:
+        value = await builder()
+        await cache.aset(full_key, value, timeout)
+    return value
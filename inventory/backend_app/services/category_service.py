@@ -1,46 +1,181 @@
-from .db import execute_query
+from django.conf import settings
+
+from .db import execute_query, prepared, stream_query
+from .pagination import decode_cursor, encode_cursor, keyset_page
+from .counting import paginated_query
+from .cache_service import bump_version, cached
 
 def create_category(data):
     execute_query(
         "SELECT sp_insert_add_category(%s, %s)",
         [data['name'], data['created_by']]
     )
+    bump_version("categories")
+
+def list_categories(limit=3, offset=0, count_strategy=None, row_factory="dict"):
+    return paginated_query(
+        "sp_read_get_category()",
+        [],
+        limit,
+        offset,
+        table="tbl_categories",
+        resource="categories",
+        strategy=count_strategy,
+        row_factory=row_factory,
+    )
 
-def list_categories(limit=3, offset=0):
-    data = execute_query(
-        "SELECT * FROM sp_read_get_category() LIMIT %s OFFSET %s",
-        [limit, offset],
-        fetch=True
+def list_categories_keyset(cursor=None, limit=3, sort="id", row_factory="dict"):
+    """Cursor pagination on the (sort, id) index, for clients paging deep."""
+    return keyset_page(
+        "tbl_categories",
+        sort,
+        cursor=cursor,
+        limit=limit,
+        sort_keys=("id", "name"),
+        row_factory=row_factory,
     )
-    count_res = execute_query("SELECT COUNT(*) FROM tbl_categories", fetch=True)
-    total_count = count_res[0]['count'] if count_res else 0
-    return {"results": data, "total_count": total_count}
 
 # --- NEW FUNCTION FOR VIEW CONNECTION FEATURE ---
+CATEGORY_CONNECTIONS_QUERY = """
+    SELECT 
+        c.name AS c_name, 
+        p.name AS p_name, 
+        s.name AS s_name
+    FROM tbl_products p
+    INNER JOIN tbl_categories c ON p.category_id = c.id
+    INNER JOIN tbl_suppliers s ON p.supplier_id = s.id
+"""
+
 def get_category_connections():
     """
     Fetch joined data from categories, products, and suppliers using Raw SQL.
     We use Aliases (c_name, p_name, s_name) to prevent key overwriting in React.
     """
-    query = """
-        SELECT 
-            c.name AS c_name, 
-            p.name AS p_name, 
-            s.name AS s_name
+    return execute_query(CATEGORY_CONNECTIONS_QUERY, fetch=True)
+
+def stream_category_connections():
+    """Same rows as get_category_connections(), yielded lazily from a server-side cursor."""
+    return stream_query(CATEGORY_CONNECTIONS_QUERY)
+
+# ---------------- GROUPED CONNECTIONS ----------------
+# The flat connection rows repeat the category and supplier name once per
+# product. The grouped shape pages over categories (keyset on id), nests at
+# most `products_limit` active products under each one with their supplier
+# id, and names every supplier once in a separate dictionary. A category with
+# more products carries `next_products_cursor`; the rest of its products are
+# paged with ?category_id=&products_cursor=. Pages are cached per resource
+# version, so any product, category or supplier write invalidates them.
+
+CONNECTION_RESOURCES = ["categories", "products", "suppliers"]
+
+# One extra category is looked up (not fetched) to know whether a next page
+# exists, and one extra product per category (LATERAL ... LIMIT, served by
+# idx_products_category_active_id) to know whether it has more.
+GROUPED_CONNECTIONS_QUERY = prepared("""
+    WITH page AS (
+        SELECT c.id, c.name
+        FROM tbl_categories c
+        WHERE c.id > %(after)s
+          AND (%(category_id)s::int IS NULL OR c.id = %(category_id)s)
+          AND EXISTS (SELECT 1 FROM tbl_products p WHERE p.category_id = c.id AND p.status = TRUE)
+        ORDER BY c.id
+        LIMIT %(limit)s + 1
+    )
+    SELECT c.id AS category_id, c.name AS category_name,
+           p.id AS product_id, p.name AS product_name,
+           s.id AS supplier_id, s.name AS supplier_name,
+           (SELECT COUNT(*) FROM page) > %(limit)s AS has_more
+    FROM (SELECT * FROM page ORDER BY id LIMIT %(limit)s) AS c
+    CROSS JOIN LATERAL (
+        SELECT p.id, p.name, p.supplier_id
         FROM tbl_products p
-        INNER JOIN tbl_categories c ON p.category_id = c.id
-        INNER JOIN tbl_suppliers s ON p.supplier_id = s.id
+        WHERE p.category_id = c.id AND p.status = TRUE AND p.id > %(products_after)s
+        ORDER BY p.id
+        LIMIT %(products_limit)s + 1
+    ) AS p
+    LEFT JOIN tbl_suppliers s ON s.id = p.supplier_id
+    ORDER BY c.id, p.id
+""")
+
+
+def group_connections(rows, products_limit):
     """
-    return execute_query(query, fetch=True)
+    Folds rows sorted by (category, product) into nested categories in one
+    pass; a category's look-ahead product only sets its products cursor.
+    """
+    categories, suppliers = [], {}
+    current = None
+    for row in rows:
+        if current is None or current["id"] != row["category_id"]:
+            current = {
+                "id": row["category_id"], "name": row["category_name"],
+                "supplier_ids": {}, "products": [], "next_products_cursor": None,
+            }
+            categories.append(current)
+        if len(current["products"]) == products_limit:
+            current["next_products_cursor"] = encode_cursor("id", current["products"][-1])
+            continue
+        supplier_id = row["supplier_id"]
+        current["products"].append({"id": row["product_id"], "name": row["product_name"], "supplier_id": supplier_id})
+        if supplier_id is not None:
+            current["supplier_ids"][supplier_id] = None
+            suppliers[supplier_id] = row["supplier_name"]
+    for category in categories:
+        category["supplier_ids"] = list(category["supplier_ids"])
+    return categories, suppliers
+
+
+def _fetch_grouped_connections(after, limit, products_limit, category_id=None, products_after=0):
+    rows = execute_query(
+        GROUPED_CONNECTIONS_QUERY,
+        {"after": after, "limit": limit, "category_id": category_id,
+         "products_after": products_after, "products_limit": products_limit},
+        fetch=True,
+    )
+    categories, suppliers = group_connections(rows, products_limit)
+    has_more = bool(rows) and rows[0]["has_more"]
+    return {
+        "results": categories,
+        "suppliers": suppliers,
+        "next_cursor": encode_cursor("id", categories[-1]) if has_more else None,
+        "limit": limit,
+        "products_limit": products_limit,
+    }
+
+
+def get_grouped_category_connections(cursor=None, limit=50, products_limit=20):
+    """One page of categories with their first products and a supplier dictionary."""
+    after = decode_cursor(cursor, "id")
+    after_id = after[1] if after else 0
+    return cached(
+        f"category_connections:{after_id}:{limit}:{products_limit}",
+        CONNECTION_RESOURCES,
+        lambda: _fetch_grouped_connections(after_id, limit, products_limit),
+        timeout=getattr(settings, "CATEGORY_CONNECTIONS_CACHE_TIMEOUT", 300),
+    )
+
+
+def get_category_connection_products(category_id, products_cursor=None, products_limit=20):
+    """The next products of one category, in the grouped shape (one category, no next_cursor)."""
+    after = decode_cursor(products_cursor, "id")
+    products_after = after[1] if after else 0
+    return cached(
+        f"category_connections:category:{category_id}:{products_after}:{products_limit}",
+        CONNECTION_RESOURCES,
+        lambda: _fetch_grouped_connections(0, 1, products_limit, category_id, products_after),
+        timeout=getattr(settings, "CATEGORY_CONNECTIONS_CACHE_TIMEOUT", 300),
+    )
 
 def update_category(id, data):
     execute_query(
         "SELECT sp_update_update_category(%s, %s, %s, %s)",
         [id, data['name'], data['updated_by'], data['update_reason']]
     )
+    bump_version("categories")
 
 def delete_category(id):
     execute_query(
         "SELECT sp_delete_delete_category(%s)",
         [id]
-    )
\ No newline at end of file
+    )
+    bump_version("categories")
@@ -0,0 +1,145 @@
+import json
+
+from django.conf import settings
+
+from .db import TupleRows, execute_query, execute_with_count
+from .cache_service import cached
+
+# ---------------- LIST TOTAL COUNTS ----------------
+# Strategies for the `total_count` returned with every list page:
+#   window   - COUNT(*) OVER () folded into the page query (one round trip, exact);
+#              tuple rows send the page and a COUNT(*) in one pipeline instead,
+#              so the driver's tuples never need the count column cut off
+#   cached   - exact COUNT(*) cached under the resource's Postgres version, so a
+#              write in any worker makes every worker count again
+#   estimate - planner estimate (no table scan, not exact): pg_class.reltuples
+#              for a whole table, the row estimate of EXPLAIN with a `where`
+#   exact    - the old behaviour, a separate COUNT(*) after the page query
+COUNT_STRATEGIES = ("window", "cached", "estimate", "exact")
+
+_WINDOW_COLUMN = "_total_count"
+
+
+def get_count_strategy(strategy=None):
+    strategy = strategy or getattr(settings, "LIST_COUNT_STRATEGY", "window")
+    if strategy not in COUNT_STRATEGIES:
+        raise ValueError(f"Unknown count strategy '{strategy}'")
+    return strategy
+
+
+def _exact_count(table, where):
+    where_sql = f" WHERE {where}" if where else ""
+    res = execute_query(f"SELECT COUNT(*) AS count FROM {table}{where_sql}", fetch=True)
+    return res[0]['count'] if res else 0
+
+
+def _cached_count(table, where, resource):
+    # keyed on get_db_versions() (see cache_service), not on a per-process counter
+    return cached(
+        f"count:{table}:{where or ''}",
+        [resource],
+        lambda: _exact_count(table, where),
+        timeout=getattr(settings, "LIST_COUNT_CACHE_TIMEOUT", 300),
+    )
+
+
+def _estimated_count(table, where):
+    """Planner estimate of the rows of `table` matching `where`; None without statistics."""
+    res = execute_query(
+        "SELECT reltuples::bigint AS count FROM pg_class WHERE oid = %s::regclass",
+        [table],
+        fetch=True
+    )
+    # reltuples is -1 until the table has been vacuumed/analyzed once
+    if not res or res[0]['count'] < 0:
+        return None
+    if not where:
+        return res[0]['count']
+    # reltuples counts every row; the plan's estimate applies the filter
+    plan = execute_query(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table} WHERE {where}", fetch=True, row_factory="tuple")
+    if not plan:
+        return None
+    plan = plan[0][0]
+    if isinstance(plan, str):  # psycopg2 returns the JSON unparsed
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def build_window_query(source, params, limit, offset):
+    """Page query with the total row count folded in as an extra column."""
+    sql = f"SELECT *, COUNT(*) OVER () AS {_WINDOW_COLUMN} FROM {source} LIMIT %s OFFSET %s"
+    return sql, list(params) + [limit, offset]
+
+
+def pop_window_count(rows):
+    """
+    Strips the window count column from dict or columnar `rows`; None when the
+    page is empty. Tuple rows are counted with execute_with_count instead.
+    """
+    if isinstance(rows, dict):
+        # columnar
+        counts = rows.pop(_WINDOW_COLUMN)
+        return counts[0] if counts else None
+    if not rows:
+        return None
+    total_count = rows[0][_WINDOW_COLUMN]
+    for row in rows:
+        del row[_WINDOW_COLUMN]
+    return total_count
+
+
+def paginated_query(source, params, limit, offset, table, resource, where=None, strategy=None,
+                    row_factory="dict"):
+    """
+    Runs `SELECT * FROM <source> LIMIT/OFFSET` and attaches the total count
+    using the configured strategy. `source`, `table` and `where` are trusted
+    SQL fragments supplied by the services. With the "tuple" row factory the
+    page also carries `columns`.
+    """
+    strategy = get_count_strategy(strategy)
+    exact = True
+
+    if strategy == "window" and row_factory == "tuple":
+        where_sql = f" WHERE {where}" if where else ""
+        data, total_count = execute_with_count(
+            f"SELECT * FROM {source} LIMIT %s OFFSET %s",
+            list(params) + [limit, offset],
+            f"SELECT COUNT(*) FROM {table}{where_sql}",
+            row_factory=row_factory,
+        )
+    elif strategy == "window":
+        sql, sql_params = build_window_query(source, params, limit, offset)
+        data = execute_query(sql, sql_params, fetch=True, row_factory=row_factory)
+        total_count = pop_window_count(data)
+        if total_count is None:
+            # Past the last page there is no row to carry the window count
+            total_count = _exact_count(table, where)
+    else:
+        data = execute_query(
+            f"SELECT * FROM {source} LIMIT %s OFFSET %s",
+            list(params) + [limit, offset],
+            fetch=True,
+            row_factory=row_factory,
+        )
+        if strategy == "cached":
+            total_count = _cached_count(table, where, resource)
+        elif strategy == "estimate":
+            total_count = _estimated_count(table, where)
+            if total_count is None:
+                # no statistics yet: an exact count, cached until the next write
+                total_count = _cached_count(table, where, resource)
+            else:
+                exact = False
+        else:
+            total_count = _exact_count(table, where)
+
+    page = {
+        "results": data,
+        "total_count": total_count,
+        "total_count_exact": exact,
+        "count_strategy": strategy,
+    }
+    if isinstance(data, TupleRows):
+        page["columns"] = data.columns
+        page["extra_columns"] = data.extra_columns
+    return page
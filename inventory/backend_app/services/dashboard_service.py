@@ -0,0 +1,80 @@
+from django.conf import settings
+
+from .db import execute_query
+from .cache_service import cached
+
+# All dashboard figures in one statement / one round trip.
+# Entity totals count every row (as before); stock figures only consider
+# active products (status = TRUE).
+DASHBOARD_STATS_QUERY = """
+    WITH product_stats AS (
+        SELECT
+            category_id,
+            COUNT(*) AS product_count,
+            COALESCE(SUM(quantity), 0) AS total_quantity,
+            COALESCE(SUM(price * quantity), 0) AS stock_value,
+            COUNT(*) FILTER (WHERE quantity > 0 AND quantity <= %s) AS low_stock,
+            COUNT(*) FILTER (WHERE quantity <= 0) AS out_of_stock
+        FROM tbl_products
+        WHERE status = TRUE
+        GROUP BY category_id
+    )
+    SELECT
+        (SELECT COUNT(*) FROM tbl_products) AS total_products,
+        (SELECT COUNT(*) FROM tbl_categories) AS total_categories,
+        (SELECT COUNT(*) FROM tbl_suppliers) AS total_suppliers,
+        (SELECT COALESCE(SUM(stock_value), 0) FROM product_stats) AS total_stock_value,
+        (SELECT COALESCE(SUM(low_stock), 0)::bigint FROM product_stats) AS low_stock_count,
+        (SELECT COALESCE(SUM(out_of_stock), 0)::bigint FROM product_stats) AS out_of_stock_count,
+        (
+            SELECT COALESCE(json_agg(json_build_object(
+                'category_id', c.id,
+                'category_name', c.name,
+                'product_count', COALESCE(ps.product_count, 0),
+                'total_quantity', COALESCE(ps.total_quantity, 0),
+                'stock_value', COALESCE(ps.stock_value, 0)
+            ) ORDER BY c.name), '[]'::json)
+            FROM tbl_categories c
+            LEFT JOIN product_stats ps ON ps.category_id = c.id
+        ) AS category_totals
+"""
+
+
+DASHBOARD_CACHE_KEY = "dashboard-stats"
+DASHBOARD_RESOURCES = ["products", "categories", "suppliers"]
+
+
+def dashboard_query_params():
+    return [getattr(settings, "LOW_STOCK_THRESHOLD", 10)]
+
+
+def dashboard_stats_from_row(row):
+    """Maps the aggregate row to the camelCase keys the React dashboard reads."""
+    return {
+        "totalProducts": row["total_products"],
+        "totalCategories": row["total_categories"],
+        "totalSuppliers": row["total_suppliers"],
+        "totalStockValue": row["total_stock_value"],
+        "lowStockCount": row["low_stock_count"],
+        "outOfStockCount": row["out_of_stock_count"],
+        "categoryTotals": row["category_totals"],
+    }
+
+
+def _fetch_dashboard_stats():
+    res = execute_query(DASHBOARD_STATS_QUERY, dashboard_query_params(), fetch=True)
+    return dashboard_stats_from_row(res[0])
+
+
+def get_dashboard_stats():
+    """
+    Dashboard figures, cached for DASHBOARD_CACHE_TIMEOUT seconds.
+    Product, category and supplier writes bump their version, which
+    invalidates the cached entry immediately.
+    """
+    return cached(
+        DASHBOARD_CACHE_KEY,
+        DASHBOARD_RESOURCES,
+        _fetch_dashboard_stats,
+        timeout=getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 30),
+    )
@@ -1,8 +1,296 @@
-from django.db import connection
+import contextlib
+import functools
+import keyword
+import logging
 
-def execute_query(query, params=None, fetch=False):
-    with connection.cursor() as cursor:
+from django.conf import settings
+from django.db import connection, transaction
+
+try:
+    import psycopg
+except ImportError:  # psycopg2: statements are never prepared
+    psycopg = None
+
+logger = logging.getLogger("backend_app.db")
+
+# ---------------- PREPARED STATEMENTS ----------------
+# Django binds parameters client-side, so Postgres parses and plans every
+# call again. Statements registered with prepared() are instead run on a plain
+# (server-side binding) psycopg cursor of the same connection with
+# prepare=True: psycopg prepares each one once per connection (kept for the
+# life of the pooled connection) and afterwards only sends EXECUTE.
+#
+# Only static module-level constants are registered. SQL built per request
+# (keyset, window and search builders) is not: every distinct string would
+# become one more registry entry and server-side statement. The registry is
+# capped at DB_PREPARED_STATEMENTS_MAX. psycopg keys its statements on the
+# query plus the parameter types it dumps (int2/int4/int8 depending on the
+# value, NULL), so one entry may use several of the connection's prepared_max
+# slots; when they run out, the least recently used statement is re-prepared
+# on its next call (an extra PREPARE, never an error).
+# Disable with DB_PREPARED_STATEMENTS = False behind PgBouncer in
+# transaction mode, where a statement may not exist on the next backend.
+
+PREPARED_STATEMENTS = set()
+
+
+def prepared(query):
+    """Registers a static hot statement for server-side preparation and returns it."""
+    if query not in PREPARED_STATEMENTS:
+        if len(PREPARED_STATEMENTS) >= getattr(settings, "DB_PREPARED_STATEMENTS_MAX", 50):
+            logger.warning("Prepared statement registry is full; running unprepared: %.80s", query)
+            return query
+        PREPARED_STATEMENTS.add(query)
+    return query
+
+
+class PreparedCursor:
+    """
+    A psycopg cursor on Django's connection that executes with prepare=True.
+    Django's execute wrappers (slow-query log, profiling) still apply; every
+    other attribute is the psycopg cursor's.
+    """
+
+    def __init__(self):
+        connection.close_if_health_check_failed()
+        connection.ensure_connection()
+        self.cursor = psycopg.Cursor(connection.connection)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cursor.close()
+
+    def execute(self, query, params=None):
+        execute = self._execute
+        for wrapper in reversed(connection.execute_wrappers):
+            execute = functools.partial(wrapper, execute)
+        with connection.wrap_database_errors:
+            return execute(query, params, False, {"connection": connection, "cursor": self})
+
+    def _execute(self, query, params, many, context):
+        connection.validate_no_broken_transaction()
+        return self.cursor.execute(query, params, prepare=True)
+
+
+def use_prepared(query):
+    return (
+        psycopg is not None
+        and query in PREPARED_STATEMENTS
+        and getattr(settings, "DB_PREPARED_STATEMENTS", True)
+        and connection.vendor == "postgresql"
+    )
+
+
+def _cursor_for(query):
+    return PreparedCursor() if use_prepared(query) else connection.cursor()
+
+
+# ---------------- ROW FACTORIES ----------------
+# Building one dict per row is the main allocation cost of large results.
+# execute_query(..., row_factory=...) can hand rows back as:
+#   "dict"      list of dicts (the default every service expects)
+#   "tuple"     TupleRows: the driver's tuples plus one shared `columns` list
+#   "record"    instances of a __slots__ class generated once per column set
+#   "columnar"  {column: [values, ...]}
+# The list endpoints render "tuple" and "columnar" directly (?layout=rows|columns)
+# and CSV exports write the tuples as they come off the cursor.
+
+
+class TupleRows(list):
+    """
+    Rows as plain tuples; the column names are stored once, not per row.
+    Values computed after the fetch (e.g. image_variants) go into
+    `extra_columns` as lists parallel to the rows, so the driver's tuples are
+    never copied to grow them.
+    """
+
+    def __init__(self, columns, rows=()):
+        super().__init__(rows)
+        self.columns = list(columns)
+        self.extra_columns = {}
+
+    def add_column(self, name, values):
+        self.extra_columns[name] = list(values)
+
+    def as_dicts(self):
+        rows = [dict(zip(self.columns, row)) for row in self]
+        for name, values in self.extra_columns.items():
+            for row, value in zip(rows, values):
+                row[name] = value
+        return rows
+
+
+def _field_names(columns):
+    names = []
+    for index, column in enumerate(columns):
+        name = column if column.isidentifier() and not keyword.iskeyword(column) else f"col_{index}"
+        names.append(name if name not in names else f"{name}_{index}")
+    return tuple(names)
+
+
+def _record_keys(self):
+    return self._columns
+
+
+def _record_getitem(self, column):
+    return getattr(self, self._fields[self._columns.index(column)])
+
+
+def _record_asdict(self):
+    return {column: getattr(self, field) for column, field in zip(self._columns, self._fields)}
+
+
+def _record_repr(self):
+    return f"Record({', '.join(f'{c}={getattr(self, f)!r}' for c, f in zip(self._columns, self._fields))})"
+
+
+@functools.lru_cache(maxsize=256)
+def record_class(columns):
+    """
+    A __slots__ record type for a tuple of column names, built once per query
+    shape. Instances support attribute access, record["column"] and
+    _asdict(); keys() + __getitem__ let JSON encoders treat them as mappings.
+    """
+    fields = _field_names(columns)
+    # positional __init__ generated the way collections.namedtuple does it
+    args = ", ".join(fields)
+    body = "\n".join(f"    self.{field} = {field}" for field in fields) or "    pass"
+    namespace = {}
+    exec(f"def __init__(self, {args}):\n{body}", namespace)
+    return type("Record", (), {
+        "__slots__": fields,
+        "_fields": fields,
+        "_columns": tuple(columns),
+        "__init__": namespace["__init__"],
+        "keys": _record_keys,
+        "__getitem__": _record_getitem,
+        "_asdict": _record_asdict,
+        "__repr__": _record_repr,
+    })
+
+
+def make_rows(columns, rows, row_factory="dict"):
+    """Shapes raw driver tuples with one of the row factories above."""
+    if row_factory == "dict":
+        return [dict(zip(columns, row)) for row in rows]
+    if row_factory == "tuple":
+        return TupleRows(columns, rows)
+    if row_factory == "record":
+        cls = record_class(tuple(columns))
+        return [cls(*row) for row in rows]
+    if row_factory == "columnar":
+        values = zip(*rows) if rows else [()] * len(columns)
+        return {column: list(column_values) for column, column_values in zip(columns, values)}
+    raise ValueError(f"Unknown row factory '{row_factory}'.")
+
+
+def row_count(rows):
+    if isinstance(rows, dict):
+        return len(next(iter(rows.values()), ()))
+    return len(rows)
+
+
+def truncate_rows(rows, limit):
+    """Drops everything after the first `limit` rows, in place."""
+    if isinstance(rows, dict):
+        for values in rows.values():
+            del values[limit:]
+    else:
+        del rows[limit:]
+        for values in getattr(rows, "extra_columns", {}).values():
+            del values[limit:]
+    return rows
+
+
+def last_row_value(rows, column):
+    if isinstance(rows, dict):
+        return rows[column][-1]
+    if isinstance(rows, TupleRows):
+        return rows[-1][rows.columns.index(column)]
+    return rows[-1][column]
+
+
+def execute_query(query, params=None, fetch=False, row_factory="dict"):
+    with _cursor_for(query) as cursor:
         cursor.execute(query, params)
         if fetch:
             columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            return make_rows(columns, cursor.fetchall(), row_factory)
+
+
+def execute_pipeline(statements):
+    """
+    Runs [(query, params, row_factory), ...] and returns the rows of each
+    (None where row_factory is None: nothing fetched). With psycopg 3 they
+    are sent as one pipeline, i.e. one round trip; otherwise one by one.
+    """
+    if psycopg is None or connection.vendor != "postgresql":
+        return [
+            execute_query(query, params, fetch=row_factory is not None, row_factory=row_factory or "dict")
+            for query, params, row_factory in statements
+        ]
+
+    connection.ensure_connection()
+    with connection.wrap_database_errors, connection.connection.pipeline(), contextlib.ExitStack() as stack:
+        cursors = []
+        for query, params, _ in statements:
+            cursor = stack.enter_context(_cursor_for(query))
+            cursor.execute(query, params)
+            cursors.append(cursor)
+        results = []
+        for cursor, (_, _, row_factory) in zip(cursors, statements):
+            if row_factory is None:
+                results.append(None)
+                continue
+            # fetching syncs the pipeline; description is only known after that
+            raw_rows = cursor.fetchall()
+            columns = [col[0] for col in cursor.description]
+            results.append(make_rows(columns, raw_rows, row_factory))
+        return results
+
+
+def execute_with_count(query, params, count_query, count_params=None, row_factory="dict"):
+    """
+    Runs a page query and the COUNT(*) that goes with it in one pipeline and
+    returns (rows, count). The page comes back exactly as fetched (no count
+    column to strip per row).
+    """
+    rows, count = execute_pipeline([(query, params, row_factory), (count_query, count_params, "tuple")])
+    return rows, count[0][0]
+
+
+def stream_batches(query, params=None, batch_size=None):
+    """
+    Yields (columns, rows) per round trip of a named (server-side) cursor,
+    with the driver's tuples untouched; see stream_query for dict rows.
+    """
+    batch_size = batch_size or getattr(settings, "DB_STREAM_BATCH_SIZE", 2000)
+    # Named cursors only live inside a transaction (no WITH HOLD materialisation)
+    with transaction.atomic():
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(query, params)
+            columns = None
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if columns is None:
+                    # psycopg2 only fills description after the first fetch
+                    columns = [col[0] for col in cursor.description]
+                yield columns, rows
+
+
+def stream_query(query, params=None, batch_size=None):
+    """
+    Iterator variant of execute_query for large result sets.
+    Uses a named (server-side) cursor and fetches `batch_size` rows per round
+    trip, so only one batch is ever held in memory.
+    """
+    for columns, rows in stream_batches(query, params, batch_size):
+        for row in rows:
+            yield dict(zip(columns, row))
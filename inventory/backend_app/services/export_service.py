@@ -0,0 +1,30 @@
+from .async_db import async_stream_batches
+from .db import stream_batches
+from backend_app.exception import ValidationError
+
+# ---------------- FULL EXPORTS ----------------
+# Exports read the tables straight from a server-side cursor in primary-key
+# order: no OFFSET, no COUNT(*), and the first batch is available right away.
+# Batches keep the driver's tuples, so no dict is built per exported row.
+EXPORT_QUERIES = {
+    "products": "SELECT * FROM tbl_products WHERE status = TRUE ORDER BY id",
+    "categories": "SELECT * FROM tbl_categories ORDER BY id",
+    "suppliers": "SELECT * FROM tbl_suppliers ORDER BY id",
+}
+
+
+def _export_query(resource):
+    query = EXPORT_QUERIES.get(resource)
+    if query is None:
+        raise ValidationError(f"Unknown export '{resource}'. Use one of: {', '.join(EXPORT_QUERIES)}.")
+    return query
+
+
+def stream_export(resource):
+    """(columns, rows) batches of the whole table."""
+    return stream_batches(_export_query(resource))
+
+
+def astream_export(resource):
+    """Async (columns, rows) batches of the whole table, for the ASGI export view."""
+    return async_stream_batches(_export_query(resource))
@@ -0,0 +1,181 @@
+import csv
+import io
+import json
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .cache_service import bump_version
+from backend_app.serializers.product_serializer import ProductImportRowSerializer
+from backend_app.exception import DatabaseUpdateError, InvalidFileFormatError
+
+# ---------------- BULK PRODUCT IMPORT ----------------
+# Rows are validated in one streaming pass and written to a temporary staging
+# table (COPY when the driver supports it, batched INSERTs otherwise).
+# Supplier/category ids are then checked with one set-based query each and the
+# remaining rows go through sp_insert_add_product in a single statement, all
+# inside one transaction.
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+STAGING_COLUMNS = ["row_no", "name", "price", "quantity", "supplier_id", "category_id", "created_by"]
+
+CREATE_STAGING_TABLE = """
+    CREATE TEMPORARY TABLE tmp_product_import (
+        row_no      integer PRIMARY KEY,
+        name        text,
+        price       numeric(10, 2),
+        quantity    integer,
+        supplier_id integer,
+        category_id integer,
+        created_by  text
+    ) ON COMMIT DROP
+"""
+
+MISSING_SUPPLIERS_QUERY = """
+    SELECT t.row_no, t.supplier_id FROM tmp_product_import t
+    WHERE NOT EXISTS (SELECT 1 FROM tbl_suppliers s WHERE s.id = t.supplier_id)
+"""
+
+MISSING_CATEGORIES_QUERY = """
+    SELECT t.row_no, t.category_id FROM tmp_product_import t
+    WHERE NOT EXISTS (SELECT 1 FROM tbl_categories c WHERE c.id = t.category_id)
+"""
+
+INSERT_FROM_STAGING = """
+    SELECT COUNT(*) FROM (
+        SELECT sp_insert_add_product(name, price, quantity, supplier_id, category_id, created_by, NULL)
+        FROM tmp_product_import
+        ORDER BY row_no
+    ) AS inserted
+"""
+
+
+def detect_import_format(file_obj, requested=None):
+    """Picks the format from the explicit parameter or the file extension."""
+    if requested:
+        file_format = requested.lower()
+    else:
+        name = (file_obj.name or "").lower()
+        file_format = "ndjson" if name.endswith((".ndjson", ".jsonl")) else "csv" if name.endswith(".csv") else None
+
+    if file_format not in IMPORT_FORMATS:
+        raise InvalidFileFormatError("Upload a .csv or .ndjson file (or pass file_format=csv|ndjson).")
+    return file_format
+
+
+def _iter_records(file_obj, file_format):
+    """Yields (row_no, record, parse_error) without loading the file into memory."""
+    text = io.TextIOWrapper(file_obj, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        for row_no, record in enumerate(csv.DictReader(text), start=1):
+            yield row_no, record, None
+        return
+
+    row_no = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_no += 1
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("each line must be a JSON object")
+            yield row_no, record, None
+        except ValueError as e:
+            yield row_no, None, {"non_field_errors": [f"Invalid JSON: {e}"]}
+
+
+def _iter_valid_rows(records, created_by, report):
+    for row_no, record, parse_error in records:
+        if parse_error is None:
+            if created_by and not record.get("created_by"):
+                record["created_by"] = created_by
+            serializer = ProductImportRowSerializer(data=record)
+            if serializer.is_valid():
+                data = serializer.validated_data
+                yield [row_no] + [data[col] for col in STAGING_COLUMNS[1:]]
+                continue
+            parse_error = serializer.errors
+        report.add(row_no, parse_error)
+
+
+def _load_staging(cursor, rows):
+    raw = getattr(cursor, "cursor", cursor)
+    if hasattr(raw, "copy"):
+        # psycopg 3: stream every row through a single COPY
+        with raw.copy(f"COPY tmp_product_import ({', '.join(STAGING_COLUMNS)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+        return
+
+    # psycopg2: large executemany batches
+    batch_size = getattr(settings, "PRODUCT_IMPORT_BATCH_SIZE", 5000)
+    insert = (
+        f"INSERT INTO tmp_product_import ({', '.join(STAGING_COLUMNS)}) "
+        f"VALUES ({', '.join(['%s'] * len(STAGING_COLUMNS))})"
+    )
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            cursor.executemany(insert, batch)
+            batch = []
+    if batch:
+        cursor.executemany(insert, batch)
+
+
+class ImportReport:
+    """Per-row error report, capped so a completely broken file stays small."""
+
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.failed = 0
+        self.errors = []
+
+    def add(self, row_no, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_no, "errors": errors})
+
+
+def import_products(file_obj, file_format, created_by=None):
+    report = ImportReport(getattr(settings, "PRODUCT_IMPORT_MAX_ERRORS", 1000))
+    records = _iter_records(file_obj, file_format)
+
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(CREATE_STAGING_TABLE)
+            _load_staging(cursor, _iter_valid_rows(records, created_by, report))
+
+            # Resolve foreign keys for the whole file at once
+            missing = {}
+            cursor.execute(MISSING_SUPPLIERS_QUERY)
+            for row_no, supplier_id in cursor.fetchall():
+                missing.setdefault(row_no, {})["supplier_id"] = [f"Supplier {supplier_id} does not exist."]
+            cursor.execute(MISSING_CATEGORIES_QUERY)
+            for row_no, category_id in cursor.fetchall():
+                missing.setdefault(row_no, {})["category_id"] = [f"Category {category_id} does not exist."]
+            if missing:
+                cursor.execute("DELETE FROM tmp_product_import WHERE row_no = ANY(%s)", [list(missing)])
+                for row_no in sorted(missing):
+                    report.add(row_no, missing[row_no])
+
+            cursor.execute(INSERT_FROM_STAGING)
+            imported = cursor.fetchone()[0]
+    except UnicodeDecodeError:
+        raise InvalidFileFormatError("Import files must be UTF-8 encoded.")
+    except csv.Error as e:
+        raise InvalidFileFormatError(f"Malformed CSV file: {str(e)}")
+    except Exception as e:
+        raise DatabaseUpdateError(f"Bulk product import failed: {str(e)}")
+
+    if imported:
+        bump_version("products")
+
+    report.errors.sort(key=lambda item: item["row"])
+    return {
+        "imported": imported,
+        "failed": report.failed,
+        "errors": report.errors,
+    }
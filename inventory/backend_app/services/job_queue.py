@@ -0,0 +1,269 @@
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger("backend_app.jobs")
+
+# ---------------- BACKGROUND JOB QUEUE ----------------
+# Slow side effects (SMTP, ...) are written to a local SQLite file and run by
+# a pool of worker threads, so the request only pays for one local insert.
+# Jobs survive restarts; a failing job is retried with exponential backoff and
+# moves to the dead-letter list ('dead') after JOB_QUEUE_MAX_ATTEMPTS tries.
+# The payload of a job is cleared once it is done.
+#
+#   @job("send_email")
+#   def send_email_job(subject, message, recipients): ...
+#
+#   enqueue("send_email", subject=..., message=..., recipients=[...])
+#
+# Workers start inside the web process on the first enqueue (JOB_QUEUE_AUTOSTART)
+# or as a separate process with 'manage.py jobs work'. With JOB_QUEUE_EAGER the
+# job runs inline instead, which is what tests want.
+
+QUEUED, RUNNING, DONE, DEAD = "queued", "running", "done", "dead"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    locked_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_due_idx ON jobs (status, run_at);
+-- jobs finished before payloads were cleared on completion
+UPDATE jobs SET payload = '{}' WHERE status = 'done' AND payload <> '{}';
+"""
+
+# Claims the oldest due job; a 'running' job whose lease expired belonged to a
+# worker that died and is picked up again.
+CLAIM_QUERY = """
+    UPDATE jobs
+    SET status = 'running', attempts = attempts + 1, locked_until = :lease, updated_at = :now
+    WHERE id = (
+        SELECT id FROM jobs
+        WHERE (status = 'queued' AND run_at <= :now)
+           OR (status = 'running' AND locked_until < :now)
+        ORDER BY run_at, id
+        LIMIT 1
+    )
+    RETURNING id, name, payload, attempts, max_attempts
+"""
+
+_handlers = {}
+_schema_ready = set()
+_wakeup = threading.Event()
+_workers = []
+_workers_lock = threading.Lock()
+_stopping = threading.Event()
+
+
+def job(name):
+    """Registers a function as the handler for jobs called `name`."""
+    def register(fn):
+        _handlers[name] = fn
+        return fn
+    return register
+
+
+def _connect():
+    path = str(settings.JOB_QUEUE_PATH)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if path not in _schema_ready:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _schema_ready.add(path)
+    return conn
+
+
+def _backoff(attempts):
+    """Seconds before the next try: base * 2^(attempts-1), capped, with jitter."""
+    delay = min(settings.JOB_QUEUE_BACKOFF_BASE * 2 ** (attempts - 1), settings.JOB_QUEUE_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def enqueue(name, max_attempts=None, delay=0, **payload):
+    """
+    Stores a job and wakes the workers. Returns the job id (None in eager mode).
+    The payload must be JSON serialisable.
+    """
+    if name not in _handlers:
+        raise LookupError(f"No job handler registered for '{name}'")
+
+    if getattr(settings, "JOB_QUEUE_EAGER", False):
+        _handlers[name](**payload)
+        return None
+
+    now = time.time()
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "INSERT INTO jobs (name, payload, max_attempts, run_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [name, json.dumps(payload), max_attempts or settings.JOB_QUEUE_MAX_ATTEMPTS,
+             now + delay, now, now],
+        )
+        job_id = cursor.lastrowid
+    finally:
+        conn.close()
+
+    if getattr(settings, "JOB_QUEUE_AUTOSTART", True):
+        start_workers()
+    _wakeup.set()
+    return job_id
+
+
+def claim_job():
+    """Atomically marks the next due job as running and returns it (or None)."""
+    now = time.time()
+    conn = _connect()
+    try:
+        return conn.execute(
+            CLAIM_QUERY, {"now": now, "lease": now + settings.JOB_QUEUE_LEASE_SECONDS}
+        ).fetchone()
+    finally:
+        conn.close()
+
+
+def _finish(job_id, status, run_at=None, error=None):
+    conn = _connect()
+    try:
+        # a finished job's payload is never read again: don't keep it around
+        conn.execute(
+            "UPDATE jobs SET status = ?, run_at = COALESCE(?, run_at), locked_until = NULL, "
+            "last_error = COALESCE(?, last_error), updated_at = ?, "
+            "payload = CASE WHEN ? = 'done' THEN '{}' ELSE payload END WHERE id = ?",
+            [status, run_at, error, time.time(), status, job_id],
+        )
+    finally:
+        conn.close()
+
+
+def run_job(row):
+    """Runs one claimed job and records success, a retry or a dead letter."""
+    handler = _handlers.get(row["name"])
+    try:
+        if handler is None:
+            raise LookupError(f"No job handler registered for '{row['name']}'")
+        handler(**json.loads(row["payload"]))
+    except Exception:
+        error = traceback.format_exc(limit=5)
+        if row["attempts"] >= row["max_attempts"]:
+            logger.error("Job %s (%s) moved to dead letters after %s attempts",
+                         row["id"], row["name"], row["attempts"])
+            _finish(row["id"], DEAD, error=error)
+        else:
+            retry_in = _backoff(row["attempts"])
+            logger.warning("Job %s (%s) failed, retry %s/%s in %.1fs",
+                           row["id"], row["name"], row["attempts"], row["max_attempts"], retry_in)
+            _finish(row["id"], QUEUED, run_at=time.time() + retry_in, error=error)
+    else:
+        _finish(row["id"], DONE)
+    finally:
+        # handlers may touch the Postgres connection of this worker thread
+        close_old_connections()
+
+
+def work_once():
+    """Runs at most one due job. Returns True if a job was run."""
+    row = claim_job()
+    if row is None:
+        return False
+    run_job(row)
+    return True
+
+
+def _worker_loop():
+    while not _stopping.is_set():
+        try:
+            if work_once():
+                continue
+        except Exception:
+            logger.exception("Job worker error")
+        # idle: sleep until an enqueue wakes us or the poll interval passes
+        _wakeup.wait(settings.JOB_QUEUE_POLL_INTERVAL)
+        _wakeup.clear()
+
+
+def start_workers(count=None):
+    """Starts the worker threads of this process once."""
+    with _workers_lock:
+        if _workers:
+            return
+        _stopping.clear()
+        for i in range(count or settings.JOB_QUEUE_WORKERS):
+            thread = threading.Thread(target=_worker_loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            _workers.append(thread)
+
+
+def stop_workers(timeout=None):
+    _stopping.set()
+    _wakeup.set()
+    with _workers_lock:
+        for thread in _workers:
+            thread.join(timeout)
+        _workers.clear()
+
+
+def queue_stats():
+    """Number of jobs per status."""
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+    finally:
+        conn.close()
+    return {QUEUED: 0, RUNNING: 0, DONE: 0, DEAD: 0, **{r["status"]: r["n"] for r in rows}}
+
+
+def dead_letters(limit=100):
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT id, name, payload, attempts, last_error, updated_at FROM jobs "
+            "WHERE status = 'dead' ORDER BY id DESC LIMIT ?", [limit]
+        ).fetchall()
+    finally:
+        conn.close()
+    return [dict(r) for r in rows]
+
+
+def retry_dead(job_id=None):
+    """Puts one (or every) dead job back in the queue with a fresh attempt count."""
+    conn = _connect()
+    try:
+        sql = "UPDATE jobs SET status = 'queued', attempts = 0, run_at = ?, updated_at = ? WHERE status = 'dead'"
+        params = [time.time(), time.time()]
+        if job_id is not None:
+            sql += " AND id = ?"
+            params.append(job_id)
+        count = conn.execute(sql, params).rowcount
+    finally:
+        conn.close()
+    _wakeup.set()
+    return count
+
+
+def purge_done(older_than_seconds):
+    conn = _connect()
+    try:
+        return conn.execute(
+            "DELETE FROM jobs WHERE status = 'done' AND updated_at < ?",
+            [time.time() - older_than_seconds],
+        ).rowcount
+    finally:
+        conn.close()
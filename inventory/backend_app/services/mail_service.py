@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .db import execute_query
+from .job_queue import enqueue, job
+
+# ---------------- OUTGOING MAIL ----------------
+# Mail goes through the job queue: the SMTP round trip happens on a worker
+# thread and a failed send is retried instead of failing the request.
+#
+# One-time codes never go into a job payload (the queue is a plain SQLite
+# file): the OTP job only carries the address and the purpose and reads the
+# current code from tbl_users when it runs.
+
+OTP_QUERY = "SELECT otp FROM tbl_users WHERE email = %s"
+
+OTP_MESSAGES = {
+    "password_reset": ("Reset OTP", "Your OTP is {otp}"),
+}
+
+
+@job("send_email")
+def send_email_job(subject, message, recipients, from_email=None):
+    send_mail(subject, message, from_email or settings.EMAIL_HOST_USER, recipients, fail_silently=False)
+
+
+@job("send_otp_email")
+def send_otp_email_job(email, purpose):
+    subject, template = OTP_MESSAGES[purpose]
+    rows = execute_query(OTP_QUERY, [email], fetch=True)
+    if not rows or not rows[0]["otp"]:
+        # already used (or the user is gone): nothing left to deliver
+        return
+    send_mail(subject, template.format(otp=rows[0]["otp"]), settings.EMAIL_HOST_USER, [email], fail_silently=False)
+
+
+def queue_email(subject, message, recipients, from_email=None):
+    """Queues an email for delivery and returns the job id."""
+    return enqueue(
+        "send_email", subject=subject, message=message,
+        recipients=list(recipients), from_email=from_email,
+    )
+
+
+def queue_otp_email(email, purpose="password_reset"):
+    """Queues the delivery of the user's current one-time code; returns the job id."""
+    if purpose not in OTP_MESSAGES:
+        raise ValueError(f"Unknown OTP purpose '{purpose}'.")
+    return enqueue("send_otp_email", email=email, purpose=purpose)
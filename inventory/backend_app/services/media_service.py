@@ -0,0 +1,261 @@
+import contextlib
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+from .db import TupleRows
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - variants are skipped without Pillow
+    Image = None
+
+logger = logging.getLogger("backend_app.media")
+
+# ---------------- CONTENT-ADDRESSED MEDIA ----------------
+# Uploads are stored under their SHA-256: products/ab/abcdef....jpg. The hash
+# is computed while the upload is copied to disk, so a file that is already
+# stored is detected without a second read and the copy is discarded.
+#
+# Resized variants (IMAGE_VARIANTS, in the original format and as WebP) are
+# written next to the original by a process pool once the product write that
+# references it commits (stored_upload):
+#   products/ab/abcdef..._thumb.jpg, products/ab/abcdef..._thumb.webp, ...
+# Their URLs follow from the original's path alone, so list responses never
+# touch the filesystem; until a variant exists, /media/ redirects it to the
+# original. Files are written under MEDIA_TMP_ROOT (outside MEDIA_ROOT, same
+# filesystem) and renamed into place, so a partial file is never served.
+
+CONTENT_ADDRESSED_RE = re.compile(r"^(?P<folder>[\w-]+)/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})(?P<ext>\.[a-z0-9]+)?$")
+# originals and their variants (..._thumb.webp); their content never changes
+IMMUTABLE_PATH_RE = re.compile(r"^(?:[\w-]+/)+[0-9a-f]{2}/[0-9a-f]{64}(?:_\w+)?(?:\.[a-z0-9]+)?$")
+VARIANT_PATH_RE = re.compile(r"^(?P<base>[\w-]+/[0-9a-f]{2}/[0-9a-f]{64})_[a-z0-9]+\.[a-z0-9]+$")
+RESIZABLE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp"}
+SAVE_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG", ".gif": "PNG", ".webp": "WEBP", ".bmp": "PNG"}
+VARIANT_EXTENSIONS = {".gif": ".png", ".bmp": ".png"}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _extension(filename):
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if re.fullmatch(r"\.[a-z0-9]{1,8}", ext) else ""
+
+
+def _tmp_dir():
+    tmp_dir = settings.MEDIA_TMP_ROOT
+    os.makedirs(tmp_dir, exist_ok=True)
+    return tmp_dir
+
+
+def content_path(digest, ext, folder="products"):
+    return f"{folder}/{digest[:2]}/{digest}{ext}"
+
+
+def _store(file_obj, folder):
+    """Stores the upload; returns (relative path, True if this call wrote the file)."""
+    ext = _extension(getattr(file_obj, "name", ""))
+    tmp_dir = _tmp_dir()
+
+    sha = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in file_obj.chunks():
+                sha.update(chunk)
+                out.write(chunk)
+
+        relative = content_path(sha.hexdigest(), ext, folder)
+        final_path = os.path.join(settings.MEDIA_ROOT, relative)
+        if os.path.exists(final_path):
+            os.unlink(tmp_path)  # duplicate: keep the stored copy
+            return relative, False
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, final_path)
+        return relative, True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def store_upload(file_obj, folder="products", variants=True):
+    """
+    Streams an upload into MEDIA_ROOT under its SHA-256 and returns the
+    relative path. Identical content is stored once. Resized variants of
+    images are queued for the process pool unless `variants` is False.
+    """
+    relative, _ = _store(file_obj, folder)
+    if variants:
+        schedule_variants(relative)
+    return relative
+
+
+@contextlib.contextmanager
+def stored_upload(file_obj, folder="products"):
+    """
+    Stores the upload (if any) for the database write in the block and yields
+    its relative path. Variants are queued once the write commits; if the
+    block raises, a file this call stored is removed again, so a failed
+    INSERT/UPDATE leaves no unreferenced original behind. Content that was
+    already stored is kept.
+    """
+    if not file_obj:
+        yield None
+        return
+    relative, created = _store(file_obj, folder)
+    try:
+        yield relative
+    except BaseException:
+        if created:
+            remove_upload(relative)
+        raise
+    transaction.on_commit(lambda: schedule_variants(relative))
+
+
+def remove_upload(relative):
+    try:
+        os.unlink(os.path.join(settings.MEDIA_ROOT, relative))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Could not remove unreferenced upload %s: %s", relative, e)
+
+
+def is_content_addressed(relative):
+    """True for stored originals and variants, which can be cached forever."""
+    return bool(IMMUTABLE_PATH_RE.match(relative or ""))
+
+
+def variant_paths(relative):
+    """{variant name: relative path} for a content-addressed image, else {}."""
+    match = CONTENT_ADDRESSED_RE.match(relative or "")
+    if not match or (match["ext"] or "") not in RESIZABLE_EXTENSIONS:
+        return {}
+    base = relative[: -len(match["ext"])]
+    ext = VARIANT_EXTENSIONS.get(match["ext"], match["ext"])
+    paths = {}
+    for name in settings.IMAGE_VARIANTS:
+        paths[name] = f"{base}_{name}{ext}"
+        paths[f"{name}_webp"] = f"{base}_{name}.webp"
+    return paths
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: forking a threaded web worker is not safe
+                _executor = ProcessPoolExecutor(
+                    max_workers=getattr(settings, "IMAGE_VARIANT_WORKERS", 2),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def schedule_variants(relative):
+    """Queues variant generation; the request does not wait for it."""
+    if Image is None or not variant_paths(relative):
+        return None
+    future = _get_executor().submit(
+        generate_variants,
+        os.path.join(settings.MEDIA_ROOT, relative),
+        dict(settings.IMAGE_VARIANTS),
+        getattr(settings, "IMAGE_VARIANT_QUALITY", 80),
+        _tmp_dir(),
+    )
+    future.add_done_callback(_variants_done)
+    return future
+
+
+def _variants_done(future):
+    error = future.exception()
+    if error is not None:
+        logger.error("Image variant generation failed: %s", error)
+
+
+def generate_variants(source_path, sizes, quality=80, tmp_dir=None):
+    """
+    Runs in the process pool (no Django access). Writes every missing variant
+    of `source_path`, each fitted into a size x size box, through `tmp_dir`
+    and returns the paths written.
+    """
+    base, ext = os.path.splitext(source_path)
+    variant_ext = VARIANT_EXTENSIONS.get(ext.lower(), ext.lower())
+    written = []
+    with Image.open(source_path) as img:
+        img.load()
+        for name, size in sizes.items():
+            targets = (
+                (f"{base}_{name}{variant_ext}", SAVE_FORMATS[variant_ext]),
+                (f"{base}_{name}.webp", "WEBP"),
+            )
+            if all(os.path.exists(path) for path, _ in targets):
+                continue
+            resized = img.copy()
+            resized.thumbnail((size, size))
+            for path, image_format in targets:
+                frame = resized
+                if image_format == "JPEG" and frame.mode not in ("RGB", "L"):
+                    frame = frame.convert("RGB")
+                elif frame.mode == "P":
+                    frame = frame.convert("RGBA")
+                # write under a temp name so readers never see a partial file
+                tmp_path = os.path.join(tmp_dir or os.path.dirname(path),
+                                        f"{os.path.basename(path)}.{os.getpid()}.tmp")
+                frame.save(tmp_path, format=image_format, quality=quality)
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, path)
+                written.append(path)
+    return written
+
+
+def image_variant_urls(relative):
+    """URLs of the variants of a stored image (None when it has none); no disk access."""
+    paths = variant_paths(relative)
+    if not paths:
+        return None
+    return {name: settings.MEDIA_URL + path for name, path in paths.items()}
+
+
+def variant_original(relative):
+    """
+    Path of the stored original a variant path belongs to, or None. Only
+    used when a variant is requested before it has been written.
+    """
+    match = VARIANT_PATH_RE.match(relative or "")
+    if not match:
+        return None
+    for ext in sorted(RESIZABLE_EXTENSIONS):
+        original = match["base"] + ext
+        if relative in variant_paths(original).values() and os.path.isfile(os.path.join(settings.MEDIA_ROOT, original)):
+            return original
+    return None
+
+
+def attach_image_variants(rows, field="product_image"):
+    """
+    Adds `image_variants` to each row that has a stored image; returns rows.
+    Dict rows get a key, columnar pages an extra column and tuple rows a
+    parallel list in `extra_columns` (the tuples themselves are not copied).
+    """
+    if isinstance(rows, dict):
+        rows["image_variants"] = [image_variant_urls(path) for path in rows.get(field, ())]
+    elif isinstance(rows, TupleRows):
+        index = rows.columns.index(field)
+        rows.add_column("image_variants", [image_variant_urls(row[index]) for row in rows])
+    else:
+        for row in rows:
+            row["image_variants"] = image_variant_urls(row.get(field))
+    return rows
@@ -0,0 +1,150 @@
+import base64
+import json
+from datetime import datetime
+
+from .db import TupleRows, execute_query, last_row_value, row_count, truncate_rows
+from backend_app.exception import ValidationError
+
+# ---------------- KEYSET (CURSOR) PAGINATION ----------------
+# OFFSET makes Postgres build and throw away every skipped row, so deep pages
+# get slower and slower. Keyset pagination instead seeks on an indexed
+# (sort_key, id) pair and only ever reads `limit` rows.
+
+# Type of the sort value ("k") a cursor may carry for each sort key. The value
+# goes to the driver as a query parameter, so anything else is rejected.
+CURSOR_KEY_TYPES = {"id": int, "name": str, "rank": float, "moved_at": datetime}
+
+
+def encode_cursor(sort, row, sort_value=None, row_id=None):
+    """Builds the opaque cursor that points just after `row` (or the given key pair)."""
+    if row is not None:
+        sort_value, row_id = row[sort], row["id"]
+    payload = {"s": sort, "k": sort_value, "id": row_id}
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _valid_sort_value(sort, value):
+    # bool is an int subclass; dicts, lists and null are never sort values
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return False
+    expected = CURSOR_KEY_TYPES.get(sort)
+    if expected is float:
+        return isinstance(value, (int, float))
+    if expected is datetime:
+        # encoded with str(datetime)
+        try:
+            datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return False
+        return True
+    return expected is None or isinstance(value, expected)
+
+
+def decode_cursor(cursor, sort):
+    """Returns the (sort_value, id) pair stored in a cursor, or None for the first page."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort:
+            raise ValidationError("Cursor does not match the requested sort order.")
+        sort_value, row_id = payload["k"], payload["id"]
+        if not _valid_sort_value(sort, sort_value) or isinstance(row_id, bool) or not isinstance(row_id, int):
+            raise ValueError(payload)
+        return sort_value, row_id
+    except ValidationError:
+        raise
+    except (ValueError, KeyError, TypeError):
+        raise ValidationError("Invalid pagination cursor provided.")
+
+
+def build_keyset_query(table, sort, cursor=None, limit=10, where=None, sort_keys=("id",)):
+    """
+    SQL + params for one page of `table` ordered by (sort, id), starting after `cursor`.
+    `table`, `where` and `sort_keys` come from the services, never from the client.
+    """
+    if sort not in sort_keys:
+        raise ValidationError(f"Unsupported sort key '{sort}'. Use one of: {', '.join(sort_keys)}.")
+
+    conditions = [where] if where else []
+    params = []
+    after = decode_cursor(cursor, sort)
+    if after is not None:
+        if sort == "id":
+            conditions.append("id > %s")
+            params.append(after[1])
+        else:
+            conditions.append(f"({sort}, id) > (%s, %s)")
+            params.extend(after)
+
+    order_by = "id" if sort == "id" else f"{sort}, id"
+    where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    # Fetch one extra row so we know whether another page exists
+    sql = f"SELECT * FROM {table} {where_sql} ORDER BY {order_by} LIMIT %s"
+    return sql, params + [limit + 1]
+
+
+def keyset_result(rows, sort, limit):
+    """Trims the look-ahead row and builds the page response with `next_cursor`."""
+    next_cursor = None
+    if row_count(rows) > limit:
+        truncate_rows(rows, limit)
+        next_cursor = encode_cursor(sort, None, last_row_value(rows, sort), last_row_value(rows, "id"))
+
+    page = {"results": rows, "next_cursor": next_cursor, "limit": limit}
+    if isinstance(rows, TupleRows):
+        page["columns"] = rows.columns
+        page["extra_columns"] = rows.extra_columns
+    return page
+
+
+def keyset_page(table, sort, cursor=None, limit=10, where=None, sort_keys=("id",), row_factory="dict"):
+    """Fetch one page of `table` ordered by (sort, id), starting after `cursor`."""
+    sql, params = build_keyset_query(table, sort, cursor, limit, where, sort_keys)
+    rows = execute_query(sql, params, fetch=True, row_factory=row_factory)
+    return keyset_result(rows, sort, limit)
+
+
+def parse_cursor_params(query_params, default_limit, max_limit=1000):
+    """Reads `cursor`, `limit` and `sort` from the request query string."""
+    try:
+        limit = int(query_params.get("limit", default_limit))
+    except ValueError:
+        raise ValidationError("Invalid pagination parameters provided.")
+    if limit <= 0:
+        raise ValidationError("Limit must be a positive integer.")
+
+    return {
+        "cursor": query_params.get("cursor") or None,
+        "limit": min(limit, max_limit),
+        "sort": query_params.get("sort", "id"),
+    }
+
+
+def parse_optional_int(query_params, name):
+    """Optional integer filter from the query string (e.g. category_id)."""
+    value = query_params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError(f"'{name}' must be an integer.")
+
+
+# ?layout= of the list endpoints -> execute_query row factory
+LIST_LAYOUTS = {"objects": "dict", "rows": "tuple", "columns": "columnar"}
+
+
+def parse_layout(query_params):
+    """
+    `objects` (default): one JSON object per row; `rows`: a `columns` list plus
+    one array per row; `columns`: one array per column.
+    """
+    layout = query_params.get("layout", "objects")
+    if layout not in LIST_LAYOUTS:
+        raise ValidationError(f"Unsupported layout '{layout}'. Use one of: {', '.join(LIST_LAYOUTS)}.")
+    return LIST_LAYOUTS[layout]
@@ -0,0 +1,49 @@
+from django.db import connection
+
+from .async_db import current_async_pool
+
+# ---------------- CONNECTION POOL STATISTICS ----------------
+# psycopg_pool keeps running counters (get_stats()); they are reshaped here
+# into the figures needed to size the pools.
+
+
+def _summarize(pool):
+    stats = pool.get_stats()
+    size = stats.get("pool_size", 0)
+    idle = stats.get("pool_available", 0)
+    queued = stats.get("requests_queued", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+    return {
+        "enabled": True,
+        "min_size": stats.get("pool_min"),
+        "max_size": stats.get("pool_max"),
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": stats.get("requests_num", 0),
+        "requests_queued": queued,
+        "wait_ms_total": wait_ms,
+        "wait_ms_avg": round(wait_ms / queued, 2) if queued else 0,
+        "timeouts": stats.get("requests_errors", 0),
+        "connections_opened": stats.get("connections_num", 0),
+        "connection_errors": stats.get("connections_errors", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+    }
+
+
+def get_pool_stats():
+    """Statistics for this worker process's sync pool and, if opened, the async pool."""
+    if connection.settings_dict.get("OPTIONS", {}).get("pool"):
+        sync_stats = _summarize(connection.pool)
+    else:
+        sync_stats = {
+            "enabled": False,
+            "conn_max_age": connection.settings_dict.get("CONN_MAX_AGE"),
+            "conn_health_checks": connection.settings_dict.get("CONN_HEALTH_CHECKS"),
+        }
+
+    async_pool = current_async_pool()
+    async_stats = _summarize(async_pool) if async_pool is not None else {"enabled": False}
+
+    return {"sync_pool": sync_stats, "async_pool": async_stats}
@@ -1,61 +1,122 @@
-from .db import execute_query
-from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+from .db import execute_query, prepared, row_count
+from .pagination import keyset_page
+from .counting import paginated_query
+from .cache_service import bump_version
+from .media_service import attach_image_variants, stored_upload
 # Importing custom exceptions
-from backend_app.exception import DatabaseFetchError, DatabaseUpdateError
+from backend_app.exception import (
+    ConcurrencyConflictError,
+    DatabaseFetchError,
+    DatabaseUpdateError,
+    InsufficientStockError,
+    ProductAppError,
+    ValidationError,
+)
+
+# hot procedure calls, prepared once per connection (see db.prepared)
+INSERT_PRODUCT_QUERY = prepared("SELECT sp_insert_add_product(%s,%s,%s,%s,%s,%s,%s)")
+UPDATE_PRODUCT_QUERY = prepared("SELECT sp_update_update_product(%s, %s, %s, %s, %s, %s, %s)")
+SEARCH_PRODUCT_QUERY = prepared("SELECT * FROM sp_search_get_product(%s)")
+
+LOCK_PRODUCT_VERSION_QUERY = "SELECT version FROM tbl_products WHERE id = %s FOR UPDATE"
+PRODUCT_VERSION_QUERY = "SELECT version FROM tbl_products WHERE id = %s"
+
+# Relative change in one statement: concurrent adjusters queue on the row lock
+# and each re-checks the floor against the quantity the previous one committed,
+# so no update is lost and stock never goes below zero unless allowed.
+# The set_config() calls hand the movement type/reference/location to the
+# stock ledger trigger for this transaction only (see migration 0005).
+ADJUST_STOCK_QUERY = prepared("""
+    UPDATE tbl_products
+    SET quantity = COALESCE(quantity, 0) + %(delta)s,
+        updated_by = %(updated_by)s,
+        update_reason = %(update_reason)s
+    FROM (
+        SELECT set_config('inventory.movement_type', %(movement_type)s, true),
+               set_config('inventory.movement_reference', COALESCE(%(reference)s, ''), true),
+               set_config('inventory.movement_location', COALESCE(%(location)s, ''), true)
+    ) AS movement
+    WHERE id = %(id)s AND status = TRUE
+      AND (%(allow_negative)s OR COALESCE(quantity, 0) + %(delta)s >= 0)
+    RETURNING id, quantity, version
+""")
+STOCK_QUERY = "SELECT quantity FROM tbl_products WHERE id = %s AND status = TRUE"
 
 # ---------------- CREATE ----------------
 def create_product(data, file_obj=None):
     try:
-        file_path = None
-        if file_obj:
-            fs = FileSystemStorage()
-            filename = fs.save(f'products/{file_obj.name}', file_obj)
-            file_path = filename
-
-        execute_query(
-            "SELECT sp_insert_add_product(%s,%s,%s,%s,%s,%s,%s)",
-            [
-                data["name"],
-                data["price"],
-                data["quantity"],
-                data["supplier_id"],
-                data["category_id"],
-                data["created_by"],
-                file_path  
-            ]
-        )
+        # stored once per content; thumbnails follow after the commit
+        with stored_upload(file_obj, "products") as file_path:
+            execute_query(
+                INSERT_PRODUCT_QUERY,
+                [
+                    data["name"],
+                    data["price"],
+                    data["quantity"],
+                    data["supplier_id"],
+                    data["category_id"],
+                    data["created_by"],
+                    file_path
+                ]
+            )
+        bump_version("products")
     except Exception as e:
         # Raising custom error if the INSERT operation fails
         raise DatabaseUpdateError(f"Failed to create product in database: {str(e)}")
 
 # ---------------- READ ----------------
-def list_products(limit=5, offset=0):
+def list_products(limit=5, offset=0, count_strategy=None, row_factory="dict"):
     try:
-        data = execute_query(
-            "SELECT * FROM sp_read_get_product() LIMIT %s OFFSET %s",
-            [limit, offset],
-            fetch=True
+        page = paginated_query(
+            "sp_read_get_product()",
+            [],
+            limit,
+            offset,
+            table="tbl_products",
+            resource="products",
+            where="status = TRUE",
+            strategy=count_strategy,
+            row_factory=row_factory,
         )
         
-        count_res = execute_query("SELECT COUNT(*) as count FROM tbl_products WHERE status = TRUE", fetch=True)
-        total_count = count_res[0]['count'] if count_res else 0
-        
         # Scenario: If no data is found, you can choose to raise an error or return empty
-        if not data and offset == 0:
+        if not row_count(page["results"]) and offset == 0:
             raise DatabaseFetchError("No products found in the database.")
 
-        return {"results": data, "total_count": total_count}
+        attach_image_variants(page["results"])
+        return page
     except DatabaseFetchError as de:
         raise de
     except Exception as e:
         # Catching any other database connection or query issues
         raise DatabaseFetchError(f"Error fetching product list: {str(e)}")
 
+def list_products_keyset(cursor=None, limit=5, sort="id", row_factory="dict"):
+    """Cursor pagination: seeks on the (sort, id) index instead of using OFFSET."""
+    try:
+        page = keyset_page(
+            "tbl_products",
+            sort,
+            cursor=cursor,
+            limit=limit,
+            where="status = TRUE",
+            sort_keys=("id", "name"),
+            row_factory=row_factory,
+        )
+        attach_image_variants(page["results"])
+        return page
+    except ProductAppError:
+        raise
+    except Exception as e:
+        raise DatabaseFetchError(f"Error fetching product list: {str(e)}")
+
 # ---------------- SEARCH ----------------
 def search_products(query):
     try:
         return execute_query(
-            "SELECT * FROM sp_search_get_product(%s)",
+            SEARCH_PRODUCT_QUERY,
             [query],
             fetch=True
         )
@@ -64,29 +125,85 @@ def search_products(query):
 
 # ---------------- UPDATE ----------------
 def update_product(product_id, data, file_obj=None):
+    """
+    Runs sp_update_update_product. When `data` carries the `version` the
+    client last read, the row is locked and the update only goes through if
+    nobody changed it since; the new version is returned.
+    """
     try:
-        file_path = data.get("product_image") 
-        
-        if file_obj:
-            fs = FileSystemStorage()
-            filename = fs.save(f'products/{file_obj.name}', file_obj)
-            file_path = filename
-
-        query = "SELECT sp_update_update_product(%s, %s, %s, %s, %s, %s, %s)"
-        params = [
-            product_id, 
-            data["name"], 
-            data["price"], 
-            data["quantity"], 
-            data.get("update_reason", ""), 
-            data.get("updated_by", "Admin"),
-            file_path 
-        ]
-        return execute_query(query, params)
+        # stored once per content; thumbnails follow after the commit
+        with stored_upload(file_obj, "products") as stored_path:
+            file_path = stored_path or data.get("product_image")
+            query = UPDATE_PRODUCT_QUERY
+            params = [
+                product_id, 
+                data["name"], 
+                data["price"], 
+                data["quantity"], 
+                data.get("update_reason", ""), 
+                data.get("updated_by", "Admin"),
+                file_path 
+            ]
+            expected_version = data.get("version")
+            if expected_version is None:
+                result = execute_query(query, params)
+            else:
+                with transaction.atomic():
+                    current = execute_query(LOCK_PRODUCT_VERSION_QUERY, [product_id], fetch=True)
+                    if not current:
+                        raise ValidationError(f"Product {product_id} does not exist.")
+                    if current[0]["version"] != expected_version:
+                        raise ConcurrencyConflictError(
+                            f"Product {product_id} is at version {current[0]['version']}, "
+                            f"not {expected_version}. Reload it and apply the change again."
+                        )
+                    execute_query(query, params)
+                    result = execute_query(PRODUCT_VERSION_QUERY, [product_id], fetch=True)[0]["version"]
+        bump_version("products")
+        return result
+    except ProductAppError:
+        raise
     except Exception as e:
         # Raising update error for failures during the update procedure
         raise DatabaseUpdateError(f"Failed to update product ID {product_id}: {str(e)}")
 
+# ---------------- STOCK ADJUSTMENT ----------------
+def adjust_stock(product_id, delta, updated_by, update_reason="Stock adjustment", allow_negative=False,
+                 movement_type="adjustment", reference=None, location=None):
+    """
+    Adds `delta` (negative to take stock out) and returns the new quantity and
+    version. The change is written to the stock ledger as `movement_type`.
+    """
+    try:
+        rows = execute_query(
+            ADJUST_STOCK_QUERY,
+            {
+                "id": product_id,
+                "delta": delta,
+                "updated_by": updated_by,
+                "update_reason": update_reason,
+                "allow_negative": allow_negative,
+                "movement_type": movement_type,
+                "reference": reference,
+                "location": location,
+            },
+            fetch=True,
+        )
+        if not rows:
+            current = execute_query(STOCK_QUERY, [product_id], fetch=True)
+            if not current:
+                raise ValidationError(f"Product {product_id} does not exist.")
+            raise InsufficientStockError(
+                f"Product {product_id} has {current[0]['quantity'] or 0} in stock; "
+                f"cannot apply {delta}."
+            )
+        bump_version("products")
+        return rows[0]
+    except ProductAppError:
+        raise
+    except Exception as e:
+        raise DatabaseUpdateError(f"Failed to adjust stock of product ID {product_id}: {str(e)}")
+
 # ---------------- DELETE ----------------
 def delete_product(id):
     try:
@@ -94,6 +211,7 @@ def delete_product(id):
             "SELECT sp_delete_delete_product(%s)",
             [id]
         )
+        bump_version("products")
     except Exception as e:
         # Raising error if delete procedure fails
         raise DatabaseUpdateError(f"Could not delete product ID {id}: {str(e)}")
\ No newline at end of file
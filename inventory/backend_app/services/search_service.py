@@ -0,0 +1,73 @@
+from .db import execute_query
+from .pagination import decode_cursor, keyset_result
+from .media_service import attach_image_variants
+from backend_app.exception import DatabaseFetchError
+
+# ---------------- RANKED PRODUCT SEARCH ----------------
+# Backed by the pg_trgm GIN index on tbl_products.name (migration 0002).
+# Matches are substrings (ILIKE) or fuzzy word matches (<%), ranked by
+# word_similarity and paged with a (rank, id) keyset cursor.
+
+SEARCH_COLUMNS = "p.id, p.name, p.price, p.quantity, p.supplier_id, p.category_id, p.product_image"
+
+
+def _like_escape(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_search_query(query, limit=20, cursor=None, category_id=None, supplier_id=None):
+    conditions = ["p.status = TRUE", "(p.name ILIKE %s OR %s <%% p.name)"]
+    params = [query, f"%{_like_escape(query)}%", query]
+
+    if category_id is not None:
+        conditions.append("p.category_id = %s")
+        params.append(category_id)
+    if supplier_id is not None:
+        conditions.append("p.supplier_id = %s")
+        params.append(supplier_id)
+
+    seek = ""
+    after = decode_cursor(cursor, "rank")
+    if after is not None:
+        seek = "WHERE ranked.rank < %s OR (ranked.rank = %s AND ranked.id > %s)"
+        params.extend([after[0], after[0], after[1]])
+
+    sql = f"""
+        SELECT * FROM (
+            SELECT {SEARCH_COLUMNS}, word_similarity(%s, p.name) AS rank
+            FROM tbl_products p
+            WHERE {' AND '.join(conditions)}
+        ) AS ranked
+        {seek}
+        ORDER BY ranked.rank DESC, ranked.id
+        LIMIT %s
+    """
+    return sql, params + [limit + 1]
+
+
+def search_products_ranked(query, limit=20, cursor=None, category_id=None, supplier_id=None):
+    sql, params = build_search_query(query, limit, cursor, category_id, supplier_id)
+    try:
+        rows = execute_query(sql, params, fetch=True)
+    except Exception as e:
+        raise DatabaseFetchError(f"Search operation failed: {str(e)}")
+    page = keyset_result(rows, "rank", limit)
+    attach_image_variants(page["results"])
+    return page
+
+
+def autocomplete_products(prefix, limit=10):
+    """Prefix match on lower(name) for type-ahead; returns only ids and names."""
+    try:
+        return execute_query(
+            """
+            SELECT id, name FROM tbl_products
+            WHERE status = TRUE AND lower(name) COLLATE "C" LIKE %s
+            ORDER BY lower(name) COLLATE "C", id
+            LIMIT %s
+            """,
+            [_like_escape(prefix.lower()) + "%", limit],
+            fetch=True
+        )
+    except Exception as e:
+        raise DatabaseFetchError(f"Autocomplete failed: {str(e)}")
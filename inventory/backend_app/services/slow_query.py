@@ -0,0 +1,216 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("backend_app.db")
+
+# ---------------- SLOW QUERY LOG ----------------
+# An execute wrapper on every Django connection (so execute_query, stream_query
+# and raw cursors in views are all covered) times each statement. Statements
+# slower than SLOW_QUERY_MS are appended to SLOW_QUERY_LOG as JSON lines with
+# redacted parameters and the calling service function.
+#
+# Plans are opt-in (SLOW_QUERY_EXPLAIN_SAMPLE_RATE, 0 by default). A sampled
+# read-only SELECT/WITH is handed to a background thread through a bounded
+# queue (dropped when it is full), which runs it once more under
+# EXPLAIN (ANALYZE, BUFFERS) in a READ ONLY transaction that is rolled back,
+# then writes the entry with its plan. The request never waits for it, and
+# anything that would write (stored procedures other than the sp_read_* and
+# sp_search_* readers, FOR UPDATE, nextval...) is either skipped by the
+# filter below or rejected by Postgres. The plan of a reader only shows the
+# function scan; the plans of the statements inside it are logged by
+# auto_explain with log_nested_statements on.
+# 'manage.py slow_queries' summarises the log by query shape.
+
+EXPLAINABLE_RE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+# statements that write even though they start with SELECT/WITH
+WRITES_RE = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE|"
+    r"nextval|setval|set_config|pg_advisory\w*|sp_(?!read_|search_)\w+)\b",
+    re.IGNORECASE,
+)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+# frames from these files are skipped when looking for the call site
+_INTERNAL_FILES = ("slow_query.py", "db.py", "profiling.py", "async_db.py")
+
+_explaining = ContextVar("slow_query_explaining", default=False)
+_write_lock = threading.Lock()
+_explain_queue = None
+_explain_lock = threading.Lock()
+
+
+class _Rollback(Exception):
+    pass
+
+
+def query_shape(sql):
+    """SQL with literals replaced and whitespace collapsed, for grouping."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def fingerprint(shape):
+    return hashlib.sha1(shape.encode()).hexdigest()[:12]
+
+
+def redact(value):
+    """Keeps the type and size of a parameter, never its value."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "<bool>"
+    if isinstance(value, dict):
+        return {key: redact(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value[:20]] + (["..."] if len(value) > 20 else [])
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def call_site():
+    """'backend_app/services/x.py:function:line' of the innermost app frame."""
+    frame = sys._getframe(2)
+    app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(app_root) and not filename.endswith(_INTERNAL_FILES):
+            relative = os.path.relpath(filename, os.path.dirname(app_root))
+            return f"{relative}:{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+def explainable(sql):
+    """Read-only SELECT/WITH statements, including calls of the sp_read_*/sp_search_* readers."""
+    return bool(EXPLAINABLE_RE.match(sql)) and not WRITES_RE.search(sql)
+
+
+def explain(sql, params):
+    """Runs EXPLAIN (ANALYZE, BUFFERS) in a read-only transaction and rolls it back."""
+    token = _explaining.set(True)
+    plan = None
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                # the raw DB-API cursor: no execute wrappers, no recursion
+                cursor.cursor.execute("SET TRANSACTION READ ONLY")
+                cursor.cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+                plan = cursor.cursor.fetchone()[0]
+            raise _Rollback()
+    except _Rollback:
+        pass
+    except Exception as e:
+        plan = {"error": str(e)}
+    finally:
+        _explaining.reset(token)
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0] if isinstance(plan, list) else plan
+
+
+def _explain_worker():
+    while True:
+        entry, sql, params = _explain_queue.get()
+        try:
+            entry["plan"] = explain(sql, params)
+            write_entry(entry)
+        except Exception:
+            logger.exception("Could not explain slow query %s", entry["fingerprint"])
+        finally:
+            # own connection: hand it back between plans
+            connection.close()
+            _explain_queue.task_done()
+
+
+def queue_explain(entry, sql, params):
+    """
+    Hands a slow entry to the explain thread, which writes it with its plan.
+    Returns False (the caller writes it without a plan) when the queue is full.
+    """
+    global _explain_queue
+    if _explain_queue is None:
+        with _explain_lock:
+            if _explain_queue is None:
+                _explain_queue = queue.Queue(maxsize=getattr(settings, "SLOW_QUERY_EXPLAIN_QUEUE_SIZE", 16))
+                threading.Thread(target=_explain_worker, name="slow-query-explain", daemon=True).start()
+    try:
+        _explain_queue.put_nowait((entry, sql, params))
+    except queue.Full:
+        return False
+    return True
+
+
+def write_entry(entry):
+    line = json.dumps(entry, default=str)
+    with _write_lock:
+        with open(settings.SLOW_QUERY_LOG, "a") as fh:
+            fh.write(line + "\n")
+
+
+def record(sql, params, duration, many=False, can_explain=True):
+    """Logs the statement if it took longer than SLOW_QUERY_MS."""
+    threshold = getattr(settings, "SLOW_QUERY_MS", None)
+    duration_ms = duration * 1000
+    if not threshold or duration_ms < threshold or _explaining.get():
+        return
+
+    shape = query_shape(sql)
+    entry = {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "fingerprint": fingerprint(shape),
+        "duration_ms": round(duration_ms, 2),
+        "shape": shape[:2000],
+        "params": None if many else redact(params),
+        "many": many,
+        "call_site": call_site(),
+        "plan": None,
+    }
+
+    logger.warning("Slow query %.1f ms [%s] at %s", duration_ms, entry["fingerprint"], entry["call_site"])
+    if (
+        can_explain
+        and not many
+        and random.random() < getattr(settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0)
+        and duration_ms <= getattr(settings, "SLOW_QUERY_EXPLAIN_MAX_MS", 5000)
+        and explainable(sql)
+        and queue_explain(entry, sql, params)
+    ):
+        return
+    try:
+        write_entry(entry)
+    except OSError:
+        logger.exception("Could not write the slow query log")
+
+
+def _timed_execute(execute, sql, params, many, context):
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    record(sql, params, time.perf_counter() - start, many=many)
+    return result
+
+
+def _install_wrapper(sender, connection, **kwargs):
+    if _timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_timed_execute)
+
+
+def install():
+    """Times every statement on Django connections opened from now on."""
+    connection_created.connect(_install_wrapper, dispatch_uid="backend_app.slow_query")
@@ -0,0 +1,253 @@
+from datetime import datetime, time, timedelta, timezone
+
+from django.conf import settings
+from django.db import transaction
+
+from .db import execute_query, prepared
+from .pagination import decode_cursor, keyset_result
+from .product_service import adjust_stock
+from backend_app.exception import DatabaseFetchError, DatabaseUpdateError, ProductAppError, ValidationError
+
+# ---------------- STOCK MOVEMENT LEDGER ----------------
+# Every quantity change on tbl_products is appended to tbl_stock_movements
+# by a trigger (migration 0005), which also moves tbl_stock_balances by the
+# same delta. Movements recorded here only add the business meaning (type,
+# reference, location) on top of adjust_stock().
+#
+# Stock as of a moment is answered without scanning history: from the running
+# balance when nothing moved since, otherwise from the product's last daily
+# snapshot before that day plus the few movements after it. Snapshots are
+# sparse (only products that moved that day) and built incrementally by
+# 'manage.py stock_ledger snapshot'.
+
+MOVEMENT_TYPES = ("receipt", "sale", "adjustment", "transfer")
+
+BALANCE_QUERY = prepared("""
+    SELECT quantity, movement_count, last_movement_at
+    FROM tbl_stock_balances WHERE product_id = %s
+""")
+
+LAST_SNAPSHOT_QUERY = prepared("""
+    SELECT snapshot_date, quantity FROM tbl_stock_snapshots
+    WHERE product_id = %s AND snapshot_date < %s
+    ORDER BY snapshot_date DESC
+    LIMIT 1
+""")
+
+TAIL_QUERY = prepared("""
+    SELECT COALESCE(SUM(quantity_delta), 0) AS delta, COUNT(*) AS movements
+    FROM tbl_stock_movements
+    WHERE product_id = %s AND moved_at >= %s AND moved_at <= %s
+""")
+
+HISTORY_COLUMNS = (
+    "id, product_id, movement_type, quantity_delta, balance_after, "
+    "location, reference, reason, created_by, moved_at"
+)
+
+PRODUCT_EXISTS_QUERY = "SELECT 1 FROM tbl_products WHERE id = %s"
+
+LAST_SNAPSHOT_RUN_QUERY = "SELECT MAX(snapshot_date) AS last_date FROM tbl_stock_snapshot_runs"
+FIRST_MOVEMENT_QUERY = "SELECT MIN(moved_at) AS first_moved_at FROM tbl_stock_movements"
+
+# end-of-day quantity = the product's previous snapshot + that day's movements;
+# correct because every earlier day was snapshotted before this one
+SNAPSHOT_DAY_QUERY = """
+    INSERT INTO tbl_stock_snapshots (product_id, snapshot_date, quantity)
+    SELECT m.product_id, %(day)s,
+           COALESCE((
+               SELECT s.quantity FROM tbl_stock_snapshots s
+               WHERE s.product_id = m.product_id AND s.snapshot_date < %(day)s
+               ORDER BY s.snapshot_date DESC
+               LIMIT 1
+           ), 0) + m.delta
+    FROM (
+        SELECT product_id, SUM(quantity_delta) AS delta
+        FROM tbl_stock_movements
+        WHERE moved_at >= %(start)s AND moved_at < %(end)s
+        GROUP BY product_id
+    ) AS m
+    ON CONFLICT (product_id, snapshot_date) DO UPDATE SET quantity = EXCLUDED.quantity
+"""
+SNAPSHOT_RUN_QUERY = """
+    INSERT INTO tbl_stock_snapshot_runs (snapshot_date, products) VALUES (%s, %s)
+    ON CONFLICT (snapshot_date) DO UPDATE SET products = EXCLUDED.products, created_at = now()
+"""
+
+ENSURE_PARTITION_QUERY = "SELECT fn_stock_movements_ensure_partition(%s) AS partition"
+DEFAULT_PARTITION_ROWS_QUERY = "SELECT COUNT(*) AS rows FROM tbl_stock_movements_default"
+DEFAULT_PARTITION_MONTHS_QUERY = """
+    SELECT DISTINCT date_trunc('month', moved_at AT TIME ZONE 'UTC')::date AS month
+    FROM tbl_stock_movements_default
+"""
+
+VERIFY_QUERY = """
+    SELECT p.id AS product_id, COALESCE(p.quantity, 0) AS product_quantity,
+           COALESCE(b.quantity, 0) AS balance_quantity
+    FROM tbl_products p
+    FULL JOIN tbl_stock_balances b ON b.product_id = p.id
+    WHERE COALESCE(p.quantity, 0) <> COALESCE(b.quantity, 0)
+    ORDER BY 1
+    LIMIT %s
+"""
+
+
+def _day_start(day):
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+# ---------------- RECORD ----------------
+def record_movement(product_id, movement_type, quantity, created_by, reference=None, location=None,
+                    to_location=None, reason=None, allow_negative=False):
+    """
+    Records a receipt (+quantity), sale (-quantity), adjustment (signed
+    quantity) or transfer of `quantity` from `location` to `to_location`.
+    A transfer is two ledger rows in one transaction and leaves the total
+    quantity unchanged.
+    """
+    if movement_type not in MOVEMENT_TYPES:
+        raise ValidationError(f"Unknown movement type '{movement_type}'. Use one of: {', '.join(MOVEMENT_TYPES)}.")
+    if quantity == 0 or (movement_type != "adjustment" and quantity < 0):
+        raise ValidationError("quantity must be positive (adjustments: non-zero).")
+
+    common = {
+        "updated_by": created_by,
+        "update_reason": reason or movement_type.capitalize(),
+        "allow_negative": allow_negative,
+        "movement_type": movement_type,
+        "reference": reference,
+    }
+    if movement_type != "transfer":
+        delta = -quantity if movement_type == "sale" else quantity
+        return {"movement_type": movement_type, "quantity_delta": delta,
+                **adjust_stock(product_id, delta, location=location, **common)}
+
+    if not location or not to_location or location == to_location:
+        raise ValidationError("A transfer needs different 'location' and 'to_location'.")
+    try:
+        with transaction.atomic():
+            adjust_stock(product_id, -quantity, location=location, **common)
+            result = adjust_stock(product_id, quantity, location=to_location, **common)
+    except ProductAppError:
+        raise
+    except Exception as e:
+        raise DatabaseUpdateError(f"Failed to transfer stock of product ID {product_id}: {str(e)}")
+    return {"movement_type": movement_type, "quantity_delta": 0, **result}
+
+
+# ---------------- READ ----------------
+def stock_as_of(product_id, as_of=None):
+    """Quantity of the product at `as_of` (default: now) from balances/snapshots."""
+    try:
+        balance = execute_query(BALANCE_QUERY, [product_id], fetch=True)
+        if not balance:
+            if not execute_query(PRODUCT_EXISTS_QUERY, [product_id], fetch=True):
+                raise ValidationError(f"Product {product_id} does not exist.")
+            return {"product_id": product_id, "as_of": as_of, "quantity": 0, "source": "balance"}
+
+        balance = balance[0]
+        if as_of is None or as_of >= balance["last_movement_at"]:
+            # nothing moved since: the running balance is the answer
+            return {"product_id": product_id, "as_of": as_of, "quantity": balance["quantity"], "source": "balance"}
+
+        snapshot = execute_query(LAST_SNAPSHOT_QUERY, [product_id, as_of.astimezone(timezone.utc).date()], fetch=True)
+        if snapshot:
+            base, since = snapshot[0]["quantity"], _day_start(snapshot[0]["snapshot_date"] + timedelta(days=1))
+        else:
+            base, since = 0, datetime.min.replace(tzinfo=timezone.utc)
+        tail = execute_query(TAIL_QUERY, [product_id, since, as_of], fetch=True)[0]
+        return {
+            "product_id": product_id,
+            "as_of": as_of,
+            "quantity": base + tail["delta"],
+            "source": "snapshot" if snapshot else "movements",
+            "snapshot_date": snapshot[0]["snapshot_date"] if snapshot else None,
+            "tail_movements": tail["movements"],
+        }
+    except ProductAppError:
+        raise
+    except Exception as e:
+        raise DatabaseFetchError(f"Error computing stock of product ID {product_id}: {str(e)}")
+
+
+def movement_history(product_id, since=None, until=None, cursor=None, limit=50):
+    """Newest-first movements of one product, keyset paginated on (moved_at, id)."""
+    conditions = ["product_id = %s"]
+    params = [product_id]
+    if since is not None:
+        conditions.append("moved_at >= %s")
+        params.append(since)
+    if until is not None:
+        conditions.append("moved_at <= %s")
+        params.append(until)
+    after = decode_cursor(cursor, "moved_at")
+    if after is not None:
+        conditions.append("(moved_at, id) < (%s::timestamptz, %s)")
+        params.extend(after)
+
+    sql = (
+        f"SELECT {HISTORY_COLUMNS} FROM tbl_stock_movements WHERE {' AND '.join(conditions)} "
+        "ORDER BY moved_at DESC, id DESC LIMIT %s"
+    )
+    try:
+        rows = execute_query(sql, params + [limit + 1], fetch=True)
+    except Exception as e:
+        raise DatabaseFetchError(f"Error fetching stock movements of product ID {product_id}: {str(e)}")
+    return keyset_result(rows, "moved_at", limit)
+
+
+# ---------------- MAINTENANCE ----------------
+def build_snapshots(through=None):
+    """
+    Snapshots every day after the last snapshotted one up to `through`
+    (default: yesterday, UTC). Returns {date: products snapshotted}.
+    """
+    through = through or datetime.now(timezone.utc).date() - timedelta(days=1)
+    last = execute_query(LAST_SNAPSHOT_RUN_QUERY, fetch=True)[0]["last_date"]
+    if last is None:
+        first = execute_query(FIRST_MOVEMENT_QUERY, fetch=True)[0]["first_moved_at"]
+        if first is None:
+            return {}
+        day = first.astimezone(timezone.utc).date()
+    else:
+        day = last + timedelta(days=1)
+
+    done = {}
+    while day <= through:
+        with transaction.atomic():
+            execute_query(
+                SNAPSHOT_DAY_QUERY,
+                {"day": day, "start": _day_start(day), "end": _day_start(day + timedelta(days=1))},
+            )
+            count = execute_query(
+                "SELECT COUNT(*) AS n FROM tbl_stock_snapshots WHERE snapshot_date = %s", [day], fetch=True
+            )[0]["n"]
+            execute_query(SNAPSHOT_RUN_QUERY, [day, count])
+        done[day.isoformat()] = count
+        day += timedelta(days=1)
+    return done
+
+
+def ensure_partitions(months_ahead=None):
+    """
+    Creates the monthly movement partitions from this month to `months_ahead`
+    months out, plus any month whose rows ended up in the default partition.
+    """
+    months_ahead = getattr(settings, "STOCK_LEDGER_PARTITION_MONTHS_AHEAD", 3) if months_ahead is None else months_ahead
+    months = [row["month"] for row in execute_query(DEFAULT_PARTITION_MONTHS_QUERY, fetch=True)]
+    month = datetime.now(timezone.utc).date().replace(day=1)
+    for _ in range(months_ahead + 1):
+        months.append(month)
+        month = (month + timedelta(days=32)).replace(day=1)
+
+    created = []
+    for month in sorted(set(months)):
+        with transaction.atomic():
+            created.append(execute_query(ENSURE_PARTITION_QUERY, [month], fetch=True)[0]["partition"])
+    leftover = execute_query(DEFAULT_PARTITION_ROWS_QUERY, fetch=True)[0]["rows"]
+    return {"partitions": created, "default_partition_rows": leftover}
+
+
+def verify_balances(limit=100):
+    """Products whose ledger balance disagrees with tbl_products.quantity (should be none)."""
+    return execute_query(VERIFY_QUERY, [limit], fetch=True)
@@ -1,4 +1,7 @@
 from .db import execute_query
+from .pagination import keyset_page
+from .counting import paginated_query
+from .cache_service import bump_version
 # =========================
 # Create Supplier
 # =========================
@@ -11,20 +14,34 @@ def create_supplier(data):
             data.get('created_by')
         ]
     )
+    bump_version("suppliers")
 # =========================
 # Get All Suppliers
 # =========================
-def list_suppliers(limit=3, offset=0):
-    data = execute_query(
-        "SELECT * FROM sp_read_get_supplier() LIMIT %s OFFSET %s",
-        [limit, offset],
-        fetch=True
+def list_suppliers(limit=3, offset=0, count_strategy=None, row_factory="dict"):
+    #the total count of records (for Pagination UI) comes from the configured count strategy
+    return paginated_query(
+        "sp_read_get_supplier()",
+        [],
+        limit,
+        offset,
+        table="tbl_suppliers",
+        resource="suppliers",
+        strategy=count_strategy,
+        row_factory=row_factory,
+    )
+# =========================
+# Get Suppliers (cursor pagination)
+# =========================
+def list_suppliers_keyset(cursor=None, limit=3, sort="id", row_factory="dict"):
+    return keyset_page(
+        "tbl_suppliers",
+        sort,
+        cursor=cursor,
+        limit=limit,
+        sort_keys=("id", "name"),
+        row_factory=row_factory,
     )
-    #for the total count of records (for Pagination UI)
-    count_res = execute_query("SELECT COUNT(*) FROM tbl_suppliers", fetch=True)
-    total_count = count_res[0]['count'] if count_res else 0
-    
-    return {"results": data, "total_count": total_count}
 # =========================
 # Update Supplier
 # =========================
@@ -39,8 +56,10 @@ def update_supplier(id, data):
             data.get('update_reason')
         ]
     )
+    bump_version("suppliers")
 def delete_supplier(id):
     execute_query(
         "SELECT sp_delete_delete_supplier(%s)",
         [id]
     )
+    bump_version("suppliers")
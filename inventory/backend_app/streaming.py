@@ -0,0 +1,195 @@
+import csv
+import json
+import zlib
+from itertools import chain
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+# Rows are buffered into chunks of roughly this many characters before being
+# handed to the server, so we neither hold the whole body nor write per row.
+CHUNK_SIZE = 64 * 1024
+
+
+def _peek(rows):
+    """
+    Pulls the first row so the query runs while the view is still executing.
+    Database errors then reach the exception middleware instead of breaking
+    a response that has already started.
+    """
+    rows = iter(rows)
+    try:
+        first = next(rows)
+    except StopIteration:
+        return iter(())
+    return chain([first], rows)
+
+
+def _json_array_chunks(rows, prefix, suffix):
+    encoder = JSONEncoder()
+    buffer = [prefix, "["]
+    size = 0
+    first = True
+    for row in rows:
+        item = encoder.encode(row)
+        buffer.append(item if first else "," + item)
+        first = False
+        size += len(item) + 1
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    buffer.extend(["]", suffix])
+    yield "".join(buffer)
+
+
+def streaming_json_response(rows, envelope=None, key="data", status=200):
+    """
+    Streams `rows` as a JSON array. With `envelope`, the array is nested under
+    `key` inside that object, e.g. {"status": "success", "data": [...]}.
+    """
+    prefix, suffix = "", ""
+    if envelope is not None:
+        head = json.dumps(envelope)[:-1]
+        prefix = f'{head}{", " if envelope else ""}{json.dumps(key)}: '
+        suffix = "}"
+
+    return StreamingHttpResponse(
+        _json_array_chunks(_peek(rows), prefix, suffix),
+        content_type="application/json",
+        status=status,
+    )
+
+
+# ---------------- FILE EXPORT ENCODERS ----------------
+# Each encoder turns one (columns, rows) batch into one text chunk. The same
+# encoders serve the sync exports (WSGI) and the async ones (ASGI): Django
+# reads a sync iterator completely into memory before sending it under ASGI,
+# so an ASGI deployment must stream exports from an async iterator.
+
+class _Echo:
+    """csv.writer target that hands back each written line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_encoder():
+    """CSV from (columns, tuple rows) batches: the tuples are written as they are."""
+    writer = csv.writer(_Echo())
+    header_written = False
+
+    def encode(columns, rows):
+        nonlocal header_written
+        buffer = []
+        if not header_written:
+            buffer.append(writer.writerow(columns))
+            header_written = True
+        buffer.extend(writer.writerow(row) for row in rows)
+        return "".join(buffer)
+    return encode
+
+
+def ndjson_encoder():
+    encoder = JSONEncoder()
+
+    def encode(columns, rows):
+        # one short-lived dict per line; nothing is kept past the batch
+        return "".join(encoder.encode(dict(zip(columns, row))) + "\n" for row in rows)
+    return encode
+
+
+def export_chunks(make_encoder, batches):
+    encode = make_encoder()
+    for columns, rows in batches:
+        yield encode(columns, rows)
+
+
+async def aexport_chunks(make_encoder, batches):
+    encode = make_encoder()
+    async for columns, rows in batches:
+        yield encode(columns, rows)
+
+
+def _gzip_compressor(level):
+    return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def gzip_chunks(chunks, level=6):
+    """Compresses a stream of text chunks into a gzip stream, chunk by chunk."""
+    compressor = _gzip_compressor(level)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def agzip_chunks(chunks, level=6):
+    """Async twin of gzip_chunks()."""
+    compressor = _gzip_compressor(level)
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+EXPORT_ENCODERS = {
+    "csv": (csv_encoder, "text/csv"),
+    "ndjson": (ndjson_encoder, "application/x-ndjson"),
+}
+
+
+def _export_response(chunks, content_type, filename):
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def streaming_export_response(batches, file_format, filename, compress=False):
+    """
+    Streams (columns, rows) batches from db.stream_batches as a CSV/NDJSON
+    download, optionally gzip-compressed. Each batch becomes one chunk.
+    WSGI only: see astreaming_export_response for ASGI.
+    """
+    make_encoder, content_type = EXPORT_ENCODERS[file_format]
+    chunks = export_chunks(make_encoder, _peek(batches))
+    filename = f"{filename}.{file_format}"
+    if compress:
+        chunks = gzip_chunks(chunks)
+        content_type = "application/gzip"
+        filename += ".gz"
+    return _export_response(chunks, content_type, filename)
+
+
+async def _apeek(batches):
+    """Async twin of _peek(): the first batch is awaited before the response starts."""
+    batches = aiter(batches)
+    try:
+        first = await anext(batches)
+    except StopAsyncIteration:
+        first = None
+
+    async def chained():
+        if first is None:
+            return
+        yield first
+        async for batch in batches:
+            yield batch
+    return chained()
+
+
+async def astreaming_export_response(batches, file_format, filename, compress=False):
+    """
+    streaming_export_response() for async (columns, rows) batches, e.g. from
+    async_db.async_stream_batches: the body is an async iterator, which ASGI
+    sends chunk by chunk.
+    """
+    make_encoder, content_type = EXPORT_ENCODERS[file_format]
+    chunks = aexport_chunks(make_encoder, await _apeek(batches))
+    filename = f"{filename}.{file_format}"
+    if compress:
+        chunks = agzip_chunks(chunks)
+        content_type = "application/gzip"
+        filename += ".gz"
+    return _export_response(chunks, content_type, filename)
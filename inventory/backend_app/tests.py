@@ -1,3 +1,941 @@
-from django.test import TestCase
+import asyncio
+import base64
+import contextlib
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+import uuid
+from datetime import date, datetime, time as clock_time, timedelta, timezone
+from decimal import Decimal
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core import mail
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.core.handlers.asgi import ASGIHandler
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+
+from backend_app import conditional, renderers, streaming
+from backend_app.exception import ConcurrencyConflictError, DatabaseUpdateError, InvalidFileFormatError, ValidationError
+from backend_app.services import (
+    auth_service, cache_service, counting, db, import_service, job_queue, mail_service, media_service, pagination, product_service, slow_query,
+)
+from backend_app.views import async_views, media_views
+
+# The inventory tables come from the SQL scripts, not from migrations, so these
+# tests don't create a test database: queries are patched where a test needs
+# their results, and the job queue runs on a throwaway SQLite file. The locmem
+# email backend stands in for the mail server (mail.outbox).
+
+OTP_ROW = [{"otp": "482913"}]
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    JOB_QUEUE_EAGER=True,
+)
+class OTPMailTests(SimpleTestCase):
+
+    @mock.patch.object(mail_service, "execute_query", return_value=OTP_ROW)
+    def test_queued_otp_job_lands_in_outbox(self, lookup):
+        mail_service.queue_otp_email("user@example.com")
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["user@example.com"])
+        self.assertIn("482913", mail.outbox[0].body)
+        lookup.assert_called_once_with(mail_service.OTP_QUERY, ["user@example.com"], fetch=True)
+
+    @mock.patch.object(mail_service, "execute_query", return_value=[{"otp": None}])
+    def test_used_otp_is_not_sent(self, lookup):
+        mail_service.queue_otp_email("user@example.com")
+
+        self.assertEqual(mail.outbox, [])
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    JOB_QUEUE_EAGER=False,
+    JOB_QUEUE_AUTOSTART=False,
+    JOB_QUEUE_MAX_ATTEMPTS=3,
+    JOB_QUEUE_BACKOFF_BASE=2,
+    JOB_QUEUE_BACKOFF_MAX=300,
+)
+class JobQueueRetryTests(SimpleTestCase):
+    """Stored jobs, run one at a time with work_once() instead of worker threads."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path_override = override_settings(JOB_QUEUE_PATH=os.path.join(tmp.name, "jobs.sqlite3"))
+        path_override.enable()
+        self.addCleanup(path_override.disable)
+
+        lookup = mock.patch.object(mail_service, "execute_query", return_value=OTP_ROW)
+        lookup.start()
+        self.addCleanup(lookup.stop)
+
+    def job_row(self, job_id):
+        conn = job_queue._connect()
+        try:
+            return dict(conn.execute("SELECT * FROM jobs WHERE id = ?", [job_id]).fetchone())
+        finally:
+            conn.close()
+
+    def make_due(self, job_id):
+        conn = job_queue._connect()
+        try:
+            conn.execute("UPDATE jobs SET run_at = 0 WHERE id = ?", [job_id])
+        finally:
+            conn.close()
+
+    def test_payload_holds_no_otp(self):
+        job_id = mail_service.queue_otp_email("user@example.com")
+
+        payload = json.loads(self.job_row(job_id)["payload"])
+        self.assertEqual(payload, {"email": "user@example.com", "purpose": "password_reset"})
+
+    def test_failing_send_is_retried_with_backoff(self):
+        real_send_mail = mail_service.send_mail
+        calls = []
+
+        def flaky_send_mail(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                raise SMTPException("mail server unavailable")
+            return real_send_mail(*args, **kwargs)
+
+        with mock.patch.object(mail_service, "send_mail", side_effect=flaky_send_mail):
+            job_id = mail_service.queue_otp_email("user@example.com")
+            before = time.time()
+            self.assertTrue(job_queue.work_once())
+
+            row = self.job_row(job_id)
+            self.assertEqual(row["status"], job_queue.QUEUED)
+            self.assertEqual(row["attempts"], 1)
+            self.assertIn("mail server unavailable", row["last_error"])
+            # first retry: JOB_QUEUE_BACKOFF_BASE seconds, with up to 50% jitter
+            self.assertGreaterEqual(row["run_at"], before + 1)
+            self.assertLessEqual(row["run_at"], time.time() + 2)
+            self.assertFalse(job_queue.work_once(), "a backed-off job must not run early")
+            self.assertEqual(mail.outbox, [])
+
+            self.make_due(job_id)
+            self.assertTrue(job_queue.work_once())
+
+        row = self.job_row(job_id)
+        self.assertEqual(row["status"], job_queue.DONE)
+        self.assertEqual(row["attempts"], 2)
+        self.assertEqual(row["payload"], "{}")
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("482913", mail.outbox[0].body)
+
+    def test_moves_to_dead_letters_after_max_attempts(self):
+        with mock.patch.object(mail_service, "send_mail", side_effect=SMTPException("rejected")):
+            job_id = mail_service.queue_otp_email("user@example.com")
+            for attempt in range(1, 4):
+                self.make_due(job_id)
+                self.assertTrue(job_queue.work_once())
+                self.assertEqual(self.job_row(job_id)["attempts"], attempt)
+
+        row = self.job_row(job_id)
+        self.assertEqual(row["status"], job_queue.DEAD)
+        self.assertFalse(job_queue.work_once())
+        self.assertEqual(job_queue.queue_stats()[job_queue.DEAD], 1)
+        self.assertEqual([dead["id"] for dead in job_queue.dead_letters()], [job_id])
+        self.assertEqual(mail.outbox, [])
+
+        # a dead job keeps its payload so it can be retried
+        self.assertEqual(job_queue.retry_dead(job_id), 1)
+        self.assertEqual(self.job_row(job_id)["status"], job_queue.QUEUED)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "counting-tests"}},
+    LIST_COUNT_STRATEGY="window",
+)
+class CountStrategyTests(SimpleTestCase):
+
+    def setUp(self):
+        self.versions = {"products": 1}
+        for target, attribute, value in (
+            (cache_service, "get_db_versions", lambda resources: dict(self.versions)),
+            (counting, "execute_query", mock.Mock(return_value=[{"id": 1}])),
+            (counting, "_exact_count", mock.Mock(return_value=40)),
+            (counting, "_estimated_count", mock.Mock(return_value=37)),
+        ):
+            patcher = mock.patch.object(target, attribute, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def page(self, strategy):
+        return counting.paginated_query("sp_read_get_product()", [], 10, 0, "tbl_products", "products",
+                                        where="status = TRUE", strategy=strategy)
+
+    def test_strategy_comes_from_settings_unless_given(self):
+        self.assertEqual(counting.get_count_strategy(), "window")
+        self.assertEqual(counting.get_count_strategy("estimate"), "estimate")
+        with override_settings(LIST_COUNT_STRATEGY="cached"):
+            self.assertEqual(counting.get_count_strategy(), "cached")
+        with self.assertRaises(ValueError):
+            counting.get_count_strategy("guess")
+
+    def test_exact_and_estimate(self):
+        page = self.page("exact")
+        self.assertEqual((page["total_count"], page["total_count_exact"]), (40, True))
+        page = self.page("estimate")
+        self.assertEqual((page["total_count"], page["total_count_exact"]), (37, False))
+        counting._estimated_count.assert_called_with("tbl_products", "status = TRUE")
+
+    def test_estimate_without_statistics_falls_back_to_an_exact_count(self):
+        counting._estimated_count.return_value = None
+        page = self.page("estimate")
+        self.assertEqual((page["total_count"], page["total_count_exact"]), (40, True))
+
+    def test_cached_count_follows_the_postgres_version(self):
+        self.assertEqual(self.page("cached")["total_count"], 40)
+        counting._exact_count.return_value = 41
+        # same version: served from the cache
+        self.assertEqual(self.page("cached")["total_count"], 40)
+        # another worker's write advanced the sequence: counted again
+        self.versions["products"] = 2
+        self.assertEqual(self.page("cached")["total_count"], 41)
+        self.assertEqual(counting._exact_count.call_count, 2)
+
+    def test_window_count_is_taken_from_the_page(self):
+        counting.execute_query.return_value = [{"id": 1, "_total_count": 12}, {"id": 2, "_total_count": 12}]
+        page = self.page("window")
+        self.assertEqual(page["total_count"], 12)
+        self.assertEqual(page["results"], [{"id": 1}, {"id": 2}])
+        counting._exact_count.assert_not_called()
+
+
+def export_batches(pulled, count=5):
+    """(columns, rows) batches like db.stream_batches, counting how many were pulled."""
+    for number in range(count):
+        pulled.append(number)
+        yield ["id", "name"], [(number * 2 + 1, f"item {number}"), (number * 2 + 2, "a,b")]
+
+
+async def aexport_batches(pulled, count=5):
+    for batch in export_batches(pulled, count):
+        yield batch
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class ExportStreamingTests(SimpleTestCase):
+    """Exports must leave the server batch by batch, never collected in memory first."""
+
+    def test_sync_export_pulls_batches_as_it_is_sent(self):
+        pulled = []
+        response = streaming.streaming_export_response(export_batches(pulled), "csv", "products")
+
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.is_async)
+        chunks = iter(response.streaming_content)
+        self.assertEqual(next(chunks), b'id,name\r\n1,item 0\r\n2,"a,b"\r\n')
+        self.assertLessEqual(len(pulled), 2)
+        self.assertEqual(len(list(chunks)), 4)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="products.csv"')
+
+    def test_async_export_is_streamed_by_the_asgi_handler(self):
+        pulled = []
+        sent = []
+        token, _ = auth_service.generate_tokens(1, "admin")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/api/async/export/products/", "raw_path": b"/api/async/export/products/",
+            "query_string": b"output=ndjson", "root_path": "", "server": ("testserver", 80),
+            "client": ("127.0.0.1", 1234), "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+
+        requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await asyncio.Future()  # the client never disconnects
+
+        async def send(message):
+            # how many batches had been read when each message went out
+            sent.append((message, len(pulled)))
+
+        with mock.patch.object(async_views, "astream_export", lambda resource: aexport_batches(pulled)):
+            async_to_sync(ASGIHandler())(scope, receive, send)
+
+        start, *bodies = [message for message, _ in sent]
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"Content-Type", b"application/x-ndjson"), start["headers"])
+        chunks = [body["body"] for body in bodies if body.get("body")]
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(chunks[0], b'{"id": 1, "name": "item 0"}\n{"id": 2, "name": "a,b"}\n')
+        # the first chunk was sent before the remaining batches were read
+        self.assertLessEqual(sent[1][1], 2)
+
+    def test_async_export_gzip(self):
+        pulled = []
+
+        async def body():
+            response = await streaming.astreaming_export_response(
+                aexport_batches(pulled), "csv", "products", compress=True
+            )
+            self.assertTrue(response.is_async)
+            self.assertEqual(response["Content-Disposition"], 'attachment; filename="products.csv.gz"')
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        csv_text = gzip.decompress(async_to_sync(body)()).decode()
+        self.assertEqual(csv_text.splitlines()[0], "id,name")
+        self.assertEqual(len(csv_text.splitlines()), 11)
+
+
+def raw_cursor(payload):
+    """A cursor built by hand, the way a client could forge one."""
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+class KeysetCursorTests(SimpleTestCase):
+
+    def test_round_trip(self):
+        moved_at = datetime(2026, 10, 18, 9, 30, 15, 250000, tzinfo=timezone.utc)
+        for sort, row in (
+            ("id", {"id": 42}),
+            ("name", {"name": "Widget, large", "id": 7}),
+            ("rank", {"rank": 0.0759909, "id": 3}),
+            ("moved_at", {"moved_at": moved_at, "id": 9}),
+        ):
+            with self.subTest(sort=sort):
+                cursor = pagination.encode_cursor(sort, row)
+                self.assertNotIn("=", cursor)
+                sort_value, row_id = pagination.decode_cursor(cursor, sort)
+                self.assertEqual(row_id, row["id"])
+                expected = str(moved_at) if sort == "moved_at" else row[sort]
+                self.assertEqual(sort_value, expected)
+
+    def test_first_page_has_no_cursor(self):
+        self.assertIsNone(pagination.decode_cursor(None, "id"))
+        self.assertIsNone(pagination.decode_cursor("", "id"))
+
+    def test_cursor_of_another_sort_is_rejected(self):
+        cursor = pagination.encode_cursor("name", {"name": "a", "id": 1})
+        with self.assertRaisesMessage(ValidationError, "does not match the requested sort"):
+            pagination.decode_cursor(cursor, "id")
+
+    def test_bad_cursors_are_rejected(self):
+        for label, sort, cursor in (
+            ("not base64", "name", "%%%"),
+            ("not json", "name", base64.urlsafe_b64encode(b"{nope").decode()),
+            ("not an object", "name", raw_cursor(["name", "a", 1])),
+            ("missing id", "name", raw_cursor({"s": "name", "k": "a"})),
+            ("object key", "name", raw_cursor({"s": "name", "k": {"$gt": ""}, "id": 1})),
+            ("list key", "name", raw_cursor({"s": "name", "k": ["a", "b"], "id": 1})),
+            ("null key", "name", raw_cursor({"s": "name", "k": None, "id": 1})),
+            ("number for a name", "name", raw_cursor({"s": "name", "k": 5, "id": 1})),
+            ("string for a rank", "rank", raw_cursor({"s": "rank", "k": "0.5", "id": 1})),
+            ("bool for an id", "id", raw_cursor({"s": "id", "k": True, "id": 1})),
+            ("bad timestamp", "moved_at", raw_cursor({"s": "moved_at", "k": "yesterday", "id": 1})),
+            ("string id", "id", raw_cursor({"s": "id", "k": 1, "id": "1"})),
+            ("float id", "id", raw_cursor({"s": "id", "k": 1, "id": 1.5})),
+        ):
+            with self.subTest(label), self.assertRaisesMessage(ValidationError, "Invalid pagination cursor"):
+                pagination.decode_cursor(cursor, sort)
+
+    def test_keyset_query_seeks_after_the_cursor(self):
+        cursor = pagination.encode_cursor("name", {"name": "m", "id": 10})
+        sql, params = pagination.build_keyset_query(
+            "tbl_products", "name", cursor, limit=5, where="status = TRUE", sort_keys=("id", "name")
+        )
+        self.assertIn("WHERE status = TRUE AND (name, id) > (%s, %s) ORDER BY name, id LIMIT %s", sql)
+        self.assertEqual(params, ["m", 10, 6])
+        with self.assertRaises(ValidationError):
+            pagination.build_keyset_query("tbl_products", "price", None, sort_keys=("id", "name"))
+
+
+class MediaRangeTests(SimpleTestCase):
+    BODY = b"abcdefghijklmnopqrstuvwxyz"
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media_root = override_settings(MEDIA_ROOT=tmp.name, MEDIA_ACCEL_REDIRECT=None)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        os.makedirs(os.path.join(tmp.name, "docs"))
+        self.path = os.path.join(tmp.name, "docs", "letters.txt")
+        with open(self.path, "wb") as fh:
+            fh.write(self.BODY)
+        os.utime(self.path, (1_700_000_000, 1_700_000_000))
+
+    def get(self, **headers):
+        request = RequestFactory().get("/media/docs/letters.txt", **headers)
+        response = media_views.serve_media(request, "docs/letters.txt")
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+        return b"".join(response.streaming_content) if response.streaming else response.content
+
+    def test_parse_range(self):
+        for header, expected in (
+            ("bytes=0-4", (0, 4)),
+            ("bytes=5-", (5, 25)),
+            ("bytes=-3", (23, 25)),
+            ("bytes=-100", (0, 25)),
+            ("bytes=20-100", (20, 25)),
+            ("bytes = 1-2", (1, 2)),
+            ("bytes=5-3", None),      # last < first: invalid, ignored
+            ("bytes=0-1,4-5", None),  # multiple ranges: full response
+            ("bytes=-", None),
+            ("items=0-4", None),
+            ("bytes=26-", False),     # starts past the end
+            ("bytes=30-40", False),
+            ("bytes=-0", False),
+        ):
+            with self.subTest(header):
+                self.assertEqual(media_views._parse_range(header, 26), expected)
+        self.assertIs(media_views._parse_range("bytes=-5", 0), False)
+
+    def test_full_response_has_validators(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.BODY)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Last-Modified"], http_date(1_700_000_000))
+        self.assertTrue(response["ETag"].startswith('"'))
+
+    def test_partial_content(self):
+        response = self.get(HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-5/26")
+        self.assertEqual(response["Content-Length"], "4")
+        self.assertEqual(self.body(response), b"cdef")
+
+    def test_invalid_range_is_ignored(self):
+        response = self.get(HTTP_RANGE="bytes=5-3")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.BODY)
+
+    def test_range_past_the_end_is_416(self):
+        response = self.get(HTTP_RANGE="bytes=26-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */26")
+
+    def test_not_modified(self):
+        etag = self.get()["ETag"]
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=f"W/{etag}").status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH="*").status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=http_date(1_700_000_000)).status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=http_date(1_600_000_000)).status_code, 200)
+        # If-None-Match wins over If-Modified-Since
+        response = self.get(HTTP_IF_NONE_MATCH='"other"', HTTP_IF_MODIFIED_SINCE=http_date(1_700_000_000))
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_range(self):
+        etag = self.get()["ETag"]
+        self.assertEqual(self.get(HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE=etag).status_code, 206)
+        self.assertEqual(self.get(HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE=http_date(1_700_000_000)).status_code, 206)
+        # the client's copy is outdated: the whole file instead of a range of the new one
+        for if_range in ('"stale"', http_date(1_600_000_000)):
+            with self.subTest(if_range):
+                response = self.get(HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE=if_range)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.body(response), self.BODY)
+
+
+class BumpVersionTests(SimpleTestCase):
+    """bump_version() in autocommit mode: on_commit callbacks run right away."""
+
+    def setUp(self):
+        patcher = mock.patch.object(cache_service.transaction, "on_commit", lambda callback: callback())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch.object(cache_service, "execute_query")
+    def test_bumps_every_resource_in_one_statement(self, execute_query):
+        cache_service.bump_version("products", "categories")
+        execute_query.assert_called_once_with(
+            cache_service.BUMP_DB_VERSIONS_QUERY,
+            [["seq_resource_version_products", "seq_resource_version_categories"]],
+        )
+
+    def test_unknown_resource(self):
+        with self.assertRaises(ValueError):
+            cache_service.bump_version("products", "orders")
+
+    @mock.patch.object(cache_service, "execute_query", side_effect=DatabaseError("relation does not exist"))
+    def test_failed_bump_does_not_fail_the_write(self, execute_query):
+        with self.assertLogs("backend_app.cache", "ERROR") as logs:
+            cache_service.bump_version("products")
+        execute_query.assert_called_once()
+        self.assertIn("products", logs.output[0])
+
+
+@override_settings(ETAG_SALT="v1")
+class ConditionalGetTests(SimpleTestCase):
+
+    def setUp(self):
+        self.versions = {"products": 7, "categories": 3}
+        patcher = mock.patch.object(
+            conditional, "get_db_versions",
+            lambda resources: {resource: self.versions[resource] for resource in resources},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def etag(self, path="/api/products/?page=2", versions=None, extra=(), **headers):
+        request = RequestFactory().get(path, **headers)
+        return conditional.compute_etag(request, "products", versions or {"products": 7}, extra)
+
+    def test_compute_etag(self):
+        etag = self.etag()
+        self.assertRegex(etag, r'^"products-[0-9a-f]{24}"$')
+        self.assertEqual(etag, self.etag())
+        for changed in (
+            self.etag(path="/api/products/?page=3"),
+            self.etag(versions={"products": 8}),
+            self.etag(extra=[5]),
+            self.etag(HTTP_ACCEPT="text/csv"),
+        ):
+            self.assertNotEqual(changed, etag)
+        with override_settings(ETAG_SALT="v2"):
+            self.assertNotEqual(self.etag(), etag)
+        # version order does not matter
+        self.assertEqual(self.etag(versions={"a": 1, "b": 2}), self.etag(versions={"b": 2, "a": 1}))
+
+    def test_matches(self):
+        etag = '"products-abc"'
+        for header, expected in (
+            (None, False),
+            ('"products-abc"', True),
+            ('W/"products-abc"', True),
+            ('"other", W/"products-abc"', True),
+            ("*", True),
+            ('"products-abd"', False),
+            ("products-abc", False),
+        ):
+            with self.subTest(header):
+                headers = {"HTTP_IF_NONE_MATCH": header} if header else {}
+                self.assertIs(conditional._matches(RequestFactory().get("/", **headers), etag), expected)
+
+    def view(self, status=200):
+        seen = []
+
+        class View:
+            @conditional.conditional_on("products", ["products", "categories"])
+            def get(self, request):
+                seen.append(cache_service._current_versions.get())
+                return HttpResponse("body", status=status)
+        return View(), seen
+
+    def test_conditional_on(self):
+        view, seen = self.view()
+        response = view.get(RequestFactory().get("/api/products/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], conditional.REVALIDATE_CACHE_CONTROL)
+        # the handler's cached() calls key on the versions in the tag
+        self.assertEqual(seen, [{"products": 7, "categories": 3}])
+        self.assertIsNone(cache_service._current_versions.get())
+
+        etag = response["ETag"]
+        response = view.get(RequestFactory().get("/api/products/", HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual((response.status_code, response["ETag"]), (304, etag))
+        self.assertEqual(len(seen), 1, "a 304 must not run the handler")
+
+        self.versions["categories"] = 4
+        response = view.get(RequestFactory().get("/api/products/", HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_errors_are_not_tagged(self):
+        view, _ = self.view(status=400)
+        response = view.get(RequestFactory().get("/api/products/"))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.has_header("ETag"))
+
+
+class RowFactoryTests(SimpleTestCase):
+    COLUMNS = ["id", "name", "product_image"]
+    ROWS = [(1, "bolt", None), (2, "nut", "products/ab/" + "ab" * 32 + ".jpg"), (3, "gear", None)]
+
+    def test_make_rows(self):
+        self.assertEqual(db.make_rows(self.COLUMNS, self.ROWS)[1], {
+            "id": 2, "name": "nut", "product_image": self.ROWS[1][2],
+        })
+        rows = db.make_rows(self.COLUMNS, self.ROWS, "tuple")
+        self.assertIsInstance(rows, db.TupleRows)
+        self.assertEqual((rows.columns, list(rows)), (self.COLUMNS, self.ROWS))
+        self.assertIs(rows[0], self.ROWS[0], "tuple rows are the driver's tuples")
+        self.assertEqual(db.make_rows(self.COLUMNS, self.ROWS, "columnar"), {
+            "id": [1, 2, 3], "name": ["bolt", "nut", "gear"], "product_image": [None, self.ROWS[1][2], None],
+        })
+        self.assertEqual(db.make_rows(self.COLUMNS, [], "columnar"), {"id": [], "name": [], "product_image": []})
+        with self.assertRaises(ValueError):
+            db.make_rows(self.COLUMNS, self.ROWS, "namedtuple")
+
+    def test_record_class(self):
+        cls = db.record_class(("id", "class", "unit price", "id"))
+        self.assertIs(cls, db.record_class(("id", "class", "unit price", "id")))
+        self.assertEqual(cls._fields, ("id", "col_1", "col_2", "id_3"))
+        record = cls(5, "A", 9.5, 6)
+        self.assertEqual((record.id, record["class"], record["unit price"]), (5, "A", 9.5))
+        self.assertEqual(record._asdict(), {"id": 6, "class": "A", "unit price": 9.5})
+        self.assertEqual(list(record.keys()), ["id", "class", "unit price", "id"])
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(repr(cls(1, "B", 2, 3)), "Record(id=1, class='B', unit price=2, id=3)")
+        records = db.make_rows(self.COLUMNS, self.ROWS, "record")
+        self.assertEqual([r.name for r in records], ["bolt", "nut", "gear"])
+
+    def test_truncate_and_inspect_every_layout(self):
+        for factory in ("dict", "tuple", "columnar", "record"):
+            with self.subTest(factory):
+                rows = db.make_rows(self.COLUMNS, self.ROWS, factory)
+                self.assertEqual(db.row_count(rows), 3)
+                self.assertEqual(db.last_row_value(rows, "name"), "gear")
+                db.truncate_rows(rows, 2)
+                self.assertEqual(db.row_count(rows), 2)
+                self.assertEqual(db.last_row_value(rows, "id"), 2)
+
+    def test_extra_columns(self):
+        rows = db.make_rows(self.COLUMNS, self.ROWS, "tuple")
+        originals = list(rows)
+        media_service.attach_image_variants(rows)
+
+        self.assertEqual(rows.columns, self.COLUMNS)
+        self.assertTrue(all(row is original for row, original in zip(rows, originals)), "tuples must not be copied")
+        variants = rows.extra_columns["image_variants"]
+        self.assertEqual(len(variants), 3)
+        self.assertIsNone(variants[0])
+        self.assertTrue(variants[1]["thumb_webp"].endswith("_thumb.webp"))
+
+        db.truncate_rows(rows, 1)
+        self.assertEqual(rows.extra_columns["image_variants"], [None])
+        self.assertEqual(rows.as_dicts(), [{"id": 1, "name": "bolt", "product_image": None, "image_variants": None}])
+
+    def test_keyset_page_shares_columns(self):
+        rows = db.make_rows(self.COLUMNS, self.ROWS, "tuple")
+        page = pagination.keyset_result(rows, "id", 2)
+        self.assertEqual(len(page["results"]), 2)
+        self.assertEqual(pagination.decode_cursor(page["next_cursor"], "id"), (2, 2))
+        self.assertIs(page["columns"], rows.columns)
+        self.assertIs(page["extra_columns"], rows.extra_columns)
+
+
+@unittest.skipIf(renderers.orjson is None, "orjson is not installed")
+class ORJSONRendererTests(SimpleTestCase):
+    """The orjson renderer must produce exactly the bytes of DRF's JSONRenderer."""
+
+    PAGE = {
+        "results": [
+            {
+                "id": 1,
+                "name": "Bolt \"M8\" <zinc> & washer",
+                "description": "héllo wörld ✓ 日本",
+                "price": Decimal("12.50"),
+                "weight": 0.1,
+                "stock": 2 ** 40,
+                "status": True,
+                "product_image": None,
+                "created_at": datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc),
+                "updated_at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+                "imported_at": datetime(2026, 1, 2, 3, 4, 5),
+                "expires_on": date(2027, 6, 30),
+                "opens_at": clock_time(8, 30, 15, 500),
+                "lead_time": timedelta(days=2, seconds=5),
+                "batch": uuid.UUID(int=2 ** 100),
+                "tags": ("a", "b"),
+            },
+        ],
+        "total_count": 1,
+        "columns": ["id"],
+        "category_totals": {1: 5, 2: 0},
+        "extra_columns": {"image_variants": [{"thumb": "/media/x_thumb.jpg"}]},
+    }
+
+    def assertSameBytes(self, data):
+        self.assertEqual(renderers.ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_objects_page(self):
+        self.assertSameBytes(self.PAGE)
+
+    def test_rows_and_columns_layouts(self):
+        columns = ["id", "price", "created_at"]
+        rows = [(1, Decimal("1.10"), datetime(2026, 5, 1, tzinfo=timezone.utc)), (2, None, None)]
+        self.assertSameBytes({"columns": columns, "results": db.TupleRows(columns, rows)})
+        self.assertSameBytes({"results": db.make_rows(columns, rows, "columnar")})
+
+    def test_line_separators_are_escaped(self):
+        data = {"note": "line\u2028break\u2029end"}
+        self.assertSameBytes(data)
+        self.assertIn(b"\\u2028", renderers.ORJSONRenderer().render(data))
+
+    def test_empty_and_indented(self):
+        self.assertEqual(renderers.ORJSONRenderer().render(None), b"")
+        indented = renderers.ORJSONRenderer().render({"a": [1]}, "application/json; indent=2")
+        self.assertEqual(indented, JSONRenderer().render({"a": [1]}, "application/json; indent=2"))
+        self.assertIn(b"\n", indented)
+
+    def test_dumps(self):
+        self.assertEqual(renderers.dumps(self.PAGE), JSONRenderer().render(self.PAGE))
+
+
+class SlowQueryLogTests(SimpleTestCase):
+
+    def test_redact(self):
+        self.assertEqual(
+            slow_query.redact(["s3cret", 42, 1.5, None, True, b"xy", {"otp": "123456"}, Decimal("9.99")]),
+            ["<str:6>", "<int>", "<float>", None, "<bool>", "<bytes:2>", {"otp": "<str:6>"}, "<Decimal>"],
+        )
+        self.assertEqual(slow_query.redact(list(range(25)))[-1], "...")
+        self.assertEqual(len(slow_query.redact(list(range(25)))), 21)
+
+    def test_query_shape(self):
+        shape = slow_query.query_shape("SELECT *\n  FROM tbl_products\tWHERE name = 'O''Brien' AND price > 10.5 LIMIT 20")
+        self.assertEqual(shape, "SELECT * FROM tbl_products WHERE name = ? AND price > ? LIMIT ?")
+        # parameters and literals do not split a shape
+        self.assertEqual(
+            slow_query.fingerprint(slow_query.query_shape("SELECT * FROM t WHERE id = 1")),
+            slow_query.fingerprint(slow_query.query_shape("SELECT  * FROM t WHERE id = 2")),
+        )
+        self.assertIn("tbl_products2", slow_query.query_shape("SELECT 1 FROM tbl_products2"))
+
+    def test_explainable(self):
+        for sql, expected in (
+            ("SELECT * FROM tbl_products WHERE id = %s", True),
+            ("  with t AS (SELECT 1) SELECT * FROM t", True),
+            ("SELECT * FROM sp_read_get_product() LIMIT %s OFFSET %s", True),
+            ("SELECT * FROM sp_search_get_product(%s)", True),
+            ("SELECT sp_insert_add_product(%s, %s)", False),
+            ("SELECT * FROM sp_user_access_manager(%s, %s, %s, %s, %s)", False),
+            ("SELECT * FROM tbl_products WHERE id = %s FOR UPDATE", False),
+            ("SELECT * FROM tbl_products FOR NO KEY UPDATE", False),
+            ("SELECT * FROM tbl_products FOR SHARE", False),
+            ("SELECT nextval('seq_resource_version_products')", False),
+            ("SELECT pg_advisory_xact_lock(1)", False),
+            ("WITH moved AS (UPDATE tbl_products SET quantity = 0 RETURNING id) SELECT * FROM moved", False),
+            ("UPDATE tbl_products SET quantity = 0", False),
+            ("EXPLAIN SELECT 1", False),
+        ):
+            with self.subTest(sql):
+                self.assertIs(slow_query.explainable(sql), expected)
+
+    @override_settings(SLOW_QUERY_MS=100, SLOW_QUERY_EXPLAIN_SAMPLE_RATE=0)
+    def test_record_writes_redacted_entries(self):
+        with mock.patch.object(slow_query, "write_entry") as write_entry, self.assertLogs("backend_app.db", "WARNING"):
+            slow_query.record("SELECT * FROM tbl_users WHERE email = %s", ["a@example.com"], 0.25)
+            slow_query.record("SELECT 1", None, 0.05)  # under the threshold
+
+        write_entry.assert_called_once()
+        entry = write_entry.call_args[0][0]
+        self.assertEqual(entry["params"], ["<str:13>"])
+        self.assertEqual(entry["duration_ms"], 250.0)
+        self.assertIsNone(entry["plan"])
+        self.assertTrue(entry["call_site"].startswith("backend_app/tests.py:test_record_writes_redacted_entries"))
+
+
+class _StagingCursor:
+    """Stands in for the import transaction's cursor: keeps the COPY rows and answers the FK checks."""
+
+    def __init__(self, missing_suppliers=(), missing_categories=()):
+        self.staged = []
+        self.deleted = []
+        self.missing = {
+            import_service.MISSING_SUPPLIERS_QUERY: list(missing_suppliers),
+            import_service.MISSING_CATEGORIES_QUERY: list(missing_categories),
+        }
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @contextlib.contextmanager
+    def copy(self, statement):
+        yield mock.Mock(write_row=self.staged.append)
+
+    def execute(self, query, params=None):
+        if query.lstrip().startswith("DELETE"):
+            self.deleted = sorted(params[0])
+        self._rows = self.missing.get(query, [])
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return (len(self.staged) - len(self.deleted),)
+
+
+class ProductImportTests(SimpleTestCase):
+
+    def run_import(self, content, file_format, cursor=None, created_by=None):
+        cursor = cursor or _StagingCursor()
+        with mock.patch.object(import_service.transaction, "atomic", contextlib.nullcontext), \
+                mock.patch.object(import_service, "connection", mock.Mock(**{"cursor.return_value": cursor})), \
+                mock.patch.object(import_service, "bump_version") as bump:
+            result = import_service.import_products(io.BytesIO(content), file_format, created_by)
+        return result, cursor, bump
+
+    def test_csv_rows_are_validated_and_reported_by_row_number(self):
+        content = (
+            "name,price,quantity,supplier_id,category_id,created_by\n"
+            "Bolt,1.50,10,1,2,alice\n"
+            "Nut,abc,5,1,2,alice\n"
+            "Washer,0.10,,1,2,alice\n"
+            "Screw,0.20,7,1,2,\n"
+        ).encode()
+        result, cursor, bump = self.run_import(content, "csv", created_by="importer")
+
+        self.assertEqual(result["imported"], 2)
+        self.assertEqual(result["failed"], 2)
+        self.assertEqual([error["row"] for error in result["errors"]], [2, 3])
+        self.assertIn("price", result["errors"][0]["errors"])
+        self.assertIn("quantity", result["errors"][1]["errors"])
+        self.assertEqual([row[0] for row in cursor.staged], [1, 4])
+        # an empty created_by falls back to the importing user
+        self.assertEqual(cursor.staged[1][-1], "importer")
+        bump.assert_called_once_with("products")
+
+    def test_ndjson_parse_errors_keep_line_numbers(self):
+        content = (
+            b'{"name": "Bolt", "price": "1.50", "quantity": 10, "supplier_id": 1, "category_id": 2, "created_by": "a"}\n'
+            b"\n"
+            b"{not json\n"
+            b"[1, 2]\n"
+            b'{"name": "Nut", "price": "2.00", "quantity": 1, "supplier_id": 1, "category_id": 2, "created_by": "a"}\n'
+        )
+        result, cursor, _ = self.run_import(content, "ndjson")
+
+        self.assertEqual(result["imported"], 2)
+        self.assertEqual([error["row"] for error in result["errors"]], [2, 3])
+        self.assertTrue(result["errors"][0]["errors"]["non_field_errors"][0].startswith("Invalid JSON"))
+        self.assertIn("JSON object", result["errors"][1]["errors"]["non_field_errors"][0])
+        self.assertEqual([row[0] for row in cursor.staged], [1, 4])
+
+    def test_missing_foreign_keys_are_merged_per_row_and_sorted(self):
+        row = '{{"name": "P{0}", "price": "1", "quantity": 1, "supplier_id": {0}, "category_id": {0}, "created_by": "a"}}'
+        content = "\n".join(row.format(n) for n in range(1, 5)).encode() + b"\nnope\n"
+        cursor = _StagingCursor(missing_suppliers=[(3, 3), (1, 1)], missing_categories=[(3, 3)])
+        result, cursor, _ = self.run_import(content, "ndjson", cursor)
+
+        self.assertEqual(cursor.deleted, [1, 3])
+        self.assertEqual(result["imported"], 2)
+        self.assertEqual(result["failed"], 3)
+        self.assertEqual([error["row"] for error in result["errors"]], [1, 3, 5])
+        self.assertEqual(result["errors"][0]["errors"], {"supplier_id": ["Supplier 1 does not exist."]})
+        self.assertEqual(set(result["errors"][1]["errors"]), {"supplier_id", "category_id"})
+
+    @override_settings(PRODUCT_IMPORT_MAX_ERRORS=2)
+    def test_error_list_is_capped_but_failures_are_counted(self):
+        content = b"name,price,quantity,supplier_id,category_id,created_by\n" + b"x,bad,1,1,1,a\n" * 5
+        result, _, bump = self.run_import(content, "csv")
+
+        self.assertEqual(result, {"imported": 0, "failed": 5, "errors": result["errors"]})
+        self.assertEqual([error["row"] for error in result["errors"]], [1, 2])
+        bump.assert_not_called()
+
+    def test_undecodable_file_is_a_format_error(self):
+        with self.assertRaisesMessage(InvalidFileFormatError, "UTF-8"):
+            self.run_import(b"name,price\n\xff\xfe,1\n", "csv")
+
+    def test_database_failure_is_an_update_error(self):
+        cursor = _StagingCursor()
+        cursor.fetchone = mock.Mock(side_effect=RuntimeError("connection lost"))
+        with self.assertRaisesMessage(DatabaseUpdateError, "connection lost"):
+            self.run_import(b"name,price,quantity,supplier_id,category_id,created_by\n", "csv", cursor)
+
+    def test_detect_import_format(self):
+        upload = mock.Mock()
+        for name, requested, expected in (
+            ("items.CSV", None, "csv"), ("items.jsonl", None, "ndjson"), ("items.ndjson", None, "ndjson"),
+            ("items.txt", "NDJSON", "ndjson"),
+        ):
+            upload.name = name
+            self.assertEqual(import_service.detect_import_format(upload, requested), expected)
+        upload.name = "items.xlsx"
+        with self.assertRaises(InvalidFileFormatError):
+            import_service.detect_import_format(upload)
+
+
+class ProductUploadTests(SimpleTestCase):
+    DATA = {"name": "Bolt", "price": "1.50", "quantity": 3, "supplier_id": 1, "category_id": 2, "created_by": "a"}
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media_root = os.path.join(tmp.name, "media")
+        media = override_settings(MEDIA_ROOT=self.media_root, MEDIA_TMP_ROOT=os.path.join(tmp.name, "tmp"))
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.commit_callbacks = []
+        for target, name in (
+            (media_service.transaction, "on_commit"),
+            (media_service, "schedule_variants"),
+            (product_service, "bump_version"),
+        ):
+            patcher = mock.patch.object(target, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        media_service.transaction.on_commit.side_effect = self.commit_callbacks.append
+
+    def upload(self, content=b"\x89PNG fake image"):
+        return SimpleUploadedFile("bolt.png", content)
+
+    def stored_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.media_root)
+            for root, _, names in os.walk(self.media_root) for name in names
+        )
+
+    def test_variants_are_scheduled_on_commit(self):
+        with mock.patch.object(product_service, "execute_query") as execute_query:
+            product_service.create_product(dict(self.DATA), self.upload())
+
+        path = execute_query.call_args[0][1][-1]
+        self.assertEqual(self.stored_files(), [path])
+        media_service.schedule_variants.assert_not_called()
+        self.assertEqual(len(self.commit_callbacks), 1)
+        self.commit_callbacks[0]()
+        media_service.schedule_variants.assert_called_once_with(path)
+
+    def test_failed_insert_removes_the_new_file(self):
+        with mock.patch.object(product_service, "execute_query", side_effect=RuntimeError("insert failed")):
+            with self.assertRaises(DatabaseUpdateError):
+                product_service.create_product(dict(self.DATA), self.upload())
+
+        self.assertEqual(self.stored_files(), [])
+        self.assertEqual(self.commit_callbacks, [])
+
+    def test_failed_insert_keeps_content_that_was_already_stored(self):
+        existing = media_service.store_upload(self.upload(), variants=False)
+        with mock.patch.object(product_service, "execute_query", side_effect=RuntimeError("insert failed")):
+            with self.assertRaises(DatabaseUpdateError):
+                product_service.create_product(dict(self.DATA), self.upload())
+
+        self.assertEqual(self.stored_files(), [existing])
+
+    def test_version_conflict_removes_the_new_file(self):
+        data = dict(self.DATA, version=1, update_reason="r", updated_by="a")
+        with mock.patch.object(product_service.transaction, "atomic", contextlib.nullcontext), \
+                mock.patch.object(product_service, "execute_query", return_value=[{"version": 2}]):
+            with self.assertRaises(ConcurrencyConflictError):
+                product_service.update_product(7, data, self.upload())
+
+        self.assertEqual(self.stored_files(), [])
+
+    def test_update_without_upload_keeps_the_current_image(self):
+        data = dict(self.DATA, product_image="products/ab/old.png", update_reason="r", updated_by="a")
+        with mock.patch.object(product_service, "execute_query") as execute_query:
+            product_service.update_product(7, data)
+
+        self.assertEqual(execute_query.call_args[0][1][-1], "products/ab/old.png")
+        self.assertEqual(self.commit_callbacks, [])
@@ -3,7 +3,16 @@ from backend_app.views.supplier import SupplierView
 from backend_app.views.category import *
 from backend_app.views.product import *
 from .views.auth_views import RegisterView, LoginView, RefreshTokenView,SendOTPView,ResetPasswordWithOTPView,UserListView
-from .views.dashboard_views import DashboardStatsView
+from .views.dashboard_views import DashboardStatsView, DatabasePoolStatsView
+from .views.export_views import ExportView
+from .views.search_views import ProductSearchView, ProductAutocompleteView
+from .views.stock_views import StockMovementView, ProductStockMovementsView, ProductStockView
+from .views.async_views import (
+    AsyncDashboardStatsView,
+    AsyncExportView,
+    AsyncProductListView,
+    AsyncProductSearchView,
+)
 
 urlpatterns = [
     # Registration Route
@@ -22,11 +31,32 @@ urlpatterns = [
     path('categories/', CategoryListCreateView.as_view()),
     path('categories/<int:id>/', CategoryUpdateDeleteView.as_view()),
     path('category-connections/', CategoryConnectionView.as_view(), name='category-connections'),
+    path('category-connections/grouped/', CategoryConnectionGroupedView.as_view(), name='category-connections-grouped'),
 
     path('products/', ProductListCreateView.as_view()),
+    path('products/import/', ProductImportView.as_view(), name='product-import'),
+    path('products/bulk-update/', ProductBulkUpdateView.as_view(), name='product-bulk-update'),
+    path('products/search/', ProductSearchView.as_view(), name='product-search'),
+    path('products/autocomplete/', ProductAutocompleteView.as_view(), name='product-autocomplete'),
     path('products/<int:id>/', ProductUpdateDeleteView.as_view()),
+    path('products/<int:id>/adjust-stock/', ProductStockAdjustView.as_view(), name='product-adjust-stock'),
+    path('products/<int:id>/stock/', ProductStockView.as_view(), name='product-stock'),
+    path('products/<int:id>/stock-movements/', ProductStockMovementsView.as_view(), name='product-stock-movements'),
+
+    # Stock movement ledger: receipts, sales, adjustments and transfers
+    path('stock-movements/', StockMovementView.as_view(), name='stock-movements'),
 
     path('users/', UserListView.as_view(), name='user-list'),
     
     path('dashboard-stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
+    path('db-pool-stats/', DatabasePoolStatsView.as_view(), name='db-pool-stats'),
+
+    # Native async read endpoints (ASGI): same responses as the routes above
+    path('async/products/', AsyncProductListView.as_view(), name='async-products'),
+    path('async/products/search/', AsyncProductSearchView.as_view(), name='async-product-search'),
+    path('async/dashboard-stats/', AsyncDashboardStatsView.as_view(), name='async-dashboard-stats'),
+    path('async/export/<str:resource>/', AsyncExportView.as_view(), name='async-export'),
+
+    # Streaming CSV/NDJSON exports: /api/export/products/?output=ndjson&gzip=1
+    path('export/<str:resource>/', ExportView.as_view(), name='export'),
 ]
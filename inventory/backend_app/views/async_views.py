@@ -0,0 +1,84 @@
+from django.http import HttpResponse
+from django.views import View
+
+from backend_app.renderers import dumps
+from backend_app.services.async_read_service import (
+    alist_products,
+    alist_products_keyset,
+    asearch_products,
+    aget_dashboard_stats,
+)
+from backend_app.services.export_service import astream_export
+from backend_app.services.pagination import parse_cursor_params, parse_optional_int
+from backend_app.streaming import astreaming_export_response
+from backend_app.views.export_views import parse_export_params
+from backend_app.exception import ValidationError
+
+# Native async views for the hot read endpoints. DRF's APIView is sync-only,
+# so these are plain Django views that return the same JSON bodies as their
+# DRF counterparts. Served under /api/async/...; run the project with an ASGI
+# server (e.g. `uvicorn inventory.asgi:application`) to benefit from them.
+
+
+def _json(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+class AsyncProductListView(View):
+    async def get(self, request):
+        """Same contract as ProductListCreateView.get (page/limit or cursor)."""
+        if "cursor" in request.GET:
+            params = parse_cursor_params(request.GET, default_limit=100)
+            return _json(await alist_products_keyset(**params))
+
+        try:
+            page = int(request.GET.get("page", 1))
+            limit = int(request.GET.get("limit", 100))
+        except ValueError:
+            raise ValidationError("Invalid pagination parameters provided.")
+        if page <= 0 or limit <= 0:
+            raise ValidationError("Page and Limit must be positive integers.")
+
+        return _json(await alist_products(limit=limit, offset=(page - 1) * limit))
+
+
+class AsyncProductSearchView(View):
+    async def get(self, request):
+        """Same contract as ProductSearchView.get."""
+        query = request.GET.get("q", "").strip()
+        if not query:
+            raise ValidationError("Search query 'q' is required.")
+
+        params = parse_cursor_params(request.GET, default_limit=20, max_limit=100)
+        data = await asearch_products(
+            query,
+            limit=params["limit"],
+            cursor=params["cursor"],
+            category_id=parse_optional_int(request.GET, "category_id"),
+            supplier_id=parse_optional_int(request.GET, "supplier_id"),
+        )
+        return _json(data)
+
+
+class AsyncDashboardStatsView(View):
+    async def get(self, request):
+        """Same contract as DashboardStatsView.get."""
+        try:
+            return _json(await aget_dashboard_stats())
+        except Exception as e:
+            return _json({"error": str(e)}, status=500)
+
+
+class AsyncExportView(View):
+    async def get(self, request, resource):
+        """
+        Same contract as ExportView.get. The body is an async iterator, so
+        ASGI servers stream it instead of collecting it in memory.
+        """
+        file_format, compress = parse_export_params(request.GET)
+        return await astreaming_export_response(
+            astream_export(resource),
+            file_format,
+            filename=resource,
+            compress=compress,
+        )
@@ -4,6 +4,8 @@ from rest_framework import status  # status ઇમ્પોર્ટ કરવ
 from rest_framework.permissions import AllowAny
 # ડેકોરેટર્સની જરૂર નથી જો તમે ક્લાસની અંદર વેરીએબલ વાપરો છો
 from backend_app.services import auth_service
+from backend_app.services.db import stream_query
+from backend_app.streaming import streaming_json_response
 
 class RegisterView(APIView):
     permission_classes = [AllowAny]
@@ -66,10 +68,10 @@ class UserListView(APIView):
             # ખાતરી કરજો કે ડેટાબેઝમાં ટેબલનું નામ 'tbl_users' જ છે
             query = "SELECT id, username, email FROM tbl_users ORDER BY id ASC"
             
-            # auth_service માંથી execute_query કોલ કરો
-            users = auth_service.execute_query(query, fetch=True)
+            # server-side cursor સાથે stream કરો (memory constant રહે છે)
+            users = stream_query(query)
             
-            return Response(users if users else [], status=status.HTTP_200_OK)
+            return streaming_json_response(users, status=status.HTTP_200_OK)
             
         except Exception as e:
             # જો execute_query ફંક્શન auth_service માં ન હોય તો સીધું ઇમ્પોર્ટ કરવું પડશે
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -5,23 +6,39 @@ from rest_framework import status
 from backend_app.services.category_service import (
     create_category,
     list_categories,
+    list_categories_keyset,
     update_category,
     delete_category,
-    get_category_connections,
+    stream_category_connections,
+    get_grouped_category_connections,
+    get_category_connection_products,
+    CONNECTION_RESOURCES,
 )
 from backend_app.serializers.category_serializer import CategorySerializer
+from backend_app.services.pagination import parse_cursor_params, parse_layout, parse_optional_int
+from backend_app.streaming import streaming_json_response
+from backend_app.conditional import conditional_on
+from backend_app.exception import ValidationError
 
 
 class CategoryListCreateView(APIView):
+    @conditional_on("categories", ["categories"])
     def get(self, request):
         """
         List categories with pagination
+        (`?cursor=` switches to keyset pagination, `?layout=rows|columns` to compact arrays)
         """
+        row_factory = parse_layout(request.query_params)
+        if "cursor" in request.query_params:
+            params = parse_cursor_params(request.query_params, default_limit=15)
+            data = list_categories_keyset(**params, row_factory=row_factory)
+            return Response(data, status=status.HTTP_200_OK)
+
         page = int(request.query_params.get("page", 1))
         limit = int(request.query_params.get("limit", 15))
         offset = (page - 1) * limit
 
-        data = list_categories(limit=limit, offset=offset)
+        data = list_categories(limit=limit, offset=offset, row_factory=row_factory)
         return Response(data, status=status.HTTP_200_OK)
 
     def post(self, request):
@@ -75,11 +92,42 @@ class CategoryConnectionView(APIView):
 
     def get(self, request):
         try:
-            data = get_category_connections()
-            return Response(
-                {"status": "success", "data": data},
+            # rows are streamed from a server-side cursor, memory stays flat
+            return streaming_json_response(
+                stream_category_connections(),
+                envelope={"status": "success"},
+                key="data",
                 status=status.HTTP_200_OK,
             )
         except Exception:
             # Custom middleware will handle the exception
             raise
+
+
+class CategoryConnectionGroupedView(APIView):
+    @conditional_on("category_connections", CONNECTION_RESOURCES)
+    def get(self, request):
+        """
+        Category -> products (with supplier ids) plus a supplier dictionary,
+        paginated over categories: ?limit=&cursor=, with at most
+        ?products_limit= products per category. ?category_id=&products_cursor=
+        continues the products of one category.
+        """
+        params = parse_cursor_params(request.query_params, default_limit=50, max_limit=200)
+        products_limit = parse_optional_int(request.query_params, "products_limit")
+        if products_limit is None:
+            products_limit = settings.CATEGORY_CONNECTIONS_PRODUCTS_LIMIT
+        if products_limit <= 0:
+            raise ValidationError("products_limit must be a positive integer.")
+        products_limit = min(products_limit, settings.CATEGORY_CONNECTIONS_MAX_PRODUCTS)
+
+        category_id = parse_optional_int(request.query_params, "category_id")
+        if category_id is not None:
+            data = get_category_connection_products(
+                category_id, request.query_params.get("products_cursor") or None, products_limit
+            )
+        else:
+            data = get_grouped_category_connections(
+                cursor=params["cursor"], limit=params["limit"], products_limit=products_limit
+            )
+        return Response(data, status=status.HTTP_200_OK)
@@ -1,29 +1,29 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db import connection
-from rest_framework.permissions import AllowAny 
+from rest_framework.permissions import AllowAny
+from django.conf import settings
+from backend_app.services.dashboard_service import DASHBOARD_RESOURCES, get_dashboard_stats
+from backend_app.conditional import conditional_on
+from backend_app.services.pool_service import get_pool_stats
 
 class DashboardStatsView(APIView):
-    permission_classes = [AllowAny] 
+    permission_classes = [AllowAny]
 
+    @conditional_on("dashboard", DASHBOARD_RESOURCES, extra=lambda: [settings.LOW_STOCK_THRESHOLD])
     def get(self, request):
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT count(*) FROM tbl_products")
-                total_products = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT count(*) FROM tbl_categories")
-                total_categories = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT count(*) FROM tbl_suppliers")
-                total_suppliers = cursor.fetchone()[0]
+            # single aggregate query, served from cache between writes
+            return Response(get_dashboard_stats(), status=status.HTTP_200_OK)
 
-            return Response({
-                "totalProducts": total_products,
-                "totalCategories": total_categories,
-                "totalSuppliers": total_suppliers
-            }, status=status.HTTP_200_OK)
-            
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class DatabasePoolStatsView(APIView):
+    def get(self, request):
+        """
+        Connection pool statistics for the worker that serves the request
+        (in use, idle, waits, timeouts) - used to size DB_POOL_* settings.
+        """
+        return Response(get_pool_stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,30 @@
+from rest_framework.views import APIView
+
+from backend_app.services.export_service import stream_export
+from backend_app.streaming import EXPORT_ENCODERS, streaming_export_response
+from backend_app.exception import ValidationError
+
+
+def parse_export_params(query_params):
+    """?output=csv|ndjson (default csv) and ?gzip=1 -> (file_format, compress)."""
+    file_format = query_params.get("output", "csv").lower()
+    if file_format not in EXPORT_ENCODERS:
+        raise ValidationError("Export output must be 'csv' or 'ndjson'.")
+    return file_format, query_params.get("gzip", "").lower() in ("1", "true", "yes")
+
+
+class ExportView(APIView):
+    def get(self, request, resource):
+        """
+        Stream a full export of products, categories or suppliers.
+        ?output=csv|ndjson (default csv) and ?gzip=1 for a compressed download.
+        Needs WSGI: under ASGI use /api/async/export/<resource>/ instead.
+        """
+        file_format, compress = parse_export_params(request.query_params)
+
+        return streaming_export_response(
+            stream_export(resource),
+            file_format,
+            filename=resource,
+            compress=compress,
+        )
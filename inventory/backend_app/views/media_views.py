@@ -0,0 +1,175 @@
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseNotFound, HttpResponseNotModified, HttpResponseRedirect,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from backend_app.services.media_service import is_content_addressed, variant_original
+
+# ---------------- MEDIA DELIVERY ----------------
+# Serves MEDIA_ROOT with validators (strong ETag, Last-Modified), conditional
+# GET (304), single byte ranges (206/416) and long-lived caching for
+# content-addressed files, which never change under the same name. A variant
+# that is still being generated redirects (uncached) to its original.
+# The file object goes to the server's wsgi.file_wrapper, so gunicorn & co.
+# send it with sendfile(); behind nginx, MEDIA_ACCEL_REDIRECT hands the
+# transfer to nginx instead (X-Accel-Redirect).
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class _RangeFile:
+    """Reads at most `length` bytes from an open file positioned at the range start."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        # lets sendfile() start at the current offset and stop at Content-Length
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def _etag(path, st):
+    if is_content_addressed(path):
+        # the name already is the content hash (plus variant suffix)
+        return '"%s"' % os.path.splitext(os.path.basename(path))[0]
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def _not_modified(request, etag, mtime):
+    """RFC 9110: If-None-Match wins over If-Modified-Since when both are sent."""
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return "*" in etags or etag in etags or f"W/{etag}" in etags
+    since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    return since is not None and int(mtime) <= since
+
+
+def _parse_range(header, size):
+    """
+    (start, end) inclusive for a single satisfiable range, None to ignore the
+    header (malformed, multiple ranges or last < first -> full response), or
+    False for 416 (the range starts past the end of the file).
+    """
+    match = RANGE_RE.match(header.replace(" ", ""))
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        # RFC 9110 14.1.1: syntactically invalid, so the Range is ignored
+        return None
+    if start >= size:
+        return False
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def _range_applies(request, etag, mtime):
+    """If-Range: only honour Range when the client's copy is still current."""
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and int(mtime) <= since
+
+
+@require_safe
+def serve_media(request, path):
+    # a plain 404 (not Http404, which process_exception would report as a 500)
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        st = os.stat(full_path)
+    except ValueError:
+        return HttpResponseNotFound("File not found")
+    except OSError:
+        original = variant_original(path)
+        if original is None:
+            return HttpResponseNotFound("File not found")
+        # variant not written yet: send the original, and don't let anyone cache that answer
+        response = HttpResponseRedirect(settings.MEDIA_URL + original, status=307)
+        response["Cache-Control"] = "no-store"
+        return response
+    if not stat.S_ISREG(st.st_mode):
+        return HttpResponseNotFound("File not found")
+
+    etag = _etag(path, st)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(st.st_mtime),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL if is_content_addressed(path)
+            else f"public, max-age={getattr(settings, 'MEDIA_CACHE_MAX_AGE', 0)}, must-revalidate"
+        ),
+    }
+
+    if _not_modified(request, etag, st.st_mtime):
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+
+    accel_prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT", None)
+    if accel_prefix:
+        # nginx streams the file (and answers Range itself) from an internal location
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = accel_prefix.rstrip("/") + "/" + path.lstrip("/")
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    byte_range = None
+    range_header = request.META.get("HTTP_RANGE")
+    if range_header and _range_applies(request, etag, st.st_mtime):
+        byte_range = _parse_range(range_header, st.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{st.st_size}"
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+    file = open(full_path, "rb")
+    if byte_range:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(_RangeFile(file, end - start + 1), status=206, content_type=content_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+        response["Content-Length"] = end - start + 1
+    else:
+        response = FileResponse(file, content_type=content_type)
+    for name, value in headers.items():
+        response[name] = value
+    return response
@@ -5,20 +5,37 @@ from rest_framework import status
 from backend_app.services.product_service import (
     create_product,
     list_products,
+    list_products_keyset,
     update_product,
+    adjust_stock,
     delete_product,
 )
 from backend_app.serializers.product_serializer import (
     ProductCreateSerializer,
     ProductUpdateSerializer,
+    ProductBulkUpdateSerializer,
+    ProductStockAdjustSerializer,
 )
+from backend_app.services.import_service import detect_import_format, import_products
+from backend_app.services.bulk_update_service import bulk_update_products
+from backend_app.services.pagination import parse_cursor_params, parse_layout
 from backend_app.exception import ValidationError
+from backend_app.conditional import conditional_on
 
 class ProductListCreateView(APIView):
+    @conditional_on("products", ["products"])
     def get(self, request):
         """
-        List products with pagination
+        List products with pagination.
+        `?cursor=` switches to keyset pagination; `page` is kept for old clients.
+        `?layout=rows|columns` returns compact arrays instead of one object per row.
         """
+        row_factory = parse_layout(request.query_params)
+        if "cursor" in request.query_params:
+            params = parse_cursor_params(request.query_params, default_limit=100)
+            data = list_products_keyset(**params, row_factory=row_factory)
+            return Response(data, status=status.HTTP_200_OK)
+
         try:
             page = int(request.query_params.get("page", 1))
             limit = int(request.query_params.get("limit", 100))
@@ -27,7 +44,7 @@ class ProductListCreateView(APIView):
                 raise ValidationError("Page and Limit must be positive integers.")
 
             offset = (page - 1) * limit
-            data = list_products(limit=limit, offset=offset)
+            data = list_products(limit=limit, offset=offset, row_factory=row_factory)
 
             return Response(data, status=status.HTTP_200_OK)
 
@@ -54,6 +71,64 @@ class ProductListCreateView(APIView):
         )
 
 
+class ProductImportView(APIView):
+    def post(self, request):
+        """
+        Bulk import products from a CSV or NDJSON upload (multipart field `file`).
+        Valid rows are loaded in one transaction; invalid rows are reported.
+        """
+        file_obj = request.FILES.get("file")
+        if not file_obj:
+            raise ValidationError("A CSV or NDJSON file is required in the 'file' field.")
+
+        file_format = detect_import_format(file_obj, request.data.get("file_format"))
+        result = import_products(
+            file_obj,
+            file_format,
+            created_by=request.data.get("created_by"),
+        )
+
+        return Response(
+            result,
+            status=status.HTTP_201_CREATED if result["imported"] else status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class ProductBulkUpdateView(APIView):
+    def patch(self, request):
+        """
+        Apply many {id, name|price|quantity} changes in one transaction
+        (e.g. a stock-take). Returns one result per item, in request order.
+        """
+        serializer = ProductBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = bulk_update_products(
+            serializer.validated_data["items"],
+            serializer.validated_data["updated_by"],
+            serializer.validated_data["update_reason"],
+        )
+
+        return Response(
+            result,
+            status=status.HTTP_200_OK if result["updated"] else status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class ProductStockAdjustView(APIView):
+    def post(self, request, id):
+        """
+        Atomically add `delta` to the product's quantity (negative to pick stock).
+        Fails with 409 instead of going below zero unless `allow_negative` is set.
+        """
+        serializer = ProductStockAdjustSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        data = adjust_stock(id, **serializer.validated_data)
+
+        return Response(data, status=status.HTTP_200_OK)
+
+
 class ProductUpdateDeleteView(APIView):
     def put(self, request, id):
         """
@@ -67,16 +142,16 @@ class ProductUpdateDeleteView(APIView):
 
         file_obj = request.FILES.get("product_image")
 
-        update_product(
+        version = update_product(
             id,
             serializer.validated_data,
             file_obj
         )
 
-        return Response(
-            {"message": "Product updated successfully"},
-            status=status.HTTP_200_OK,
-        )
+        data = {"message": "Product updated successfully"}
+        if version is not None:
+            data["version"] = version
+        return Response(data, status=status.HTTP_200_OK)
 
     def patch(self, request, id):
         """
@@ -0,0 +1,42 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from backend_app.services.search_service import search_products_ranked, autocomplete_products
+from backend_app.services.pagination import parse_cursor_params, parse_optional_int
+from backend_app.exception import ValidationError
+
+
+class ProductSearchView(APIView):
+    def get(self, request):
+        """
+        Ranked product search.
+        ?q=<text>&limit=&cursor=&category_id=&supplier_id=
+        """
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError("Search query 'q' is required.")
+
+        params = parse_cursor_params(request.query_params, default_limit=20, max_limit=100)
+        data = search_products_ranked(
+            query,
+            limit=params["limit"],
+            cursor=params["cursor"],
+            category_id=parse_optional_int(request.query_params, "category_id"),
+            supplier_id=parse_optional_int(request.query_params, "supplier_id"),
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class ProductAutocompleteView(APIView):
+    def get(self, request):
+        """
+        Type-ahead suggestions: ?q=<prefix>&limit= -> [{id, name}]
+        """
+        prefix = request.query_params.get("q", "").strip()
+        if not prefix:
+            return Response({"results": []}, status=status.HTTP_200_OK)
+
+        params = parse_cursor_params(request.query_params, default_limit=10, max_limit=50)
+        data = autocomplete_products(prefix, limit=params["limit"])
+        return Response({"results": data}, status=status.HTTP_200_OK)
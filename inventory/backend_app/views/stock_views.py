@@ -0,0 +1,70 @@
+from datetime import timezone
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from backend_app.serializers.stock_serializer import StockMovementSerializer
+from backend_app.services.stock_ledger_service import movement_history, record_movement, stock_as_of
+from backend_app.services.pagination import parse_cursor_params
+from backend_app.exception import ValidationError
+
+
+def parse_timestamp(query_params, name):
+    """Optional ISO 8601 timestamp from the query string; naive values are UTC."""
+    value = query_params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value.replace(" ", "+"))
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError(f"'{name}' must be an ISO 8601 timestamp.")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class StockMovementView(APIView):
+    def post(self, request):
+        """
+        Record a receipt, sale, adjustment or transfer. The product quantity,
+        ledger and running balance change in the same statement.
+        """
+        serializer = StockMovementSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        data = record_movement(**serializer.validated_data)
+
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class ProductStockMovementsView(APIView):
+    def get(self, request, id):
+        """
+        Movement history of one product, newest first.
+        ?since=&until=&limit=&cursor=
+        """
+        params = parse_cursor_params(
+            request.query_params,
+            default_limit=50,
+            max_limit=getattr(settings, "STOCK_MOVEMENTS_MAX_LIMIT", 500),
+        )
+        data = movement_history(
+            id,
+            since=parse_timestamp(request.query_params, "since"),
+            until=parse_timestamp(request.query_params, "until"),
+            cursor=params["cursor"],
+            limit=params["limit"],
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class ProductStockView(APIView):
+    def get(self, request, id):
+        """
+        Quantity of a product now or ?as_of=<ISO 8601 timestamp>.
+        """
+        data = stock_as_of(id, parse_timestamp(request.query_params, "as_of"))
+        return Response(data, status=status.HTTP_200_OK)
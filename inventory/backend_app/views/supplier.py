@@ -1,17 +1,28 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from backend_app.services.supplier_service import (create_supplier,update_supplier,delete_supplier,list_suppliers)
+from backend_app.services.supplier_service import (create_supplier,update_supplier,delete_supplier,list_suppliers,list_suppliers_keyset)
+from backend_app.services.pagination import parse_cursor_params, parse_layout
 import rest_framework.status as status
+from backend_app.conditional import conditional_on
 
 class SupplierView(APIView):
+    @conditional_on("suppliers", ["suppliers"])
     def get(self, request):
+        # ?layout=rows|columns: compact arrays instead of one object per row
+        row_factory = parse_layout(request.query_params)
+        # cursor mode: ?cursor=<opaque>&limit= (keyset pagination for deep paging)
+        if 'cursor' in request.query_params:
+            params = parse_cursor_params(request.query_params, default_limit=10)
+            data = list_suppliers_keyset(**params, row_factory=row_factory)
+            return Response(data, status=status.HTTP_200_OK)
+
         # params from frontend
         page = int(request.query_params.get('page', 1))
         limit = int(request.query_params.get('limit', 10))
         offset = (page - 1) * limit
 
         # passing parameters to service
-        data = list_suppliers(limit=limit, offset=offset)
+        data = list_suppliers(limit=limit, offset=offset, row_factory=row_factory)
         
         return Response(data, status=status.HTTP_200_OK)
 
@@ -30,6 +30,9 @@ ALLOWED_HOSTS = []
 MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# uploads and image variants in progress; outside MEDIA_ROOT so they are never
+# served, but on the same filesystem so finished files are moved in by rename
+MEDIA_TMP_ROOT = os.path.join(BASE_DIR, 'media_tmp')
 # Application definition
 
 INSTALLED_APPS = [
@@ -45,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend_app.middleware.ProfilingMiddleware',  # no-op unless PROFILING_ENABLED
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -90,6 +94,57 @@ DATABASES = {
     }
 }
 
+# Connection pooling: without it every request opens a new Postgres connection.
+# psycopg 3 + psycopg_pool gives a real per-process pool (Django's built-in
+# "pool" option); otherwise fall back to persistent connections with health checks.
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 2))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # seconds to wait for a connection
+DB_POOL_MAX_IDLE = 300  # seconds before an idle connection above min_size is closed
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:
+    ConnectionPool = None
+
+if ConnectionPool is not None:
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+            'max_idle': DB_POOL_MAX_IDLE,
+        },
+    }
+    # Django only passes check=ConnectionPool.check_connection to the pool when
+    # health checks are on; without it a connection killed by a Postgres
+    # restart or failover would still be handed out
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = 60
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Server-side prepared statements for the static hot queries registered with
+# services.db.prepared() (login, product search/insert/update, stock ledger,
+# ETag versions). At most DB_PREPARED_STATEMENTS_MAX queries are registered.
+# psycopg prepares one statement per query *and parameter types* (an int is
+# sent as int2/int4/int8 by size, NULL as unknown), so a registered query can
+# take several of a connection's prepared_max (100) slots; past that the least
+# recently used one is deallocated and prepared again on its next call.
+# Django turns psycopg's automatic preparation off; a threshold that is never
+# reached keeps it off for everything else while allowing explicit prepare=True.
+# Set to False behind PgBouncer in transaction mode (statements are per backend).
+DB_PREPARED_STATEMENTS = os.environ.get('DB_PREPARED_STATEMENTS', 'true').lower() == 'true'
+if DB_PREPARED_STATEMENTS:
+    DATABASES['default'].setdefault('OPTIONS', {})['prepare_threshold'] = 2 ** 31 - 1
+DB_PREPARED_STATEMENTS_MAX = 50
+
+
+# Async (ASGI) read endpoints use their own psycopg 3 connection pool per process
+ASYNC_DB_POOL_MIN_SIZE = int(os.environ.get('ASYNC_DB_POOL_MIN_SIZE', 2))
+ASYNC_DB_POOL_MAX_SIZE = int(os.environ.get('ASYNC_DB_POOL_MAX_SIZE', 20))
+ASYNC_DB_POOL_TIMEOUT = 10  # seconds to wait for a free connection
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -130,8 +185,46 @@ STATIC_URL = 'static/'
 REST_FRAMEWORK = {
     # This points to the custom function we created to handle DRF-specific errors (like 404, 405)
     'EXCEPTION_HANDLER': 'backend_app.exception.custom_drf_exception_handler',
+    # orjson-backed JSON (same bodies as DRF's JSONRenderer, which it falls back to without orjson)
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend_app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# JWT middleware: verified-token LRU size (0 disables) and opt-in payload logging
+JWT_TOKEN_CACHE_SIZE = 1024
+JWT_DEBUG_PAYLOAD = False
+
+# Login: bcrypt cost for new hashes (stored hashes with another cost are
+# re-hashed on the next successful login), and the executor that runs the
+# checks - at most BCRYPT_MAX_WORKERS in parallel, BCRYPT_MAX_PENDING queued,
+# waiting up to BCRYPT_QUEUE_TIMEOUT seconds before the login answers 503.
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+BCRYPT_MAX_WORKERS = int(os.environ.get('BCRYPT_MAX_WORKERS', 4))
+BCRYPT_MAX_PENDING = 32
+BCRYPT_QUEUE_TIMEOUT = 5
+
+# Slow query log (backend_app/services/slow_query.py): statements slower than
+# SLOW_QUERY_MS (0 disables) are appended to SLOW_QUERY_LOG as JSON lines.
+# EXPLAIN (ANALYZE, BUFFERS) plans are opt-in: a SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+# share of slow read-only SELECTs is re-run on a background thread (at most
+# SLOW_QUERY_EXPLAIN_QUEUE_SIZE waiting, the rest are logged without a plan),
+# and statements slower than SLOW_QUERY_EXPLAIN_MAX_MS are never re-run.
+# Summarise with 'manage.py slow_queries'.
+SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 200))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0))
+SLOW_QUERY_EXPLAIN_MAX_MS = 5000
+SLOW_QUERY_EXPLAIN_QUEUE_SIZE = 16
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', str(BASE_DIR / 'slow_queries.jsonl'))
+
+# Request profiling (backend_app.middleware.ProfilingMiddleware): Server-Timing
+# header on every response, plus a JSON log line for a sample of requests and
+# for every request slower than PROFILING_SLOW_REQUEST_MS.
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+PROFILING_LOG_SAMPLE_RATE = float(os.environ.get('PROFILING_LOG_SAMPLE_RATE', 0.01))
+PROFILING_SLOW_REQUEST_MS = 1000
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -158,8 +251,14 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': True,
         },
+        'backend_app': {
+            'handlers': ['console'],
+            'level': 'DEBUG' if JWT_DEBUG_PAYLOAD else 'INFO',
+            'propagate': False,
+        },
     },
 }
+
 # for check password attemps for login 
 CACHES = {
     'default': {
@@ -167,6 +266,67 @@ CACHES = {
         'LOCATION': 'unique-snowflake',
     }
 }
+# How list endpoints compute `total_count`: "window", "cached", "estimate" or "exact"
+# (see backend_app/services/counting.py)
+LIST_COUNT_STRATEGY = os.environ.get('LIST_COUNT_STRATEGY', 'window')
+LIST_COUNT_CACHE_TIMEOUT = 300  # seconds; "cached", and "estimate" before the table has statistics
+
+# HTTP ETags of the list/dashboard endpoints (backend_app/conditional.py) are
+# built from resource versions; change the salt when a deploy changes the
+# response format so clients do not keep an old body on 304.
+ETAG_SALT = '1'
+
+# Dashboard stats are cached briefly; write services invalidate them immediately
+DASHBOARD_CACHE_TIMEOUT = 30  # seconds
+LOW_STOCK_THRESHOLD = 10  # quantity at or below which a product counts as low stock
+
+# Grouped category connections pages; product/category/supplier writes invalidate them
+CATEGORY_CONNECTIONS_CACHE_TIMEOUT = 300  # seconds
+CATEGORY_CONNECTIONS_PRODUCTS_LIMIT = 20  # products per category in a grouped page (?products_limit=)
+CATEGORY_CONNECTIONS_MAX_PRODUCTS = 200
+
+# Rows fetched per round trip by streaming (server-side cursor) queries
+DB_STREAM_BATCH_SIZE = 2000
+
+# Bulk product import (/api/products/import/)
+PRODUCT_IMPORT_BATCH_SIZE = 5000  # rows per executemany batch when COPY is unavailable
+PRODUCT_IMPORT_MAX_ERRORS = 1000  # per-row errors returned in the report
+
+# Bulk product update (/api/products/bulk-update/)
+PRODUCT_BULK_UPDATE_MAX_ITEMS = 10000  # changes accepted per request
+
+# Stock movement ledger (services/stock_ledger_service.py). Run
+# 'manage.py stock_ledger partitions' monthly and 'stock_ledger snapshot' daily.
+STOCK_LEDGER_PARTITION_MONTHS_AHEAD = 3  # monthly partitions kept ready ahead
+STOCK_MOVEMENTS_MAX_LIMIT = 500  # page size cap of the movement history
+
+# Product images are stored content-addressed (services/media_service.py).
+# Variants: name -> bounding box in px, each written in the original format
+# and as WebP by IMAGE_VARIANT_WORKERS processes (needs Pillow).
+IMAGE_VARIANTS = {'thumb': 160, 'card': 480}
+IMAGE_VARIANT_WORKERS = 2
+IMAGE_VARIANT_QUALITY = 80
+
+# /media/ delivery: content-addressed files are cached as immutable; others are
+# revalidated after MEDIA_CACHE_MAX_AGE seconds. Behind nginx, set
+# MEDIA_ACCEL_REDIRECT to an `internal` location aliasing MEDIA_ROOT
+# (e.g. '/protected-media/') so nginx sends the file itself.
+MEDIA_CACHE_MAX_AGE = 0
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT') or None
+
+# Background job queue (backend_app/services/job_queue.py): a local SQLite file,
+# worker threads started on first use, retries with exponential backoff and a
+# dead-letter list after JOB_QUEUE_MAX_ATTEMPTS. JOB_QUEUE_EAGER runs jobs inline.
+JOB_QUEUE_PATH = os.environ.get('JOB_QUEUE_PATH', str(BASE_DIR / 'jobs.sqlite3'))
+JOB_QUEUE_WORKERS = int(os.environ.get('JOB_QUEUE_WORKERS', 2))
+JOB_QUEUE_AUTOSTART = True  # False when a separate 'manage.py jobs work' process runs them
+JOB_QUEUE_EAGER = False
+JOB_QUEUE_MAX_ATTEMPTS = 5
+JOB_QUEUE_BACKOFF_BASE = 2  # seconds before the first retry, doubled each time
+JOB_QUEUE_BACKOFF_MAX = 300
+JOB_QUEUE_LEASE_SECONDS = 300  # a running job not finished by then is picked up again
+JOB_QUEUE_POLL_INTERVAL = 1
+
 TIME_ZONE = 'Asia/Kolkata' # India no time set karva
 USE_TZ = True
 
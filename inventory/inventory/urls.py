@@ -1,11 +1,12 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
+
+from backend_app.views.media_views import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('backend_app.urls')), 
-] 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    # media with ETag / 304 / Range support (see backend_app/views/media_views.py)
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'), serve_media),
+] 
\ No newline at end of file